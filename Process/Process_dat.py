@@ -1,26 +1,74 @@
 import sys
 import os
-import boto3
 import traceback
-from botocore import UNSIGNED
-from botocore.config import Config
 from botocore.exceptions import ClientError
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import subprocess
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from PySide6.QtCore import Qt, QThread, Signal, QTimer, QProcess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QProcess, QDateTime, QTimeZone
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QVBoxLayout,
     QHBoxLayout, QPushButton, QComboBox, QTreeWidget,
     QTreeWidgetItem, QLineEdit, QCheckBox, QFrame, QFileDialog,
     QMessageBox, QProgressBar, QTextEdit, QGroupBox, QSplitter,
     QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget,
-    QListWidget, QListWidgetItem, QGridLayout, QScrollArea, QSpinBox
+    QListWidget, QListWidgetItem, QGridLayout, QScrollArea, QSpinBox,
+    QDialog, QDialogButtonBox, QFormLayout, QDateTimeEdit
 )
 from PySide6.QtGui import QFont, QIcon, QPixmap
 
+from s3_cache import S3ListingCache, neighbour_prefixes, parse_prefix, slot_prefixes
+from s3_client import get_s3_client, TRANSFER_CONFIG
+from himawari_geo import REGIONS, resolve_region, segment_in_region, parse_segment
+from bg_extract import decompress_stream, extract_single_file, CHUNK_SIZE
+from download_manifest import DownloadManifest, PARTIAL, DOWNLOADED, EXTRACTED, partial_path
+from transfer_stats import TransferProgress, CountingReader, AdaptiveConcurrency, format_eta, MB
+from object_store import ObjectStore, STORE_DIR, GB, slot_dir_name
+from process_manifest import ProcessManifest
+
+
+def iter_listing_pages(s3_client, bucket, prefix, list_files):
+    """
+    Page through list_objects_v2 for one prefix (with '/' delimiter).
+    Yields (directories, files, is_truncated) for every page as it arrives.
+    """
+    paginator = s3_client.get_paginator('list_objects_v2')
+    pages = paginator.paginate(
+        Bucket=bucket,
+        Prefix=prefix,
+        Delimiter='/',
+        PaginationConfig={'PageSize': 1000}
+    )
+
+    for result in pages:
+        page_directories = []
+        page_files = []
+
+        if 'CommonPrefixes' in result:
+            for cp in result['CommonPrefixes']:
+                dir_path = cp['Prefix']
+                dir_name = dir_path[len(prefix):].rstrip('/')
+                if dir_name:
+                    page_directories.append(dir_name)
+
+        if list_files and 'Contents' in result:
+            for obj in result['Contents']:
+                key = obj['Key']
+                if not key.endswith('/'):
+                    filename = key[len(prefix):]
+                    if filename:
+                        page_files.append({
+                            'key': key,
+                            'name': filename,
+                            'size': obj['Size'],
+                            'last_modified': obj['LastModified']
+                        })
+
+        yield page_directories, page_files, bool(result.get('IsTruncated'))
+
 
 class S3Lister(QThread):
     progress = Signal(str)
@@ -29,55 +77,57 @@ class S3Lister(QThread):
     error = Signal(str)
     finished = Signal()
  
-    def __init__(self, bucket, prefix=""):
+    def __init__(self, bucket, prefix="", cache=None, s3_client=None, force_refresh=False):
         super().__init__()
         self.bucket = bucket
         self.prefix = prefix.rstrip('/') + '/' if prefix else ""
         self.list_files = False
-     
+        self.cache = cache
+        self.s3_client = s3_client
+        self.force_refresh = force_refresh
+
     def run(self):
         try:
+            if self.cache is not None and not self.force_refresh:
+                cached = self.cache.get(self.bucket, self.prefix, need_files=self.list_files)
+                if cached is not None:
+                    self.progress.emit(f"Listing (cached): s3://{self.bucket}/{self.prefix}")
+                    if cached['directories']:
+                        self.directories_found.emit(cached['directories'])
+                    if self.list_files and cached['files']:
+                        self.files_found.emit(cached['files'])
+                    return
+
             self.progress.emit(f"Listing: s3://{self.bucket}/{self.prefix}")
-         
-            s3_client = boto3.client(
-                's3',
-                config=Config(signature_version=UNSIGNED)
-            )
+
+            s3_client = self.s3_client or get_s3_client()
          
             directories = []
             files = []
-         
-            result = s3_client.list_objects_v2(
-                Bucket=self.bucket,
-                Prefix=self.prefix,
-                Delimiter='/',
-                MaxKeys=1000
-            )
-         
-            if 'CommonPrefixes' in result:
-                for cp in result['CommonPrefixes']:
-                    dir_path = cp['Prefix']
-                    dir_name = dir_path[len(self.prefix):].rstrip('/')
-                    if dir_name:
-                        directories.append(dir_name)
-         
-            if self.list_files and 'Contents' in result:
-                for obj in result['Contents']:
-                    key = obj['Key']
-                    if not key.endswith('/'):
-                        filename = key[len(self.prefix):]
-                        if filename:
-                            files.append({
-                                'key': key,
-                                'name': filename,
-                                'size': obj['Size'],
-                                'last_modified': obj['LastModified']
-                            })
-         
-            self.directories_found.emit(directories)
-            if self.list_files:
-                self.files_found.emit(files)
-             
+
+            # Page through the whole prefix. Each page is emitted as soon as it
+            # arrives so the tree/table can start filling before the last page.
+            pages = iter_listing_pages(s3_client, self.bucket, self.prefix, self.list_files)
+            for page_directories, page_files, is_truncated in pages:
+                directories.extend(page_directories)
+                files.extend(page_files)
+
+                if page_directories:
+                    self.directories_found.emit(page_directories)
+                if self.list_files and page_files:
+                    self.files_found.emit(page_files)
+
+                if is_truncated:
+                    self.progress.emit(
+                        f"Listing: s3://{self.bucket}/{self.prefix} "
+                        f"({len(directories)} folders, {len(files)} files so far)"
+                    )
+
+            # Only complete listings go into the cache
+            if self.cache is not None:
+                self.cache.put(self.bucket, self.prefix, directories,
+                               files if self.list_files else None)
+
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_msg = e.response['Error']['Message']
@@ -88,51 +138,227 @@ class S3Lister(QThread):
             self.finished.emit()
 
 
+class S3Prefetcher(QThread):
+    """
+    Speculatively lists the prefixes the user is likely to open next and stores
+    them in the listing cache, so the next navigation is served locally.
+    Listings of object keys already carry sizes, so no extra HEAD requests are made.
+    Each run logs a single summary line rather than one line per prefix.
+    """
+    progress = Signal(str)
+    finished = Signal(int)
+
+    def __init__(self, bucket, prefixes, cache, max_workers=3, s3_client=None):
+        super().__init__()
+        self.bucket = bucket
+        self.prefixes = prefixes
+        self.cache = cache
+        self.max_workers = max_workers
+        self.s3_client = s3_client
+        self._cancelled = False
+
+    def run(self):
+        counts = {"listed": 0, "cached": 0, "empty": 0}
+        errors = []
+        try:
+            s3_client = self.s3_client or get_s3_client()
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.prefetch_prefix, s3_client, p): p for p in self.prefixes}
+                for future in as_completed(futures):
+                    if self._cancelled:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+                    outcome = future.result()
+                    if isinstance(outcome, Exception):
+                        errors.append(f"{futures[future]}: {outcome}")
+                    elif outcome:
+                        counts[outcome] += 1
+
+            if not self._cancelled:
+                summary = (f"Prefetched {counts['listed']}/{len(self.prefixes)} listings from s3://{self.bucket}/ "
+                           f"({counts['cached']} already cached, {counts['empty']} empty, {len(errors)} failed)")
+                if errors:
+                    summary += f", first error: {errors[0]}"
+                self.progress.emit(summary)
+        except Exception as e:
+            self.progress.emit(f"Prefetch error: {str(e)}")
+        finally:
+            self.finished.emit(counts["listed"])
+
+    def prefetch_prefix(self, s3_client, prefix):
+        """
+        List one prefix into the cache
+        Returns: "listed", "cached" (still fresh), "empty", the exception the
+        listing failed with, or None if cancelled
+        """
+        # Same rule as the browser: every non-root prefix is listed with its files
+        list_files = bool(prefix)
+        if self._cancelled:
+            return None
+        if self.cache.contains(self.bucket, prefix, need_files=list_files):
+            return "cached"
+
+        directories = []
+        files = []
+        try:
+            for page_directories, page_files, _ in iter_listing_pages(s3_client, self.bucket, prefix, list_files):
+                if self._cancelled:
+                    return None
+                directories.extend(page_directories)
+                files.extend(page_files)
+        except Exception as e:
+            return e
+
+        # Slots that don't exist yet (or gaps in the archive) are not worth caching
+        if not directories and not files:
+            return "empty"
+
+        self.cache.put(self.bucket, prefix, directories, files if list_files else None)
+        return "listed"
+
+    def cancel(self):
+        self._cancelled = True
+
+
 class S3DownloadWorker(QThread):
     progress = Signal(str)
     file_progress = Signal(int, int, str)
     finished = Signal(bool, str)
     error = Signal(str)
+    band_complete = Signal(int, str)
+    target_complete = Signal(str, bool)
+    transfer_stats = Signal(dict)
+
+    # Seconds between progress/throughput updates sent to the UI
+    STATS_INTERVAL = 0.5
+
+    # Parallel listings when a job covers several prefixes
+    LIST_WORKERS = 8
+
+    # Parallel .bz2 extractions when extracting files as they arrive
+    EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
  
-    def __init__(self, bucket, prefix, download_dir, bands=None, max_workers=8):
+    def __init__(self, bucket, prefix, download_dir, bands=None, max_workers=8, bbox=None, decompress=False,
+                 band_priority=None, adaptive=True, slot_root=None, store=None, extract=False):
         super().__init__()
         self.bucket = bucket
         self.prefix = prefix
         self.download_dir = Path(download_dir)
+        # (prefix, local directory) pairs to fetch; bulk jobs have many
+        self.targets = [(prefix, self.download_dir)]
         self.bands = bands if bands else []
         self.max_workers = max_workers
+        self.bbox = bbox
+        # Pipe .bz2 objects through the decompressor straight into the .dat file
+        self.decompress = decompress
+        # Bands to fetch first (e.g. the ones the selected products need)
+        self.band_priority = band_priority if band_priority else []
+        # Tune the number of parallel transfers (up to max_workers) from measured MB/s
+        self.adaptive = adaptive
+        # Put each object in its <product>_YYYY_MM_DD_HHMM folder under slot_root,
+        # whatever folder the download was started from
+        self.slot_root = Path(slot_root) if slot_root else None
+        # ObjectStore holding one copy of every object; slot folders link to it
+        self.store = store
+        # Extract each .bz2 as soon as it has been downloaded (resumable, unlike
+        # decompress, but still overlapped with the rest of the download)
+        self.extract = extract and not decompress
+        # Local folders this job put files in, for processing only those
+        self.job_dirs = []
         self._cancelled = False
+
+    def local_dir(self, key, target_dir):
+        """Folder an object is downloaded to"""
+        if self.slot_root is None:
+            return target_dir
+        name = slot_dir_name(key)
+        return self.slot_root / name if name else target_dir
+
+    def link_from_store(self, file_info, local_path, manifest):
+        """
+        Link a stored copy of the object into place
+        Returns: the state linked (DOWNLOADED or EXTRACTED), None if the store doesn't have it
+        """
+        variants = [(local_path, DOWNLOADED)]
+        if local_path.name.lower().endswith('.bz2'):
+            # Either form is fine: a .bz2 simply gets extracted later
+            extracted = (local_path.with_suffix(''), EXTRACTED)
+            variants = [extracted] + variants if self.decompress else variants + [extracted]
+        for path, state in variants:
+            if self.store.checkout(self.bucket, file_info['key'], file_info.get('etag'), path,
+                                   extracted=state == EXTRACTED):
+                manifest.update(file_info, state)
+                return state
+        return None
+
+    def download_order(self, file_info):
+        """Sort key: priority bands first, then band and segment order"""
+        parsed = parse_segment(Path(file_info['key']).name)
+        if parsed is None:
+            return (len(self.band_priority) + 1, 0, 0)
+        band, segment, _ = parsed
+        rank = self.band_priority.index(band) if band in self.band_priority else len(self.band_priority)
+        return (rank, band, segment)
+     
+    def list_prefix(self, s3_client, prefix):
+        """List one prefix and return (files matching the band/region filters, segments skipped by region)"""
+        files = []
+        skipped_segments = 0
+        paginator = s3_client.get_paginator('list_objects_v2')
+     
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            if 'Contents' in page:
+                for obj in page['Contents']:
+                    key = obj['Key']
+                 
+                    if key.endswith('/'):
+                        continue
+                     
+                    if self.bands:
+                        download_file = any(f"B{band:02d}" in key for band in self.bands)
+                        if not download_file:
+                            continue
+                 
+                    if self.bbox and not segment_in_region(Path(key).name, self.bbox):
+                        skipped_segments += 1
+                        continue
+                 
+                    files.append({
+                        'key': key,
+                        'size': obj['Size'],
+                        'etag': obj.get('ETag'),
+                        'last_modified': obj.get('LastModified')
+                    })
+        return files, skipped_segments
+
+    def list_targets(self, s3_client):
+        """List every (prefix, directory) target, in parallel when there are several"""
+        if len(self.targets) == 1:
+            prefix, _ = self.targets[0]
+            self.progress.emit(f"Listing files in: s3://{self.bucket}/{prefix}")
+            return [self.list_prefix(s3_client, prefix)]
+
+        self.progress.emit(f"Listing {len(self.targets)} prefixes in s3://{self.bucket}/")
+        with ThreadPoolExecutor(max_workers=min(self.LIST_WORKERS, len(self.targets))) as executor:
+            return list(executor.map(lambda target: self.list_prefix(s3_client, target[0]), self.targets))
      
     def run(self):
-        download_path = ""
+        download_path = str(self.download_dir)
         try:
-            s3_client = boto3.client(
-                's3',
-                config=Config(signature_version=UNSIGNED)
-            )
-         
-            self.progress.emit(f"Listing files in: s3://{self.bucket}/{self.prefix}")
+            s3_client = get_s3_client(self.max_workers)
          
             files_to_download = []
-            paginator = s3_client.get_paginator('list_objects_v2')
-         
-            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        key = obj['Key']
-                     
-                        if key.endswith('/'):
-                            continue
-                         
-                        if self.bands:
-                            download_file = any(f"B{band:02d}" in key for band in self.bands)
-                            if not download_file:
-                                continue
-                     
-                        files_to_download.append({
-                            'key': key,
-                            'size': obj['Size']
-                        })
+            skipped_segments = 0
+            for index, ((prefix, target_dir), (files, skipped)) in enumerate(zip(self.targets, self.list_targets(s3_client))):
+                if self._cancelled:
+                    self.finished.emit(False, download_path)
+                    return
+                skipped_segments += skipped
+                for file_info in files:
+                    file_info['dir'] = self.local_dir(file_info['key'], target_dir)
+                    file_info['target'] = index
+                files_to_download.extend(files)
          
             if not files_to_download:
                 self.error.emit("No files found matching criteria")
@@ -140,45 +366,199 @@ class S3DownloadWorker(QThread):
                 return
          
             self.progress.emit(f"Found {len(files_to_download)} files to download")
-         
-            self.download_dir.mkdir(parents=True, exist_ok=True)
-            download_path = str(self.download_dir)
+            local_dirs = {file_info['dir'] for file_info in files_to_download}
+            self.job_dirs = sorted(local_dirs)
+            if self.slot_root is not None and local_dirs != {self.download_dir}:
+                # Files went to their time slot folders rather than download_dir
+                download_path = str(local_dirs.pop() if len(local_dirs) == 1 else self.slot_root)
+                self.progress.emit(f"Saving to time slot folders under: {download_path}")
+            if skipped_segments:
+                self.progress.emit(f"Region filter: skipped {skipped_segments} segments outside the region")
+
+            # Skip objects that are already here (as .bz2, .DAT or a decoded band)
+            manifests = {}
+            pending = []
+            already_present = 0
+            for file_info in files_to_download:
+                target_dir = file_info['dir']
+                if target_dir not in manifests:
+                    target_dir.mkdir(parents=True, exist_ok=True)
+                    manifests[target_dir] = DownloadManifest(target_dir)
+                manifest = manifests[target_dir]
+                state = manifest.local_state(file_info)
+                if state is None:
+                    pending.append(file_info)
+                else:
+                    already_present += 1
+                    if state in (DOWNLOADED, EXTRACTED):
+                        manifest.update(file_info, state, save=False)
+            for manifest in manifests.values():
+                manifest.save()
+
+            # Files still to come per directory and per band, so each band (and
+            # each time slot of a bulk job) can be handed to processing as soon
+            # as its last file lands
+            target_remaining = {target_dir: 0 for target_dir in manifests}
+            band_remaining = {}
+            failed_bands = set()
+            files_to_download = sorted(pending, key=lambda f: (f['target'],) + self.download_order(f))
+            for file_info in files_to_download:
+                target_remaining[file_info['dir']] += 1
+                parsed = parse_segment(Path(file_info['key']).name)
+                file_info['band'] = parsed[0] if parsed else None
+                if parsed:
+                    band_key = (file_info['dir'], parsed[0])
+                    band_remaining[band_key] = band_remaining.get(band_key, 0) + 1
+
+            if already_present:
+                self.progress.emit(f"Skipping {already_present} files already present locally")
+            for target_dir, remaining in target_remaining.items():
+                if remaining == 0:
+                    self.target_complete.emit(str(target_dir), True)
+            if not files_to_download:
+                self.progress.emit("Everything is already downloaded, nothing to transfer")
+                self.finished.emit(True, download_path)
+                return
+
+            if self.band_priority:
+                # Dicts keep insertion order, which is the download order here
+                order = dict.fromkeys(band for _, band in band_remaining)
+                self.progress.emit(f"Download order: {', '.join(f'B{band:02d}' for band in order)}")
          
             total_files = len(files_to_download)
             downloaded = 0
             completed = 0
+            failed_targets = set()
+
+            # Transfer threads only add byte counts to the tracker; this thread
+            # turns them into one progress update every STATS_INTERVAL
+            tracker = TransferProgress(files_to_download)
+            gate = AdaptiveConcurrency(self.max_workers, adaptive=self.adaptive)
+            if self.adaptive:
+                self.progress.emit(f"Adaptive concurrency: starting with {gate.limit} of up to {self.max_workers} connections")
 
             def download_single(file_info):
                 if self._cancelled:
                     return False, ""
+                gate.acquire()
+                try:
+                    if self._cancelled:
+                        return False, ""
+                    return transfer(file_info)
+                finally:
+                    gate.release()
+
+            def transfer(file_info):
+                """Returns: (success, name of the file now on disk - the .DAT if it arrived extracted)"""
                 key = file_info['key']
                 filename = Path(key).name
-                local_path = self.download_dir / filename
-             
-                self.progress.emit(f"Downloading: {filename}")
+                local_path = file_info['dir'] / filename
+                manifest = manifests[file_info['dir']]
              
                 try:
-                    s3_client.download_file(
-                        Bucket=self.bucket,
-                        Key=key,
-                        Filename=str(local_path)
-                    )
+                    state = self.link_from_store(file_info, local_path, manifest) if self.store is not None else None
+                    if state is not None:
+                        tracker.skip(file_info, file_info['size'])
+                        if state == EXTRACTED:
+                            return True, local_path.with_suffix('').name
+                        return True, filename
+
+                    if self.decompress and filename.lower().endswith('.bz2'):
+                        # A bz2 stream can't be resumed mid-way, so this always starts over
+                        response = s3_client.get_object(Bucket=self.bucket, Key=key)
+                        body = CountingReader(response['Body'], lambda n: tracker.add(file_info, n))
+                        dat_path = local_path.with_suffix('')
+                        try:
+                            decompress_stream(body, dat_path)
+                        finally:
+                            body.close()
+                        if self.store is not None:
+                            self.store.add(dat_path, self.bucket, key, file_info.get('etag'), extracted=True)
+                        manifest.update(file_info, EXTRACTED)
+                        return True, dat_path.name
+
+                    self.download_resumable(s3_client, file_info, local_path, manifest, tracker)
+                    if self.store is not None:
+                        self.store.add(local_path, self.bucket, key, file_info.get('etag'))
                     return True, filename
                 except Exception as e:
                     self.error.emit(f"Failed to download {filename}: {str(e)}")
                     return False, filename
 
+            process_manifests = {target_dir: ProcessManifest(target_dir) for target_dir in manifests} if self.extract else {}
+
+            def extract_single(file_info):
+                success, filename = extract_single_file(file_info['dir'] / Path(file_info['key']).name,
+                                                        process_manifests[file_info['dir']])
+                if success:
+                    manifests[file_info['dir']].update(file_info, EXTRACTED)
+                else:
+                    self.error.emit(f"Failed to extract {filename}")
+                return success, filename
+
+            extract_pool = ThreadPoolExecutor(max_workers=self.EXTRACT_WORKERS) if self.extract else None
+            if extract_pool:
+                self.progress.emit(f"Extracting .bz2 files as they arrive ({self.EXTRACT_WORKERS} workers)")
+
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [executor.submit(download_single, f) for f in files_to_download]
-                for future in as_completed(futures):
-                    if self._cancelled:
-                        break
-                    success, filename = future.result()
-                    if success:
-                        downloaded += 1
-                    completed += 1
-                    self.file_progress.emit(completed, total_files, filename)
-                    self.progress.emit(f"{'✓' if success else '✗'} {filename}")
+                # The pool works through its queue in submission order, so priority bands go first
+                futures = {executor.submit(download_single, f): f for f in files_to_download}
+                extracting = set()
+                running = set(futures)
+                next_update = 0
+                while running and not self._cancelled:
+                    done, running = wait(running, timeout=self.STATS_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        success, filename = future.result()
+                        file_info = futures[future]
+                        if success and extract_pool and future not in extracting \
+                                and filename.lower().endswith('.bz2'):
+                            # Downloaded: the file counts as done once it is extracted too
+                            extraction = extract_pool.submit(extract_single, file_info)
+                            futures[extraction] = file_info
+                            extracting.add(extraction)
+                            running.add(extraction)
+                            continue
+                        if success:
+                            downloaded += 1
+                        completed += 1
+                        tracker.file_done(file_info, filename, success)
+
+                        target_dir = file_info['dir']
+                        parsed = parse_segment(Path(file_info['key']).name)
+                        if parsed:
+                            band_key = (target_dir, parsed[0])
+                            if not success:
+                                failed_bands.add(band_key)
+                            band_remaining[band_key] -= 1
+                            if band_remaining[band_key] == 0 and band_key not in failed_bands:
+                                self.progress.emit(f"Band B{parsed[0]:02d} complete")
+                                self.band_complete.emit(parsed[0], str(target_dir))
+
+                        if not success:
+                            failed_targets.add(target_dir)
+                        target_remaining[target_dir] -= 1
+                        if target_remaining[target_dir] == 0:
+                            self.target_complete.emit(str(target_dir), target_dir not in failed_targets)
+
+                    now = time.monotonic()
+                    if now < next_update and running:
+                        continue
+                    next_update = now + self.STATS_INTERVAL
+
+                    rate = tracker.meter.rate()
+                    if gate.adjust(rate):
+                        self.progress.emit(f"Concurrency -> {gate.limit} connections ({rate / MB:.1f} MB/s)")
+                    self.file_progress.emit(completed, total_files, tracker.last_file)
+                    self.transfer_stats.emit(tracker.snapshot(gate))
+
+            if extract_pool:
+                extract_pool.shutdown(wait=True, cancel_futures=True)
+
+            if self.store is not None:
+                removed, freed = self.store.prune()
+                if removed:
+                    self.progress.emit(f"Object store: removed {removed} least recently used files ({freed / GB:.1f} GB)")
          
             if not self._cancelled:
                 self.progress.emit(f"Download completed: {downloaded}/{total_files} files")
@@ -190,10 +570,77 @@ class S3DownloadWorker(QThread):
             self.error.emit(f"Download error: {str(e)}")
             self.finished.emit(False, download_path)
          
+    def download_resumable(self, s3_client, file_info, local_path, manifest, tracker=None):
+        """
+        Stream an object into <name>.part, continuing from the bytes of an
+        interrupted earlier attempt, then move it into place.
+        """
+        part = partial_path(local_path)
+        offset = manifest.resume_offset(file_info)
+        manifest.update(file_info, PARTIAL)
+
+        request = {'Bucket': self.bucket, 'Key': file_info['key']}
+        if file_info.get('etag'):
+            # Fail instead of appending bytes of a different version of the object
+            request['IfMatch'] = file_info['etag']
+        if offset:
+            request['Range'] = f"bytes={offset}-"
+            self.progress.emit(f"Resuming {local_path.name} at {offset / (1024 * 1024):.1f} MB")
+
+        try:
+            response = s3_client.get_object(**request)
+        except ClientError as e:
+            if not offset:
+                raise
+            self.progress.emit(f"Cannot resume {local_path.name} ({e.response['Error'].get('Code')}), restarting")
+            offset = 0
+            request.pop('Range')
+            request.pop('IfMatch', None)
+            response = s3_client.get_object(**request)
+
+        if offset and 'ContentRange' not in response:
+            # Range was ignored and the whole object is coming back
+            offset = 0
+
+        body = response['Body']
+        if tracker is not None:
+            tracker.skip(file_info, offset)
+            body = CountingReader(body, lambda n: tracker.add(file_info, n))
+        try:
+            with open(part, 'ab' if offset else 'wb') as f:
+                for chunk in iter(lambda: body.read(CHUNK_SIZE), b""):
+                    f.write(chunk)
+        finally:
+            body.close()
+
+        received = part.stat().st_size
+        if received != file_info['size']:
+            raise IOError(f"Incomplete download ({received}/{file_info['size']} bytes), will resume next time")
+
+        os.replace(part, local_path)
+        manifest.update(file_info, DOWNLOADED)
+
     def cancel(self):
         self._cancelled = True
 
 
+class S3BulkDownloadWorker(S3DownloadWorker):
+    """
+    Downloads every time slot of a date range (e.g. all scans of a case study)
+    through the same bounded, adaptive worker pool as a single-folder download.
+    Each slot goes to its own <product>_YYYY_MM_DD_HHMM folder under base_dir,
+    the same layout as downloading the folders one by one.
+    """
+
+    def __init__(self, bucket, product, start, end, cadence_minutes, base_dir, bands=None, **kwargs):
+        kwargs.setdefault('slot_root', base_dir)
+        super().__init__(bucket, None, base_dir, bands, **kwargs)
+        self.targets = [
+            (prefix, self.download_dir / "_".join(prefix.strip('/').split('/')))
+            for prefix in slot_prefixes(product, start, end, cadence_minutes)
+        ]
+
+
 class HimawariProcessorWorker(QThread):
     """Thread to run Himawari processing by calling external bg_*.py scripts"""
     progress = Signal(str)
@@ -201,13 +648,29 @@ class HimawariProcessorWorker(QThread):
     error = Signal(str)
     stats_update = Signal(dict)
  
-    def __init__(self, directory_path, process_mode="auto", create_rgb=True, force_simple=False, max_workers=8):
+    def __init__(self, directory_path, process_mode="auto", create_rgb=True, force_simple=False, max_workers=8,
+                 bands=None, decode_compressed=False, native_reader=False, compact_storage=False,
+                 region=None, decode_workers=None, memory_budget=None):
         super().__init__()
         self.directory_path = Path(directory_path)
         self.process_mode = process_mode
         self.create_rgb = create_rgb
         self.force_simple = force_simple
         self.max_workers = max_workers
+        # Only extract/decode these bands (band finished downloading while others
+        # are still arriving); products are left to the full run at the end
+        self.bands = sorted(bands) if bands else []
+        # Let bg_decode read .DAT.bz2 segments directly instead of extracting them first
+        self.decode_compressed = decode_compressed
+        # Decode with the NumPy HSD reader (hsd_reader.py) instead of satpy
+        self.native_reader = native_reader
+        # Save bands as scaled uint16 instead of float32
+        self.compact_storage = compact_storage
+        # Crop bands to this (lat_min, lat_max, lon_min, lon_max) box while decoding
+        self.region = region
+        # bg_decode --workers / --memory-budget (MB, 0 = no limit); None = its defaults
+        self.decode_workers = decode_workers
+        self.memory_budget = memory_budget
      
     def run(self):
         stats = {
@@ -229,14 +692,40 @@ class HimawariProcessorWorker(QThread):
             self.progress.emit(f"Starting Himawari processing in: {self.directory_path}")
             self.progress.emit(f"Processing mode: {self.process_mode}")
             self.progress.emit(f"Max concurrent workers: {self.max_workers}")
+
+            band_args = []
+            if self.bands:
+                band_list = ",".join(f"{band:02d}" for band in self.bands)
+                band_args = ["--bands", band_list]
+                self.progress.emit(f"Bands: {band_list}")
+            decode_args = ["--compressed"] if self.decode_compressed else []
+            if self.native_reader:
+                decode_args += ["--reader", "native"]
+            if self.compact_storage:
+                decode_args += ["--storage", "uint16"]
+            if self.decode_workers:
+                decode_args += ["--workers", str(self.decode_workers)]
+            if self.memory_budget is not None:
+                decode_args += ["--memory-budget", str(self.memory_budget)]
+            if self.decode_workers or self.memory_budget is not None:
+                self.progress.emit(f"Decode workers: {self.decode_workers or 'default'} | "
+                                   f"Memory budget: {self.memory_budget or 'unlimited'} MB")
+            if self.region:
+                decode_args += ["--region", ",".join(str(v) for v in self.region)]
+                self.progress.emit(f"Sector mode: lat {self.region[0]}..{self.region[1]}, "
+                                   f"lon {self.region[2]}..{self.region[3]}")
          
             if self.process_mode == "auto":
                 self.progress.emit("Step 1: Extracting .bz2 files...")
                 extract_script = script_dir / "bg_extract.py"
-                if extract_script.exists():
+                if self.decode_compressed and not self.force_simple:
+                    self.progress.emit("Decoding straight from .bz2, skipping extraction")
+                elif not any(self.matches_bands(f) for f in Path(self.directory_path).rglob("*.bz2")):
+                    self.progress.emit("No .bz2 files left (decompressed during download), skipping extraction")
+                elif extract_script.exists():
                     extract_result = self.run_external_script(
                         extract_script, 
-                        ["-i", str(self.directory_path), "--max-workers", str(self.max_workers)]
+                        ["-i", str(self.directory_path), "--max-workers", str(self.max_workers)] + band_args
                     )
                     stats.update(self.parse_script_output(extract_result.stdout, "extract"))
                 else:
@@ -250,7 +739,7 @@ class HimawariProcessorWorker(QThread):
                     if decode_script.exists():
                         decode_result = self.run_external_script(
                             decode_script,
-                            ["-i", str(self.directory_path)]
+                            ["-i", str(self.directory_path)] + band_args + decode_args
                         )
                         stats.update(self.parse_script_output(decode_result.stdout, "combine"))
                      
@@ -258,7 +747,7 @@ class HimawariProcessorWorker(QThread):
                     else:
                         self.error.emit(f"Decoding script not found: {decode_script}")
              
-                if self.create_rgb and not self.force_simple:
+                if self.create_rgb and not self.force_simple and not self.bands:
                     self.progress.emit("Step 3: Creating RGB products...")
                     product_script = script_dir / "bg_product.py"
                     if product_script.exists():
@@ -302,7 +791,7 @@ class HimawariProcessorWorker(QThread):
                 if decode_script.exists():
                     decode_result = self.run_external_script(
                         decode_script,
-                        ["-i", str(self.directory_path)]
+                        ["-i", str(self.directory_path)] + decode_args
                     )
                     stats.update(self.parse_script_output(decode_result.stdout, "combine"))
                  
@@ -470,16 +959,30 @@ class HimawariProcessorWorker(QThread):
      
         return stats
  
+    def matches_bands(self, path):
+        """True if the file belongs to one of the bands this job processes (or there is no band filter)"""
+        return not self.bands or any(f"_B{band:02d}_" in path.name for band in self.bands)
+
     def cleanup_dat_files(self, directory_path):
-        """Delete .dat files after successful decoding"""
+        """Delete the .dat files of bands whose GeoTIFF bg_decode recorded as complete"""
         try:
             dat_files = []
             for ext in ['.dat', '.DAT']:
-                dat_files.extend(list(directory_path.rglob(f"*{ext}")))
+                dat_files.extend(f for f in directory_path.rglob(f"*{ext}") if self.matches_bands(f))
          
             deleted_count = 0
+            manifests = {}
          
             for dat_file in dat_files:
+                parsed = parse_segment(dat_file.name)
+                if parsed is None:
+                    continue
+                folder = dat_file.parent
+                if folder not in manifests:
+                    manifests[folder] = ProcessManifest(folder)
+                # A band that failed to decode keeps its segments for the next run
+                if not manifests[folder].is_complete(folder / f"B{parsed[0]:02d}.tif"):
+                    continue
                 try:
                     dat_file.unlink()
                     deleted_count += 1
@@ -493,6 +996,64 @@ class HimawariProcessorWorker(QThread):
             self.progress.emit(f"Warning: Could not clean up .dat files: {str(e)}")
 
 
+class BulkDownloadDialog(QDialog):
+    """Ask for the product, UTC date range and cadence of a bulk download"""
+
+    def __init__(self, parent, satellite, bands, start, end):
+        super().__init__(parent)
+        self.setWindowTitle("Bulk Download (Date Range)")
+
+        layout = QFormLayout(self)
+        layout.addRow("Satellite:", QLabel(satellite))
+        layout.addRow("Bands:", QLabel(", ".join(f"B{b:02d}" for b in sorted(bands)) or "none selected"))
+
+        self.product_edit = QLineEdit("AHI-L1b-FLDK")
+        layout.addRow("Product:", self.product_edit)
+
+        utc = QTimeZone(b"UTC")
+        self.start_edit = QDateTimeEdit(QDateTime(start.date(), start.time(), utc))
+        self.end_edit = QDateTimeEdit(QDateTime(end.date(), end.time(), utc))
+        for edit in (self.start_edit, self.end_edit):
+            edit.setTimeZone(utc)
+            edit.setDisplayFormat("yyyy-MM-dd HH:mm 'UTC'")
+            edit.setCalendarPopup(True)
+            edit.dateTimeChanged.connect(self.update_summary)
+        layout.addRow("Start:", self.start_edit)
+        layout.addRow("End:", self.end_edit)
+
+        self.cadence_spin = QSpinBox()
+        self.cadence_spin.setRange(10, 1440)
+        self.cadence_spin.setSingleStep(10)
+        self.cadence_spin.setValue(10)
+        self.cadence_spin.setSuffix(" min")
+        self.cadence_spin.valueChanged.connect(self.update_summary)
+        layout.addRow("Every:", self.cadence_spin)
+
+        self.summary_label = QLabel("")
+        layout.addRow(self.summary_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+        self.update_summary()
+
+    def values(self):
+        """Return (product, start, end, cadence_minutes) with UTC datetimes"""
+        start = datetime.fromtimestamp(self.start_edit.dateTime().toSecsSinceEpoch(), timezone.utc)
+        end = datetime.fromtimestamp(self.end_edit.dateTime().toSecsSinceEpoch(), timezone.utc)
+        cadence = self.cadence_spin.value() - self.cadence_spin.value() % 10
+        return self.product_edit.text().strip().strip('/'), start, end, cadence
+
+    def update_summary(self):
+        product, start, end, cadence = self.values()
+        if end < start:
+            self.summary_label.setText("End is before start")
+            return
+        slots = len(slot_prefixes(product or "x", start, end, cadence))
+        self.summary_label.setText(f"{slots} time slots")
+
+
 class HimawariFileManager(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -504,6 +1065,7 @@ class HimawariFileManager(QMainWindow):
 
         self.script_dir = Path(__file__).resolve().parent.parent
         self.default_download_dir = self.script_dir / "public" / "Download"
+        self.listing_cache = S3ListingCache(self.script_dir / "cache" / "s3_listings")
 
         self.satellites = {
             "Himawari 9": "noaa-himawari9",
@@ -513,7 +1075,11 @@ class HimawariFileManager(QMainWindow):
         self.current_bucket = "noaa-himawari9"
         self.current_prefix = ""
         self.current_path = []
+        self.current_directories = []
         self.all_files = []
+        self.filtered_file_count = 0
+        self.filtered_total_size = 0
+        self.listing_started = False
         self.selected_bands = list(range(1, 17))
 
         # RGB product definitions with icons
@@ -605,14 +1171,27 @@ class HimawariFileManager(QMainWindow):
         }
 
         self.lister = None
+        self.prefetchers = []
+        self.prefetch_workers = 3
         self.download_worker = None
         self.processor_worker = None
+        # Processing jobs waiting for the running one: (directory, mode, bands)
+        self.processing_queue = []
+        self.processing_job_bands = []
 
         self.auto_process = True
         self.process_mode = "auto"
         self.create_rgb = True
         self.force_simple = False
 
+        # None = full disk, otherwise (lat_min, lat_max, lon_min, lon_max)
+        self.region_bbox = None
+        self.decompress_on_download = False
+        self.decode_compressed = False
+        self.native_reader = False
+        self.compact_storage = False
+        self.decode_region = False
+
         self.selected_products = ["All RGB"]
 
         self.init_ui()
@@ -917,10 +1496,85 @@ class HimawariFileManager(QMainWindow):
         dir_layout.addWidget(browse_btn)
         download_layout.addLayout(dir_layout)
 
+        region_layout = QHBoxLayout()
+        region_layout.addWidget(QLabel("Region:"))
+
+        self.region_combo = QComboBox()
+        self.region_combo.addItem("Full Disk", None)
+        for name in REGIONS:
+            self.region_combo.addItem(name.replace("_", " ").title(), name)
+        self.region_combo.addItem("Custom", "custom")
+        self.region_combo.currentIndexChanged.connect(self.on_region_changed)
+        self.region_combo.setStyleSheet("""
+            QComboBox {
+                background: #2D2D2D;
+                color: #EEE;
+                border: 1px solid #444;
+                border-radius: 3px;
+                padding: 3px;
+                font-size: 11px;
+            }
+        """)
+        region_layout.addWidget(self.region_combo, 1)
+
+        self.region_edit = QLineEdit()
+        self.region_edit.setPlaceholderText("lat_min, lat_max, lon_min, lon_max")
+        self.region_edit.setVisible(False)
+        self.region_edit.editingFinished.connect(self.on_region_changed)
+        region_layout.addWidget(self.region_edit, 2)
+        download_layout.addLayout(region_layout)
+
         self.estimated_size_label = QLabel("Estimated: 0 MB")
         self.estimated_size_label.setStyleSheet("color: #4CAF50; font-size: 11px; font-weight: bold; padding: 2px 0;")
         download_layout.addWidget(self.estimated_size_label)
 
+        self.decompress_checkbox = QCheckBox("Decompress while downloading (.bz2 -> .DAT)")
+        self.decompress_checkbox.setChecked(self.decompress_on_download)
+        self.decompress_checkbox.setToolTip("Saves the extraction step, but an interrupted download "
+                                            "starts over instead of resuming")
+        self.decompress_checkbox.setStyleSheet("color: #EEE; font-size: 11px;")
+        self.decompress_checkbox.stateChanged.connect(self.on_decompress_changed)
+        download_layout.addWidget(self.decompress_checkbox)
+
+        self.decode_compressed_checkbox = QCheckBox("Decode straight from .bz2 (skip extraction)")
+        self.decode_compressed_checkbox.setChecked(self.decode_compressed)
+        self.decode_compressed_checkbox.setToolTip("Satpy reads the .DAT.bz2 segments itself, so no .DAT copies "
+                                                   "of the whole download are written to disk")
+        self.decode_compressed_checkbox.setStyleSheet("color: #EEE; font-size: 11px;")
+        self.decode_compressed_checkbox.stateChanged.connect(self.on_decode_compressed_changed)
+        download_layout.addWidget(self.decode_compressed_checkbox)
+
+        self.native_reader_checkbox = QCheckBox("Fast native decoder (NumPy instead of Satpy)")
+        self.native_reader_checkbox.setChecked(self.native_reader)
+        self.native_reader_checkbox.setToolTip("Reads the HSD segments and calibrates them with NumPy; "
+                                               "same GeoTIFFs as Satpy, much faster")
+        self.native_reader_checkbox.setStyleSheet("color: #EEE; font-size: 11px;")
+        self.native_reader_checkbox.stateChanged.connect(self.on_native_reader_changed)
+        download_layout.addWidget(self.native_reader_checkbox)
+
+        self.compact_storage_checkbox = QCheckBox("Compact band storage (16-bit, 0.01 K / 0.01 % steps)")
+        self.compact_storage_checkbox.setChecked(self.compact_storage)
+        self.compact_storage_checkbox.setToolTip("Decoded bands take half the disk space and memory of float32; "
+                                                 "values stay within 0.005 K / 0.005 % of the originals")
+        self.compact_storage_checkbox.setStyleSheet("color: #EEE; font-size: 11px;")
+        self.compact_storage_checkbox.stateChanged.connect(self.on_compact_storage_changed)
+        download_layout.addWidget(self.compact_storage_checkbox)
+
+        self.decode_region_checkbox = QCheckBox("Decode only the selected region (sector mode)")
+        self.decode_region_checkbox.setChecked(self.decode_region)
+        self.decode_region_checkbox.setToolTip("Bands are cropped to the region while decoding instead of "
+                                               "keeping the whole downloaded strip; no effect on full disk")
+        self.decode_region_checkbox.setStyleSheet("color: #EEE; font-size: 11px;")
+        self.decode_region_checkbox.stateChanged.connect(self.on_decode_region_changed)
+        download_layout.addWidget(self.decode_region_checkbox)
+
+        self.extract_on_arrival_checkbox = QCheckBox("Extract each .bz2 as soon as it is downloaded")
+        self.extract_on_arrival_checkbox.setChecked(True)
+        self.extract_on_arrival_checkbox.setToolTip("Used when not decompressing while downloading: keeps downloads "
+                                                    "resumable while extraction overlaps with them")
+        self.extract_on_arrival_checkbox.setStyleSheet("color: #EEE; font-size: 11px;")
+        download_layout.addWidget(self.extract_on_arrival_checkbox)
+
         processing_layout = QVBoxLayout()
 
         self.auto_process_checkbox = QCheckBox("Auto-process after download")
@@ -960,6 +1614,26 @@ class HimawariFileManager(QMainWindow):
         self.force_simple_checkbox.stateChanged.connect(self.on_force_simple_changed)
         processing_layout.addWidget(self.force_simple_checkbox)
 
+        decode_layout = QHBoxLayout()
+        decode_layout.addWidget(QLabel("Decode workers:"))
+        self.decode_workers_spin = QSpinBox()
+        self.decode_workers_spin.setRange(1, os.cpu_count() or 1)
+        self.decode_workers_spin.setValue(min(4, os.cpu_count() or 1))
+        self.decode_workers_spin.setFixedWidth(70)
+        self.decode_workers_spin.setToolTip("Bands decoded in parallel, each in its own process")
+        decode_layout.addWidget(self.decode_workers_spin)
+        decode_layout.addWidget(QLabel("Memory budget (MB):"))
+        self.memory_budget_spin = QSpinBox()
+        self.memory_budget_spin.setRange(0, 1024 * 1024)
+        self.memory_budget_spin.setSingleStep(1024)
+        self.memory_budget_spin.setValue(8192)
+        self.memory_budget_spin.setFixedWidth(80)
+        self.memory_budget_spin.setToolTip("Approximate memory the parallel band decodes may use together; "
+                                           "fewer bands run at once if they would not fit. 0 = no limit")
+        decode_layout.addWidget(self.memory_budget_spin)
+        decode_layout.addStretch()
+        processing_layout.addLayout(decode_layout)
+
         download_layout.addLayout(processing_layout)
 
         concurrent_layout = QHBoxLayout()
@@ -969,9 +1643,26 @@ class HimawariFileManager(QMainWindow):
         self.concurrent_spin.setValue(8)
         self.concurrent_spin.setFixedWidth(70)
         concurrent_layout.addWidget(self.concurrent_spin)
+        self.adaptive_checkbox = QCheckBox("Adaptive")
+        self.adaptive_checkbox.setChecked(True)
+        self.adaptive_checkbox.setToolTip("Adjust the number of parallel downloads (up to the maximum) from measured throughput")
+        self.adaptive_checkbox.setStyleSheet("color: #EEE; font-size: 11px;")
+        concurrent_layout.addWidget(self.adaptive_checkbox)
         concurrent_layout.addStretch()
         download_layout.addLayout(concurrent_layout)
 
+        store_layout = QHBoxLayout()
+        store_layout.addWidget(QLabel("Object store limit (GB):"))
+        self.store_limit_spin = QSpinBox()
+        self.store_limit_spin.setRange(0, 10000)
+        self.store_limit_spin.setValue(50)
+        self.store_limit_spin.setFixedWidth(70)
+        self.store_limit_spin.setToolTip("Downloaded files are kept once in <Save to>/.store and linked into "
+                                         "each time slot folder; 0 = no limit")
+        store_layout.addWidget(self.store_limit_spin)
+        store_layout.addStretch()
+        download_layout.addLayout(store_layout)
+
         right_layout.addWidget(download_group)
 
         # ===== PRODUCTS SELECTION - GRID LAYOUT LIKE BANDS =====
@@ -1190,6 +1881,27 @@ class HimawariFileManager(QMainWindow):
         self.download_btn.clicked.connect(self.download_filtered)
         right_layout.addWidget(self.download_btn)
 
+        self.bulk_download_btn = QPushButton("Bulk download (date range)...")
+        self.bulk_download_btn.setStyleSheet("""
+            QPushButton {
+                background: #37474F;
+                color: white;
+                font-size: 11px;
+                border-radius: 4px;
+                padding: 6px;
+                border: 1px solid #555;
+            }
+            QPushButton:hover {
+                background: #455A64;
+            }
+            QPushButton:disabled {
+                background: #444;
+                color: #777;
+            }
+        """)
+        self.bulk_download_btn.clicked.connect(self.open_bulk_download)
+        right_layout.addWidget(self.bulk_download_btn)
+
         # Statistics
         stats_group = QGroupBox("Statistics")
         stats_group.setStyleSheet("""
@@ -1247,6 +1959,11 @@ class HimawariFileManager(QMainWindow):
         """)
         main_layout.addWidget(self.progress_bar)
 
+        self.transfer_label = QLabel("")
+        self.transfer_label.setVisible(False)
+        self.transfer_label.setStyleSheet("color: #AAA; font-size: 11px;")
+        main_layout.addWidget(self.transfer_label)
+
         self.process_progress_bar = QProgressBar()
         self.process_progress_bar.setVisible(False)
         self.process_progress_bar.setStyleSheet("""
@@ -1299,23 +2016,51 @@ class HimawariFileManager(QMainWindow):
         if not self.current_path:
             return base_dir
 
-        satellite_name = self.current_bucket.replace("noaa-", "")
-        subfolder = "_".join(self.current_path)
-        local_path = base_dir / satellite_name / subfolder
-        return local_path
+        info = parse_prefix(self.current_prefix)
+        if info is None or info['depth'] != 'slot':
+            # Above slot level, downloads are spread over the slot folders
+            return self.satellite_dir()
+        return self.satellite_dir() / "_".join(self.current_path)
+
+    def get_local_processing_dirs(self):
+        """
+        Existing local folders holding the data of the current S3 view: its slot
+        folder, or above slot level the slot folders under the prefix (not every
+        slot ever downloaded for the satellite).
+        """
+        target_dir = self.get_local_path_from_current_prefix()
+        info = parse_prefix(self.current_prefix) if self.current_path else None
+        if info is None or info['depth'] in ('root', 'slot'):
+            return [target_dir] if target_dir.exists() else []
+        if not target_dir.exists():
+            return []
+        pattern = "_".join(self.current_path) + "_*"
+        return sorted(d for d in target_dir.glob(pattern) if d.is_dir())
+
+    def satellite_dir(self):
+        """Folder holding the <product>_YYYY_MM_DD_HHMM slot folders of the current bucket"""
+        return Path(self.dir_edit.text()) / self.current_bucket.replace("noaa-", "")
+
+    def object_store(self):
+        return ObjectStore(Path(self.dir_edit.text()) / STORE_DIR, self.store_limit_spin.value() * GB)
+
+    def extract_on_arrival(self):
+        """Extract .bz2 files while the download runs, unless they are decompressed or decoded as .bz2 anyway"""
+        return (self.extract_on_arrival_checkbox.isChecked() and not self.decompress_on_download
+                and not self.decode_compressed)
 
     def update_manual_buttons_state(self):
         """Enable/disable manual processing buttons based on existence of the target local folder."""
-        target_dir = self.get_local_path_from_current_prefix()
-        exists = target_dir.exists()
+        exists = bool(self.get_local_processing_dirs())
         self.manual_extract_btn.setEnabled(exists)
         self.manual_combine_btn.setEnabled(exists)
         self.manual_rgb_btn.setEnabled(exists)
         self.manual_full_btn.setEnabled(exists)
 
     def run_manual_processing(self, process_mode):
-        """Manually trigger processing on the folder matching the current S3 view."""
+        """Manually trigger processing on the folder(s) matching the current S3 view."""
         target_dir = self.get_local_path_from_current_prefix()
+        target_dirs = self.get_local_processing_dirs()
 
         if not self.current_path:
             reply = QMessageBox.question(
@@ -1328,7 +2073,7 @@ class HimawariFileManager(QMainWindow):
             if reply == QMessageBox.No:
                 return
 
-        if not target_dir.exists():
+        if not target_dirs:
             QMessageBox.warning(
                 self,
                 "Directory Not Found",
@@ -1336,18 +2081,33 @@ class HimawariFileManager(QMainWindow):
             )
             return
 
-        if process_mode in ["extract_only", "auto"]:
-            bz2_files = list(target_dir.rglob("*.bz2"))
+        def find_files(pattern):
+            return [f for d in target_dirs for f in d.rglob(pattern)]
+
+        if process_mode == "extract_only":
+            bz2_files = find_files("*.bz2")
             if not bz2_files:
                 QMessageBox.information(self, "No Files",
                                       f"No .bz2 files found in:\n{target_dir}")
                 return
 
-        if process_mode in ["combine_only", "auto"]:
-            dat_files = list(target_dir.rglob("*.dat"))
+        if process_mode == "auto":
+            # Files decompressed while downloading arrive as .DAT, with no .bz2 left
+            input_files = find_files("*.bz2") + find_files("*.[dD][aA][tT]")
+            if not input_files:
+                QMessageBox.information(self, "No Files",
+                                      f"No .bz2 or .dat files found in:\n{target_dir}")
+                return
+
+        if process_mode == "combine_only":
+            dat_files = find_files("*.[dD][aA][tT]")
+            if self.decode_compressed:
+                # bg_decode --compressed reads .DAT.bz2 segments as they are
+                dat_files += find_files("*.[dD][aA][tT].bz2")
             if not dat_files:
+                kinds = ".dat or .DAT.bz2" if self.decode_compressed else ".dat"
                 QMessageBox.information(self, "No Files",
-                                      f"No .dat files found in:\n{target_dir}")
+                                      f"No {kinds} files found in:\n{target_dir}")
                 return
 
         if process_mode == "rgb_only":
@@ -1368,9 +2128,10 @@ class HimawariFileManager(QMainWindow):
             "rgb_only": "Generate RGB products only"
         }
 
-        self.log_message("INFO", f"Starting {process_names[process_mode]} in: {target_dir}")
         self.log_message("INFO", f"Selected products: {', '.join(self.selected_products)}")
-        self.start_processing(str(target_dir), process_mode)
+        for job_dir in target_dirs:
+            self.log_message("INFO", f"Starting {process_names[process_mode]} in: {job_dir}")
+            self.start_processing(str(job_dir), process_mode, queue=len(target_dirs) > 1)
 
     def on_dir_double_clicked(self, item, column):
         """Navigate into a directory"""
@@ -1397,8 +2158,8 @@ class HimawariFileManager(QMainWindow):
             self.update_manual_buttons_state()
 
     def refresh_current(self):
-        """Refresh current directory"""
-        self.list_directory(self.current_prefix)
+        """Refresh current directory (always goes to S3, bypassing the listing cache)"""
+        self.list_directory(self.current_prefix, force_refresh=True)
         self.update_manual_buttons_state()
 
     def on_satellite_changed(self, satellite):
@@ -1504,6 +2265,26 @@ class HimawariFileManager(QMainWindow):
 
         return all(band in self.selected_bands for band in required_bands)
 
+    def download_band_priority(self):
+        """
+        Selected bands ordered by how many of the selected products need them,
+        so the bands that unblock the most products are downloaded first.
+        """
+        products = []
+        for name in self.selected_products:
+            info = self.rgb_products.get(name, {})
+            if info.get("type") == "all_rgb":
+                products.extend(p for p in self.rgb_products.values() if p.get("type") in ["rgb", "enhanced"])
+            else:
+                products.append(info)
+
+        uses = {band: 0 for band in self.selected_bands}
+        for info in products:
+            for band in info.get("required_bands", []):
+                if band in uses:
+                    uses[band] += 1
+        return sorted((band for band in uses if uses[band]), key=lambda band: (-uses[band], band))
+
     def get_missing_bands(self, product_info):
         """Get list of missing bands for a product"""
         required_bands = product_info.get("required_bands", [])
@@ -1564,6 +2345,66 @@ class HimawariFileManager(QMainWindow):
         status = "enabled" if self.force_simple else "disabled"
         self.log_message("INFO", f"Force simple combination {status}")
 
+    def on_decompress_changed(self):
+        """Handle decompress-while-downloading checkbox change"""
+        self.decompress_on_download = self.decompress_checkbox.isChecked()
+        status = "enabled" if self.decompress_on_download else "disabled"
+        self.log_message("INFO", f"Decompress while downloading {status}")
+
+    def on_decode_compressed_changed(self):
+        """Handle decode-from-.bz2 checkbox change"""
+        self.decode_compressed = self.decode_compressed_checkbox.isChecked()
+        status = "enabled" if self.decode_compressed else "disabled"
+        self.log_message("INFO", f"Decoding straight from .bz2 {status}")
+
+    def on_native_reader_changed(self):
+        """Handle native decoder checkbox change"""
+        self.native_reader = self.native_reader_checkbox.isChecked()
+        status = "enabled" if self.native_reader else "disabled"
+        self.log_message("INFO", f"Native HSD decoder {status}")
+
+    def on_compact_storage_changed(self):
+        """Handle compact band storage checkbox change"""
+        self.compact_storage = self.compact_storage_checkbox.isChecked()
+        status = "enabled" if self.compact_storage else "disabled"
+        self.log_message("INFO", f"Compact band storage {status}")
+
+    def on_decode_region_changed(self):
+        """Handle sector mode checkbox change"""
+        self.decode_region = self.decode_region_checkbox.isChecked()
+        status = "enabled" if self.decode_region else "disabled"
+        self.log_message("INFO", f"Sector-mode decoding {status}")
+
+    def on_region_changed(self):
+        """Handle region selection: only the segments covering the region are downloaded"""
+        region = self.region_combo.currentData()
+        self.region_edit.setVisible(region == "custom")
+
+        if region is None:
+            self.region_bbox = None
+        elif region == "custom":
+            # Until a valid box is entered, don't keep cropping to the previous region
+            text = self.region_edit.text().strip()
+            try:
+                self.region_bbox = resolve_region(text) if text else None
+            except ValueError as e:
+                self.region_bbox = None
+                self.log_message("ERROR", f"Invalid region: {e}")
+            if self.region_bbox is None:
+                self.log_message("WARNING", "Custom region: enter lat_min, lat_max, lon_min, lon_max "
+                                            "(using full disk until then)")
+                self.display_filtered_files()
+                return
+        else:
+            self.region_bbox = resolve_region(region)
+
+        if self.region_bbox:
+            self.log_message("INFO", f"Region set to lat {self.region_bbox[0]}..{self.region_bbox[1]}, "
+                                     f"lon {self.region_bbox[2]}..{self.region_bbox[3]}")
+        else:
+            self.log_message("INFO", "Region set to full disk")
+        self.display_filtered_files()
+
     def on_product_selection_changed(self):
         """Handle product checkbox changes"""
         sender = self.sender()
@@ -1667,20 +2508,28 @@ class HimawariFileManager(QMainWindow):
             for checkbox in self.product_checkboxes.values():
                 checkbox.blockSignals(False)
 
-    def list_directory(self, prefix):
+    def list_directory(self, prefix, force_refresh=False):
         """List directories and files in the given prefix"""
         if self.lister and self.lister.isRunning():
             return
 
+        # Speculative listings for the folder we are leaving are no longer useful
+        self.cancel_prefetch()
+
         self.dir_tree.clear()
-        self.files_table.setRowCount(0)
+        self.current_directories = []
         self.all_files = []
+        self.display_filtered_files()
 
         loading_item = QTreeWidgetItem(self.dir_tree)
         loading_item.setText(0, "Loading...")
         loading_item.setFlags(loading_item.flags() & ~Qt.ItemIsSelectable)
+        self.listing_started = False
 
-        self.lister = S3Lister(self.current_bucket, prefix)
+        # Sized for downloads too, so browsing and downloading share warm connections
+        s3_client = get_s3_client(self.concurrent_spin.value())
+        self.lister = S3Lister(self.current_bucket, prefix, cache=self.listing_cache,
+                               s3_client=s3_client, force_refresh=force_refresh)
         self.lister.progress.connect(lambda msg: self.status_bar.showMessage(msg))
         self.lister.directories_found.connect(self.on_directories_found)
         self.lister.files_found.connect(self.on_files_found)
@@ -1690,8 +2539,11 @@ class HimawariFileManager(QMainWindow):
         self.lister.list_files = bool(prefix)
         self.lister.start()
 
-    def on_directories_found(self, directories):
-        """Populate directory tree with found directories"""
+    def start_directory_listing(self):
+        """Replace the loading placeholder once the first page of results arrives"""
+        if self.listing_started:
+            return
+        self.listing_started = True
         self.dir_tree.clear()
 
         if self.current_prefix:
@@ -1699,28 +2551,34 @@ class HimawariFileManager(QMainWindow):
             up_item.setText(0, ".. (Parent)")
             up_item.setData(0, Qt.UserRole, "..")
 
-        if directories:
-            directories.sort()
-            for dir_name in directories:
-                item = QTreeWidgetItem(self.dir_tree)
-                item.setText(0, f"📁 {dir_name}")
-                item.setData(0, Qt.UserRole, dir_name)
-        elif not self.current_prefix:
-            no_dirs_item = QTreeWidgetItem(self.dir_tree)
-            no_dirs_item.setText(0, "Select satellite to start")
-            no_dirs_item.setFlags(no_dirs_item.flags() & ~Qt.ItemIsSelectable)
+    def on_directories_found(self, directories):
+        """Append a page of found directories to the directory tree"""
+        self.start_directory_listing()
+        self.current_directories.extend(directories)
+
+        for dir_name in sorted(directories):
+            item = QTreeWidgetItem(self.dir_tree)
+            item.setText(0, f"📁 {dir_name}")
+            item.setData(0, Qt.UserRole, dir_name)
 
     def on_files_found(self, files):
-        """Store all files and display filtered ones"""
-        self.all_files = files
-        self.display_filtered_files()
+        """Store a page of files and display the ones matching the band filter"""
+        self.start_directory_listing()
+        self.all_files.extend(files)
+        self.append_filtered_files(files)
 
     def display_filtered_files(self):
         """Display files filtered by selected bands"""
+        self.files_table.setRowCount(0)
+        self.filtered_file_count = 0
+        self.filtered_total_size = 0
+        self.append_filtered_files(self.all_files)
+
+    def append_filtered_files(self, files):
+        """Append the files matching the band filter to the table and update totals"""
         filtered_files = []
-        total_size = 0
 
-        for file_info in self.all_files:
+        for file_info in files:
             filename = file_info['name']
 
             band_number = None
@@ -1729,10 +2587,16 @@ class HimawariFileManager(QMainWindow):
                     band_number = i
                     break
 
-            if band_number is None or band_number in self.selected_bands:
-                filtered_files.append((file_info, band_number))
-                total_size += file_info['size']
+            if band_number is not None and band_number not in self.selected_bands:
+                continue
+            if self.region_bbox and not segment_in_region(filename, self.region_bbox):
+                continue
+
+            filtered_files.append((file_info, band_number))
+            self.filtered_total_size += file_info['size']
 
+        self.filtered_file_count += len(filtered_files)
+        total_size = self.filtered_total_size
         total_mb = total_size / (1024 * 1024)
         total_gb = total_size / (1024 * 1024 * 1024)
 
@@ -1742,7 +2606,7 @@ class HimawariFileManager(QMainWindow):
             size_text = f"{total_mb:.1f} MB"
 
         self.size_label.setText(size_text)
-        self.file_count_label.setText(f"{len(filtered_files)}/{len(self.all_files)} files")
+        self.file_count_label.setText(f"{self.filtered_file_count}/{len(self.all_files)} files")
 
         if len(self.selected_bands) == 0:
             self.estimated_size_label.setText("Estimated: 0 MB (no bands selected)")
@@ -1751,9 +2615,10 @@ class HimawariFileManager(QMainWindow):
         else:
             self.estimated_size_label.setText(f"Estimated: {total_mb:.1f} MB")
 
-        self.files_table.setRowCount(len(filtered_files))
+        first_row = self.files_table.rowCount()
+        self.files_table.setRowCount(first_row + len(filtered_files))
 
-        for row, (file_info, band_number) in enumerate(filtered_files):
+        for row, (file_info, band_number) in enumerate(filtered_files, start=first_row):
             filename = file_info['name']
             size_mb = file_info['size'] / (1024 * 1024)
             modified = file_info['last_modified'].strftime("%Y-%m-%d %H:%M")
@@ -1810,14 +2675,90 @@ class HimawariFileManager(QMainWindow):
                               "Please select at least one band to download.")
             return
 
-        path_parts = self.current_path.copy()
-        if not path_parts:
-            path_parts = ["root"]
-
-        download_dir = Path(self.dir_edit.text()) / self.current_bucket.replace("noaa-", "") / "_".join(path_parts)
+        # Objects of a time slot always land in that slot's folder, so the
+        # same scan is never stored twice whichever folder it was fetched from
+        download_dir = self.get_local_path_from_current_prefix()
         download_dir.mkdir(parents=True, exist_ok=True)
 
-        self.start_download(self.current_prefix, download_dir, self.selected_bands)
+        self.start_download(self.current_prefix, download_dir, self.selected_bands, self.region_bbox)
+
+    def open_bulk_download(self):
+        """Ask for a date range and download every time slot in it"""
+        if not self.selected_bands:
+            QMessageBox.warning(self, "No Bands Selected",
+                              "Please select at least one band to download.")
+            return
+
+        # Default to the day or time folder being browsed, else the last hour
+        info = parse_prefix(self.current_prefix) if self.current_prefix else None
+        if info and info['depth'] == 'day':
+            start, end = info['start'], info['end'] - timedelta(minutes=10)
+        elif info and info['depth'] == 'slot':
+            start, end = info['start'], info['start'] + timedelta(hours=1)
+        else:
+            end = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(minutes=20)
+            start = end - timedelta(hours=1)
+
+        dialog = BulkDownloadDialog(self, self.sat_combo.currentText(), self.selected_bands, start, end)
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        product, start, end, cadence = dialog.values()
+        if not product or end < start:
+            QMessageBox.warning(self, "Invalid Range", "Please enter a product and an end time after the start time.")
+            return
+        self.start_bulk_download(product, start, end, cadence)
+
+    def start_bulk_download(self, product, start, end, cadence):
+        if self.download_worker and self.download_worker.isRunning():
+            QMessageBox.warning(self, "Download in Progress",
+                              "Please wait for current download to complete.")
+            return
+
+        base_dir = self.satellite_dir()
+        max_workers = self.concurrent_spin.value()
+
+        self.download_worker = S3BulkDownloadWorker(
+            self.current_bucket, product, start, end, cadence, base_dir, self.selected_bands,
+            max_workers=max_workers, bbox=self.region_bbox, decompress=self.decompress_on_download,
+            band_priority=self.download_band_priority(), adaptive=self.adaptive_checkbox.isChecked(),
+            store=self.object_store(), extract=self.extract_on_arrival()
+        )
+        self.log_message("INFO", f"Bulk download: {product} {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M} UTC, "
+                                 f"every {cadence} min ({len(self.download_worker.targets)} slots)")
+        self.log_message("INFO", f"Selected bands: {', '.join([f'B{b}' for b in self.selected_bands])}")
+
+        self.download_worker.progress.connect(lambda msg: self.log_message("INFO", msg))
+        self.download_worker.file_progress.connect(self.on_file_progress)
+        self.download_worker.transfer_stats.connect(self.on_transfer_stats)
+        self.download_worker.target_complete.connect(self.on_slot_downloaded)
+        self.download_worker.finished.connect(self.on_bulk_download_finished)
+        self.download_worker.error.connect(lambda msg: self.log_message("ERROR", msg))
+        self.download_worker.start()
+
+        self.download_btn.setEnabled(False)
+        self.bulk_download_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 100)
+
+    def on_slot_downloaded(self, slot_dir, success):
+        """A time slot of a bulk job is complete: process it while the next ones download"""
+        if success and self.auto_process:
+            self.start_processing(slot_dir, self.process_mode, queue=True)
+
+    def on_bulk_download_finished(self, success, base_dir):
+        self.progress_bar.setVisible(False)
+        self.progress_bar.setValue(0)
+        self.transfer_label.setVisible(False)
+        self.download_btn.setEnabled(True)
+        self.bulk_download_btn.setEnabled(True)
+
+        if success:
+            self.log_message("SUCCESS", f"Bulk download completed to: {base_dir}")
+            if not self.auto_process:
+                QMessageBox.information(self, "Success", f"Bulk download completed to:\n{base_dir}")
+        else:
+            QMessageBox.warning(self, "Error", "Bulk download failed. Check status messages.")
 
     def download_single_file(self, file_info):
         """Download a single file"""
@@ -1831,14 +2772,12 @@ class HimawariFileManager(QMainWindow):
             return
 
         try:
-            s3_client = boto3.client(
-                's3',
-                config=Config(signature_version=UNSIGNED)
-            )
+            s3_client = get_s3_client(self.concurrent_spin.value())
             s3_client.download_file(
                 Bucket=self.current_bucket,
                 Key=file_info['key'],
-                Filename=save_path
+                Filename=save_path,
+                Config=TRANSFER_CONFIG
             )
             self.log_message("SUCCESS", f"Downloaded: {file_info['name']}")
             QMessageBox.information(self, "Success", f"Downloaded {file_info['name']}")
@@ -1846,7 +2785,7 @@ class HimawariFileManager(QMainWindow):
             self.log_message("ERROR", f"Failed to download {file_info['name']}: {str(e)}")
             QMessageBox.warning(self, "Error", f"Failed to download {file_info['name']}")
 
-    def start_download(self, prefix, download_dir, bands):
+    def start_download(self, prefix, download_dir, bands, bbox=None):
         if self.download_worker and self.download_worker.isRunning():
             QMessageBox.warning(self, "Download in Progress",
                               "Please wait for current download to complete.")
@@ -1856,8 +2795,24 @@ class HimawariFileManager(QMainWindow):
 
         self.log_message("INFO", f"Starting parallel download ({max_workers} concurrent) from: s3://{self.current_bucket}/{prefix}")
         self.log_message("INFO", f"Selected bands: {', '.join([f'B{b}' for b in bands])}")
-
-        self.download_worker = S3DownloadWorker(self.current_bucket, prefix, download_dir, bands, max_workers)
+        if bbox:
+            self.log_message("INFO", f"Region: lat {bbox[0]}..{bbox[1]}, lon {bbox[2]}..{bbox[3]} (matching segments only)")
+
+        if self.decompress_on_download:
+            self.log_message("INFO", "Decompressing .bz2 files while downloading")
+
+        band_priority = self.download_band_priority()
+        if band_priority:
+            self.log_message("INFO", f"Priority bands: {', '.join(f'B{b:02d}' for b in band_priority)}")
+
+        self.download_worker = S3DownloadWorker(self.current_bucket, prefix, download_dir, bands, max_workers, bbox,
+                                                self.decompress_on_download, band_priority,
+                                                self.adaptive_checkbox.isChecked(),
+                                                slot_root=self.satellite_dir(), store=self.object_store(),
+                                                extract=self.extract_on_arrival())
+        self.download_worker.transfer_stats.connect(self.on_transfer_stats)
+        if self.auto_process and self.process_mode == "auto" and not self.force_simple:
+            self.download_worker.band_complete.connect(self.on_band_complete)
         self.download_worker.progress.connect(lambda msg: self.log_message("INFO", msg))
         self.download_worker.file_progress.connect(self.on_file_progress)
         self.download_worker.finished.connect(self.on_download_finished)
@@ -1865,37 +2820,87 @@ class HimawariFileManager(QMainWindow):
         self.download_worker.start()
 
         self.download_btn.setEnabled(False)
+        self.bulk_download_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 100)
 
     def on_file_progress(self, current, total, filename):
-        progress = int((current / total) * 100) if total > 0 else 0
-        self.progress_bar.setValue(progress)
-        self.status_bar.showMessage(f"Downloading {filename} ({current}/{total})")
+        # The progress bar follows bytes (on_transfer_stats); this is just the file count
+        self.status_bar.showMessage(f"Downloaded {current}/{total} files (last: {filename})")
+
+    def on_transfer_stats(self, stats):
+        """Show live byte progress, throughput, ETA and per-band completion of the running download"""
+        done_mb = stats['bytes_done'] / MB
+        total_mb = stats['bytes_total'] / MB
+        if stats['bytes_total'] > 0:
+            self.progress_bar.setValue(int(stats['bytes_done'] * 100 / stats['bytes_total']))
+
+        text = (
+            f"{stats['active']}/{stats['concurrency']} connections (max {stats['max_workers']}) | "
+            f"{stats['mbps']:.1f} MB/s ({stats['per_connection_mbps']:.1f} MB/s each) | "
+            f"{done_mb:.0f}/{total_mb:.0f} MB | ETA {format_eta(stats['eta'])}"
+        )
+        bands = stats.get('bands', {})
+        if bands:
+            complete = sum(1 for b in bands.values() if b['files_done'] == b['files_total'])
+            pending = [
+                f"B{band:02d} {b['files_done']}/{b['files_total']}"
+                for band, b in sorted(bands.items()) if b['files_done'] < b['files_total']
+            ]
+            text += f"\nBands {complete}/{len(bands)} complete"
+            if pending:
+                text += " | " + ", ".join(pending[:6]) + (" ..." if len(pending) > 6 else "")
+        self.transfer_label.setText(text)
+        self.transfer_label.setVisible(True)
+
+    def on_band_complete(self, band, download_path):
+        """All segments of a band are on disk: decode it while the other bands download"""
+        self.log_message("INFO", f"B{band:02d} downloaded, queueing its extraction/decoding")
+        self.start_processing(download_path, "auto", bands=[band], queue=True)
 
     def on_download_finished(self, success, download_path):
         self.progress_bar.setVisible(False)
+        self.transfer_label.setVisible(False)
         self.progress_bar.setValue(0)
         self.download_btn.setEnabled(True)
+        self.bulk_download_btn.setEnabled(True)
 
         if success:
             self.log_message("SUCCESS", f"Download completed successfully to: {download_path}")
             if self.auto_process and download_path:
                 self.log_message("INFO", "Starting auto-processing of downloaded files...")
-                self.log_message("INFO", f"Auto-processing directory: {download_path}")
-                self.start_processing(download_path, self.process_mode)
+                # A day (or longer) download is spread over slot folders: process
+                # each of those, not everything ever downloaded under download_path
+                job_dirs = self.download_worker.job_dirs or [Path(download_path)]
+                for job_dir in job_dirs:
+                    self.log_message("INFO", f"Auto-processing directory: {job_dir}")
+                    self.start_processing(str(job_dir), self.process_mode, queue=True)
             else:
                 QMessageBox.information(self, "Success",
                                       f"Download completed to:\n{download_path}")
         else:
             QMessageBox.warning(self, "Error", "Download failed. Check status messages.")
 
-    def start_processing(self, directory_path, process_mode="auto"):
-        """Start Himawari processing"""
+    def start_processing(self, directory_path, process_mode="auto", bands=None, queue=False):
+        """
+        Start Himawari processing. With queue=True the job waits for the running
+        one instead of being refused; band jobs for the same folder are merged.
+        """
         if self.processor_worker and self.processor_worker.isRunning():
-            self.log_message("WARNING", "Processing already in progress")
+            if not queue:
+                self.log_message("WARNING", "Processing already in progress")
+                return
+            for queued_dir, queued_mode, queued_bands in self.processing_queue:
+                if bands and queued_bands and queued_dir == directory_path and queued_mode == process_mode:
+                    queued_bands.extend(b for b in bands if b not in queued_bands)
+                    break
+            else:
+                self.processing_queue.append((directory_path, process_mode, list(bands) if bands else None))
+            self.log_message("INFO", f"Processing queued ({len(self.processing_queue)} waiting)")
             return
 
+        self.processing_job_bands = list(bands) if bands else []
+
         create_rgb = any(
             product in self.selected_products and
             self.rgb_products.get(product, {}).get("type") in ["rgb", "all_rgb", "enhanced"]
@@ -1909,7 +2914,14 @@ class HimawariFileManager(QMainWindow):
             process_mode,
             create_rgb,
             self.force_simple,
-            max_workers
+            max_workers,
+            self.processing_job_bands,
+            self.decode_compressed,
+            self.native_reader,
+            self.compact_storage,
+            self.region_bbox if self.decode_region else None,
+            self.decode_workers_spin.value(),
+            self.memory_budget_spin.value()
         )
         self.processor_worker.progress.connect(lambda msg: self.log_message("PROCESS", msg))
         self.processor_worker.finished.connect(self.on_processing_finished)
@@ -1921,9 +2933,24 @@ class HimawariFileManager(QMainWindow):
         self.processor_worker.start()
 
     def on_processing_finished(self, success, directory_path):
-        self.process_progress_bar.setVisible(False)
+        self.processor_worker.wait()
+        job_bands = self.processing_job_bands
 
-        if success:
+        # Start the next queued job before any dialog below blocks the UI
+        if self.processing_queue:
+            directory, mode, bands = self.processing_queue.pop(0)
+            self.start_processing(directory, mode, bands)
+        else:
+            self.process_progress_bar.setVisible(False)
+
+        if job_bands:
+            # Early per-band job during a download: no dialog, the full run follows
+            bands = ", ".join(f"B{b:02d}" for b in job_bands)
+            if success:
+                self.log_message("SUCCESS", f"Decoded {bands} in: {directory_path}")
+            else:
+                self.log_message("ERROR", f"Processing {bands} failed")
+        elif success:
             self.log_message("SUCCESS", f"Processing completed in: {directory_path}")
             self.status_bar.showMessage("Processing completed successfully")
 
@@ -1980,7 +3007,45 @@ class HimawariFileManager(QMainWindow):
         self.file_count_label.setText(f"Error: {error_msg}")
 
     def on_list_finished(self):
-        self.status_bar.showMessage("Ready")
+        got_results = self.listing_started
+
+        # Prefixes with no sub-folders and no files never emit a page
+        if not self.listing_started:
+            self.start_directory_listing()
+            if not self.current_prefix:
+                no_dirs_item = QTreeWidgetItem(self.dir_tree)
+                no_dirs_item.setText(0, "Select satellite to start")
+                no_dirs_item.setFlags(no_dirs_item.flags() & ~Qt.ItemIsSelectable)
+
+        stats = self.listing_cache.stats()
+        self.status_bar.showMessage(
+            f"Ready (listing cache: {stats['hits']} hits, {stats['misses']} misses)"
+        )
+
+        if got_results:
+            self.start_prefetch()
+
+    def start_prefetch(self):
+        """List the folders likely to be opened next in the background to warm the listing cache"""
+        prefixes = neighbour_prefixes(self.current_prefix, self.current_directories)
+        if not prefixes:
+            return
+
+        prefetcher = S3Prefetcher(self.current_bucket, prefixes, self.listing_cache, self.prefetch_workers,
+                                  s3_client=get_s3_client(self.concurrent_spin.value()))
+        prefetcher.progress.connect(lambda msg: self.log_message("INFO", msg))
+        prefetcher.finished.connect(lambda fetched, p=prefetcher: self.on_prefetch_finished(p, fetched))
+        self.prefetchers.append(prefetcher)
+        prefetcher.start()
+
+    def cancel_prefetch(self):
+        for prefetcher in self.prefetchers:
+            prefetcher.cancel()
+
+    def on_prefetch_finished(self, prefetcher, fetched):
+        prefetcher.wait()
+        if prefetcher in self.prefetchers:
+            self.prefetchers.remove(prefetcher)
 
     def select_all_bands(self):
         for checkbox in self.band_checkboxes.values():
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Himawari decode benchmark - satpy one Scene per band vs one Scene per time
+slot vs the native NumPy reader (hsd_reader)
+Runs bg_decode.decode_folders on a copy of real downloaded time slot folders
+(extracted .DAT or .DAT.bz2 segments), or on synthetic HSD segments written
+here, and reports wall time, segment MB/s and CPU per mode and worker count,
+so --reader / --scene-per-slot / --workers can be picked for a machine.
+
+The synthetic segments have real AHI header layouts, projection and
+calibration blocks; only the counts are made up. validate_hsd.py uses them
+to check the native reader against satpy.
+
+CPU time includes the pool's child processes where the OS reports it (not on
+Windows).
+
+Example:
+    python bench_decode.py -i "D:/Himawari/himawari9/AHI-L1b-FLDK_2024_01_15_0000" --workers 1,4
+    python bench_decode.py --synthetic-scale 0.5 --bands 03 13
+"""
+
+import argparse
+import bz2
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+MB = 1024 * 1024
+
+# mode -> (bg_decode reader, one Scene per slot)
+MODES = {
+    "band": ("satpy", False),
+    "slot": ("satpy", True),
+    "native": ("native", False),
+}
+
+
+# ============================================================================
+# SYNTHETIC DATASET
+# ============================================================================
+
+ERROR_COUNT = 65535
+OUTSIDE_SCAN_COUNT = 65534
+
+# Calibration block values of the order found in real AHI headers
+SYNTHETIC_CALIBRATION = {
+    "vis": {'central_wave_length': 0.64, 'valid_bits': 11, 'gain': 0.2, 'offset': -4.0,
+            'albedo': 0.0019, 'cali_gain': 0.198, 'cali_offset': -3.9},
+    "ir": {'central_wave_length': 10.4, 'valid_bits': 12, 'gain': -0.0037, 'offset': 15.1,
+           'c0': -0.1215, 'c1': 1.0006, 'c2': -1.3e-6},
+}
+
+
+def header_block(dtype, number, **values):
+    block = np.zeros(1, dtype=dtype)
+    block['hblock_number'] = number
+    block['blocklength'] = dtype.itemsize
+    for name, value in values.items():
+        block[name] = value
+    return block.tobytes()
+
+
+def segment_header(band, segment, total_segments, columns, start_time):
+    """Header blocks 1-11 of a synthetic HSD segment of `columns` x `columns / total_segments` counts"""
+    import hsd_reader as hsd
+    from himawari_geo import BAND_RESOLUTION, GRIDS, SUB_LON, SAT_DISTANCE, EARTH_EQ_RADIUS, EARTH_POLAR_RADIUS
+
+    resolution = BAND_RESOLUTION[band]
+    full_columns, factor, _ = GRIDS[resolution]
+    lines = columns // total_segments
+    mjd = (start_time - datetime(1858, 11, 17)).total_seconds() / 86400
+    is_vis = band < hsd.FIRST_IR_BAND
+    cal = SYNTHETIC_CALIBRATION["vis" if is_vis else "ir"]
+
+    cal_dtype = hsd.VIS_CAL if is_vis else hsd.IR_CAL
+    cal_part = np.zeros(1, dtype=cal_dtype)
+    if is_vis:
+        cal_part['coeff_rad2albedo_conversion'] = cal['albedo']
+        cal_part['cali_gain_count2rad_conversion'] = cal['cali_gain']
+        cal_part['cali_offset_count2rad_conversion'] = cal['cali_offset']
+    else:
+        for i in range(3):
+            cal_part[f'c{i}_rad2tb_conversion'] = cal[f'c{i}']
+        cal_part['speed_of_light'] = 2.99792458e8
+        cal_part['planck_constant'] = 6.62606957e-34
+        cal_part['boltzmann_constant'] = 1.3806488e-23
+
+    # Empty navigation correction (8), observation time (9) and error (10)
+    # blocks plus the spare block (11), as the reader must skip them
+    trailer = (np.array([(8, 61)], dtype=[('n', 'u1'), ('l', '<u2')]).tobytes() + bytes(58)
+               + np.array([(9, 45)], dtype=[('n', 'u1'), ('l', '<u2')]).tobytes() + bytes(42)
+               + np.array([(10, 47)], dtype=[('n', 'u1'), ('l', '<u4')]).tobytes() + bytes(42)
+               + np.array([(11, 259)], dtype=[('n', 'u1'), ('l', '<u2')]).tobytes() + bytes(256))
+
+    blocks = [
+        None,
+        header_block(hsd.DATA_INFO, 2, number_of_bits_per_pixel=16, number_of_columns=columns,
+                     number_of_lines=lines),
+        header_block(hsd.PROJ_INFO, 3, sub_lon=SUB_LON, CFAC=round(factor * columns / full_columns),
+                     LFAC=round(factor * columns / full_columns), COFF=columns / 2 + 0.5, LOFF=columns / 2 + 0.5,
+                     distance_from_earth_center=SAT_DISTANCE, earth_equatorial_radius=EARTH_EQ_RADIUS,
+                     earth_polar_radius=EARTH_POLAR_RADIUS),
+        header_block(hsd.NAV_INFO, 4, navigation_info_time=mjd, SSP_longitude=SUB_LON,
+                     distance_earth_center_to_satellite=SAT_DISTANCE, nadir_longitude=SUB_LON),
+        # Block 5's length covers the band-specific calibration part
+        header_block(hsd.CAL_INFO, 5, blocklength=hsd.CAL_INFO.itemsize + cal_dtype.itemsize,
+                     band_number=band, central_wave_length=cal['central_wave_length'],
+                     valid_number_of_bits_per_pixel=cal['valid_bits'], count_value_error_pixels=ERROR_COUNT,
+                     count_value_outside_scan_pixels=OUTSIDE_SCAN_COUNT, gain_count2rad_conversion=cal['gain'],
+                     offset_count2rad_conversion=cal['offset']) + cal_part.tobytes(),
+        header_block(hsd.INTER_CAL_INFO, 6),
+        header_block(hsd.SEGMENT_INFO, 7, total_number_of_segments=total_segments,
+                     segment_sequence_number=segment, first_line_number_of_image_segment=(segment - 1) * lines + 1),
+    ]
+    header_length = hsd.BASIC_INFO.itemsize + sum(len(b) for b in blocks[1:]) + len(trailer)
+    blocks[0] = header_block(hsd.BASIC_INFO, 1, total_number_of_hblocks=11, satellite=b"Himawari-9",
+                             proc_center_name=b"MSC", observation_area=b"FLDK",
+                             observation_timeline=int(start_time.strftime("%H%M")),
+                             observation_start_time=mjd, observation_end_time=mjd + 10 / 1440,
+                             file_creation_time=mjd, total_header_length=header_length,
+                             total_data_length=columns * lines * 2, file_format_version=b"1.3")
+    return b"".join(blocks) + trailer
+
+
+def synthetic_counts(header, seed):
+    """Smooth count field over the Earth's disk, off-scan counts in space, a few error pixels"""
+    import hsd_reader as hsd
+
+    segment = hsd.read_header(header)
+    lines = int(segment['data']['number_of_lines'])
+    columns = int(segment['data']['number_of_columns'])
+    first_line = int(segment['segment']['first_line_number_of_image_segment'])
+    top = 1 << int(segment['cal']['valid_number_of_bits_per_pixel'])
+
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[first_line:first_line + lines, 1:columns + 1]
+    field = 0.5 + 0.35 * np.sin(x * 9.0 / columns + seed) * np.cos(y * 7.0 / columns)
+    counts = np.clip(field * top + rng.normal(0, top / 200, field.shape), 0, top - 1).astype('<u2')
+
+    disk = hsd.Geometry(segment).earth_mask(first_line, lines, 1, columns)
+    counts[~disk] = OUTSIDE_SCAN_COUNT
+    counts.flat[rng.integers(0, counts.size, counts.size // 10000)] = ERROR_COUNT
+    return counts
+
+
+def write_segment(path, band, segment, total_segments, columns, start_time, compressed=False):
+    header = segment_header(band, segment, total_segments, columns, start_time)
+    data = header + synthetic_counts(header, band * 100 + segment).tobytes()
+    Path(path).write_bytes(bz2.compress(data, 9) if compressed else data)
+
+
+def segment_name(band, segment, total_segments, start_time, compressed=False):
+    from himawari_geo import BAND_RESOLUTION
+    res_id = int(BAND_RESOLUTION[band] * 10)
+    return (f"HS_H09_{start_time:%Y%m%d_%H%M}_B{band:02d}_FLDK_R{res_id:02d}_"
+            f"S{segment:02d}{total_segments:02d}.DAT" + (".bz2" if compressed else ""))
+
+
+def make_dataset(directory, bands, scale, slots=1, segments=None, compressed=False):
+    """
+    Write synthetic time slot folders of HSD segments for the given bands,
+    `scale` times the real full-disk size (segments: which of the 10, default all)
+    """
+    from himawari_geo import BAND_RESOLUTION, GRIDS, TOTAL_SEGMENTS
+
+    folders = []
+    for slot in range(slots):
+        start_time = datetime(2024, 1, 15, 0, 10 * slot)
+        folder = Path(directory) / f"AHI-L1b-FLDK_{start_time:%Y_%m_%d_%H%M}"
+        folder.mkdir(parents=True, exist_ok=True)
+        for band in bands:
+            full_columns = GRIDS[BAND_RESOLUTION[band]][0]
+            columns = max(TOTAL_SEGMENTS * 2, round(full_columns * scale / TOTAL_SEGMENTS / 2) * TOTAL_SEGMENTS * 2)
+            for segment in segments or range(1, TOTAL_SEGMENTS + 1):
+                write_segment(folder / segment_name(band, segment, TOTAL_SEGMENTS, start_time, compressed),
+                              band, segment, TOTAL_SEGMENTS, columns, start_time, compressed)
+        folders.append(folder)
+    return folders
+
+
+def cpu_times():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def find_slot_folders(input_dir):
+    """input_dir itself if it holds segments, else its subfolders that do"""
+    input_dir = Path(input_dir)
+    if any(input_dir.glob("*.DAT*")):
+        return [input_dir]
+    return sorted(d for d in input_dir.iterdir() if d.is_dir() and any(d.glob("*.DAT*")))
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def bench_decode(slots, mode, workers, bands, compressed):
+    from bg_decode import decode_folders
+
+    work = Path(tempfile.mkdtemp(prefix="monwatch_decode_"))
+    try:
+        # Fresh copies, so no run finds the previous run's TIFFs in the manifest
+        folders = []
+        for slot in slots:
+            shutil.copytree(slot, work / slot.name, ignore=shutil.ignore_patterns("*.tif", ".process_manifest.json"))
+            folders.append(work / slot.name)
+
+        cpu_started = cpu_times()
+        started = time.perf_counter()
+        reader, scene_per_slot = MODES[mode]
+        # Both readers write float32 here, so the modes are timed on the same output
+        with contextlib.redirect_stdout(io.StringIO()):
+            success, groups = decode_folders(folders, bands, keep=True, compressed=compressed,
+                                             workers=workers, memory_budget=0,
+                                             scene_per_slot=scene_per_slot, reader=reader,
+                                             storage="float32")
+        wall = time.perf_counter() - started
+        cpu = cpu_times() - cpu_started
+
+        segment_bytes = sum(f.stat().st_size for folder in folders for f in folder.glob("*.DAT*"))
+        written = sum(f.stat().st_size for folder in folders for f in folder.glob("B??.tif"))
+        return {
+            'mode': mode,
+            'workers': workers,
+            'bands': success,
+            'ok': success == groups,
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'mb_per_s': segment_bytes / MB / wall if wall else 0,
+            'output_mb': written / MB,
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark satpy and native decoding of HSD segments")
+    parser.add_argument("-i", "--input",
+                        help="Time slot folder, or a folder of time slot folders, with segments "
+                             "(default: synthetic segments)")
+    parser.add_argument("--workers", default="1,4", help="Comma-separated worker counts to test")
+    parser.add_argument("--modes", default="band,slot,native",
+                        help="Comma-separated modes: band, slot (satpy Scene per band / per slot), native")
+    parser.add_argument("-b", "--bands", nargs="+", help="Bands to decode (default: all found; synthetic: 03 13)")
+    parser.add_argument("--compressed", action="store_true", help="Decode .DAT.bz2 segments directly")
+    parser.add_argument("--synthetic-scale", type=float, default=0.25,
+                        help="Size of the synthetic segments relative to the real full disk")
+    parser.add_argument("--slots", type=int, default=1, help="Number of synthetic time slots")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    dataset_root = None
+    try:
+        if args.input:
+            slots = find_slot_folders(args.input)
+            if not slots:
+                print(f"[!] No segment files found in {args.input}")
+                return 1
+        else:
+            dataset_root = Path(tempfile.mkdtemp(prefix="monwatch_dataset_"))
+            synthetic_bands = [int(b) for b in args.bands] if args.bands else [3, 13]
+            print(f"[+] Writing synthetic segments (scale {args.synthetic_scale})...")
+            slots = make_dataset(dataset_root, synthetic_bands, args.synthetic_scale, args.slots,
+                                 compressed=args.compressed)
+
+        worker_counts = [int(w) for w in args.workers.split(',')]
+        modes = [m.strip() for m in args.modes.split(',') if m.strip() in MODES]
+        bands = [b.zfill(2) for b in args.bands] if args.bands else None
+        input_bytes = sum(f.stat().st_size for slot in slots for f in slot.glob("*.DAT*"))
+
+        print("\n" + "=" * 70)
+        print("HIMAWARI DECODE BENCHMARK")
+        print("=" * 70)
+        print(f"Slots: {len(slots)} | Segments: {input_bytes / MB:.0f} MB | CPUs: {os.cpu_count()}")
+        print("=" * 70)
+        print(f"  {'mode':>6s} {'workers':>8s} {'bands':>6s} {'wall s':>8s} {'MB/s':>8s} {'CPU s':>7s} {'CPU %':>6s}")
+
+        results = []
+        for mode in modes:
+            for workers in worker_counts:
+                result = bench_decode(slots, mode, workers, bands, args.compressed)
+                result['cpu_pct'] = 100 * result['cpu_s'] / result['wall_s'] if result['wall_s'] else 0
+                results.append(result)
+                print(f"  {mode:>6s} {workers:8d} {result['bands']:6d} {result['wall_s']:8.2f} "
+                      f"{result['mb_per_s']:8.1f} {result['cpu_s']:7.2f} {result['cpu_pct']:6.0f}"
+                      + ("" if result['ok'] else "  (errors)"))
+
+        best = min((r for r in results if r['ok']), key=lambda r: r['wall_s'], default=None)
+        if best:
+            reader, scene_per_slot = MODES[best['mode']]
+            print(f"\n[OK] Fastest: {best['mode']} with {best['workers']} workers ({best['wall_s']:.2f} s)")
+            print(f"     bg_decode.py --workers {best['workers']} --reader {reader}"
+                  + (" --scene-per-slot" if scene_per_slot else ""))
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'args': vars(args), 'results': results}, f, indent=2)
+            print(f"\n[OK] Results written to {args.json}")
+        return 0
+    finally:
+        if dataset_root:
+            shutil.rmtree(dataset_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
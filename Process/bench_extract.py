@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Himawari bz2 extraction benchmark - thread pool vs process pool vs block-parallel
+Runs bg_extract.extract_bz2_files on a synthetic set of HSD-sized segments
+and reports wall time, MB/s and CPU per engine and worker count, so the
+fastest --engine / --block-threshold can be picked for a machine.
+
+The segments hold smooth 16-bit "count" fields plus noise, which compress
+about as well as real AHI data. CPU time includes the pool's child
+processes where the OS reports it (not on Windows).
+
+Example:
+    python bench_extract.py --workers 1,2,4,8 --files 10 --mb 20
+"""
+
+import argparse
+import bz2
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+MB = 1024 * 1024
+
+
+# ============================================================================
+# SYNTHETIC DATASET
+# ============================================================================
+
+def segment_data(size, seed):
+    """About `size` bytes of little-endian 16-bit counts resembling an HSD segment"""
+    rng = np.random.default_rng(seed)
+    columns = 2750
+    lines = max(1, size // (2 * columns))
+    y, x = np.mgrid[0:lines, 0:columns]
+    field = 2000 + 600 * np.sin(x / 180.0 + seed) * np.cos(y / 140.0)
+    field += rng.normal(0, 25, field.shape)
+    return np.clip(field, 0, 16383).astype('<u2').tobytes()
+
+
+def make_dataset(directory, files, size):
+    directory.mkdir(parents=True, exist_ok=True)
+    raw_bytes = 0
+    for index in range(files):
+        data = segment_data(size, index)
+        raw_bytes += len(data)
+        name = f"HS_H09_20240115_0000_B03_FLDK_R05_S{index % 10 + 1:02d}10.DAT.bz2"
+        subdir = directory / f"slot{index // 10:02d}"
+        subdir.mkdir(exist_ok=True)
+        (subdir / name).write_bytes(bz2.compress(data, 9))
+    return raw_bytes
+
+
+def cpu_times():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def bench_extract(dataset, engine, workers, block_threshold, raw_bytes):
+    from bg_extract import extract_bz2_files
+
+    work = Path(tempfile.mkdtemp(prefix="monwatch_extract_"))
+    try:
+        # Extraction deletes the .bz2 files, so every run gets a fresh copy
+        shutil.copytree(dataset, work / "data")
+
+        cpu_started = cpu_times()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            success, total = extract_bz2_files(work / "data", workers, engine=engine,
+                                               block_threshold=block_threshold)
+        wall = time.perf_counter() - started
+        cpu = cpu_times() - cpu_started
+
+        extracted = sum(f.stat().st_size for f in (work / "data").rglob("*.DAT"))
+        return {
+            'engine': engine,
+            'blocks': bool(block_threshold),
+            'workers': workers,
+            'files': success,
+            'ok': success == total and extracted == raw_bytes,
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'mb_per_s': extracted / MB / wall if wall else 0,
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bz2 extraction engines on synthetic segments")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts to test")
+    parser.add_argument("--files", type=int, default=10, help="Number of segment files")
+    parser.add_argument("--mb", type=float, default=20, help="Decompressed size of each segment (MB)")
+    parser.add_argument("--engines", default="thread,process,thread+blocks,process+blocks",
+                        help="Comma-separated engines; '+blocks' splits every file into parallel blocks")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    engines = [e.strip() for e in args.engines.split(',')]
+
+    dataset_root = Path(tempfile.mkdtemp(prefix="monwatch_dataset_"))
+    try:
+        dataset = dataset_root / "segments"
+        raw_bytes = make_dataset(dataset, args.files, int(args.mb * MB))
+        compressed = sum(f.stat().st_size for f in dataset.rglob("*.bz2"))
+
+        print("\n" + "=" * 70)
+        print("HIMAWARI BZ2 EXTRACTION BENCHMARK")
+        print("=" * 70)
+        print(f"Files: {args.files} | Decompressed: {raw_bytes / MB:.0f} MB | "
+              f"Compressed: {compressed / MB:.0f} MB | CPUs: {os.cpu_count()}")
+        print("=" * 70)
+        print(f"  {'engine':>15s} {'workers':>8s} {'wall s':>8s} {'MB/s':>8s} {'CPU s':>7s} {'CPU %':>6s}")
+
+        results = []
+        for engine in engines:
+            pool, _, blocks = engine.partition('+')
+            for workers in worker_counts:
+                # A threshold of 1 byte sends every file through the block splitter
+                result = bench_extract(dataset, pool, workers, 1 if blocks else 0, raw_bytes)
+                result['cpu_pct'] = 100 * result['cpu_s'] / result['wall_s'] if result['wall_s'] else 0
+                results.append(result)
+                print(f"  {engine:>15s} {workers:8d} {result['wall_s']:8.2f} {result['mb_per_s']:8.1f} "
+                      f"{result['cpu_s']:7.2f} {result['cpu_pct']:6.0f}"
+                      + ("" if result['ok'] else "  (errors)"))
+
+        best = max((r for r in results if r['ok']), key=lambda r: r['mb_per_s'], default=None)
+        if best:
+            print(f"\n[OK] Fastest: {best['engine']}{'+blocks' if best['blocks'] else ''} "
+                  f"with {best['workers']} workers ({best['mb_per_s']:.1f} MB/s)")
+            print(f"     bg_extract.py --engine {best['engine']} --max-workers {best['workers']}"
+                  + (" --block-threshold <MB>" if best['blocks'] else ""))
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'args': vars(args), 'results': results}, f, indent=2)
+            print(f"\n[OK] Results written to {args.json}")
+    finally:
+        shutil.rmtree(dataset_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Himawari S3 download benchmark - runs against a local S3 stand-in
+Measures listing latency and download files/s, MB/s and CPU per worker count
+without touching the real NOAA buckets.
+
+The stand-in is a small S3-compatible HTTP server (ListObjectsV2 with
+delimiter and continuation tokens, GetObject with Range/If-Match, HeadObject)
+serving synthetic HS_H09_YYYYMMDD_HHMM_Bxx_FLDK_Rxx_SnnTT.DAT.bz2 keys with
+realistic sizes per band resolution. It runs in a separate process, so the CPU
+figures only cover the client side (S3Lister / S3DownloadWorker).
+
+Example:
+    python bench_s3.py --workers 1,2,4,8,16 --bands 13,03 --latency 30 --bandwidth 8
+"""
+
+import argparse
+import base64
+import bz2
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
+from xml.sax.saxutils import escape
+
+BUCKET = "noaa-himawari9"
+PRODUCT = "AHI-L1b-FLDK"
+BENCH_DAY = datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+# Typical compressed segment sizes (MB) by band resolution
+SEGMENT_MB = {"R05": 30.0, "R10": 8.0, "R20": 2.5}
+BAND_RES = {1: "R10", 2: "R10", 3: "R05", 4: "R10"}
+
+MB = 1024 * 1024
+SEND_CHUNK = 64 * 1024
+
+
+# ============================================================================
+# SYNTHETIC DATASET
+# ============================================================================
+
+def segment_payload(size):
+    """A valid bz2 stream of roughly `size` bytes (random data barely compresses)"""
+    return bz2.compress(os.urandom(max(1024, int(size * 0.995))), 1)
+
+
+class SyntheticBucket:
+    """Keys for every 10-minute slot of one day; payloads shared per resolution"""
+
+    def __init__(self, slots=144, bands=range(1, 17), scale=1.0):
+        self.payloads = {}
+        self.etags = {}
+        for res, size_mb in SEGMENT_MB.items():
+            payload = segment_payload(size_mb * MB * scale)
+            self.payloads[res] = payload
+            self.etags[res] = '"' + hashlib.md5(payload).hexdigest() + '"'
+
+        self.objects = {}
+        for slot in range(slots):
+            moment = BENCH_DAY + timedelta(minutes=10 * slot)
+            stamp = moment.strftime("%Y%m%d_%H%M")
+            folder = f"{PRODUCT}/{moment:%Y/%m/%d/%H%M}/"
+            for band in bands:
+                res = BAND_RES.get(band, "R20")
+                for segment in range(1, 11):
+                    key = f"{folder}HS_H09_{stamp}_B{band:02d}_FLDK_{res}_S{segment:02d}10.DAT.bz2"
+                    self.objects[key] = (res, moment + timedelta(minutes=9))
+        self.keys = sorted(self.objects)
+
+    def list(self, prefix, delimiter, start_after, max_keys):
+        """Return (contents, common_prefixes, next_token) like ListObjectsV2"""
+        contents, prefixes = [], []
+        if delimiter and start_after.endswith(delimiter) and len(start_after) > len(prefix):
+            # The previous page ended on a common prefix: resume after everything under it
+            i = bisect_left(self.keys, start_after + "\uffff")
+        else:
+            i = bisect_left(self.keys, max(prefix, start_after))
+            if i < len(self.keys) and self.keys[i] == start_after:
+                i += 1
+        last = None
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            if len(contents) + len(prefixes) >= max_keys:
+                return contents, prefixes, last
+            key = self.keys[i]
+            rest = key[len(prefix):]
+            if delimiter and delimiter in rest:
+                common = prefix + rest.split(delimiter, 1)[0] + delimiter
+                prefixes.append(common)
+                last = common
+                # Skip every key under this common prefix
+                i = bisect_left(self.keys, common + "\uffff")
+                continue
+            contents.append(key)
+            last = key
+            i += 1
+        return contents, prefixes, None
+
+
+# ============================================================================
+# S3 STAND-IN SERVER
+# ============================================================================
+
+class S3StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    bucket_data = None
+    latency = 0.0
+    bandwidth = 0.0  # bytes/s per connection, 0 = unlimited
+
+    def log_message(self, format, *args):
+        pass
+
+    def split_path(self):
+        parts = urlsplit(self.path)
+        path = unquote(parts.path).lstrip('/')
+        bucket, _, key = path.partition('/')
+        # Virtual-hosted style: bucket in the Host header
+        host = self.headers.get('Host', '').split(':')[0]
+        if host.startswith(BUCKET + "."):
+            bucket, key = BUCKET, path
+        return bucket, key, parse_qs(parts.query)
+
+    def send_error_xml(self, status, code):
+        body = f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code><Message>{code}</Message></Error>'.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        bucket, key, query = self.split_path()
+        if bucket != BUCKET:
+            return self.send_error_xml(404, "NoSuchBucket")
+        if not key:
+            return self.list_objects(query)
+        return self.get_object(key)
+
+    def list_objects(self, query):
+        data = self.bucket_data
+        prefix = query.get('prefix', [''])[0]
+        delimiter = query.get('delimiter', [''])[0]
+        max_keys = min(int(query.get('max-keys', ['1000'])[0]), 1000)
+        token = query.get('continuation-token', [''])[0]
+        start_after = base64.urlsafe_b64decode(token).decode() if token else query.get('start-after', [''])[0]
+
+        contents, prefixes, last = data.list(prefix, delimiter, start_after, max_keys)
+
+        xml = ['<?xml version="1.0" encoding="UTF-8"?>',
+               '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">',
+               f'<Name>{BUCKET}</Name><Prefix>{escape(prefix)}</Prefix>',
+               f'<KeyCount>{len(contents) + len(prefixes)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>']
+        if delimiter:
+            xml.append(f'<Delimiter>{escape(delimiter)}</Delimiter>')
+        xml.append(f'<IsTruncated>{"true" if last else "false"}</IsTruncated>')
+        if last:
+            xml.append(f'<NextContinuationToken>{base64.urlsafe_b64encode(last.encode()).decode()}</NextContinuationToken>')
+        for key in contents:
+            res, modified = data.objects[key]
+            xml.append(f'<Contents><Key>{escape(key)}</Key>'
+                       f'<LastModified>{modified:%Y-%m-%dT%H:%M:%S.000Z}</LastModified>'
+                       f'<ETag>{escape(data.etags[res])}</ETag><Size>{len(data.payloads[res])}</Size>'
+                       f'<StorageClass>STANDARD</StorageClass></Contents>')
+        for common in prefixes:
+            xml.append(f'<CommonPrefixes><Prefix>{escape(common)}</Prefix></CommonPrefixes>')
+        xml.append('</ListBucketResult>')
+
+        body = "".join(xml).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_object(self, key):
+        data = self.bucket_data
+        if key not in data.objects:
+            return self.send_error_xml(404, "NoSuchKey")
+        res, modified = data.objects[key]
+        payload = data.payloads[res]
+        etag = data.etags[res]
+
+        if_match = self.headers.get('If-Match')
+        if if_match and if_match.strip('"') != etag.strip('"'):
+            return self.send_error_xml(412, "PreconditionFailed")
+
+        start, end = 0, len(payload) - 1
+        status = 200
+        byte_range = self.headers.get('Range')
+        if byte_range and byte_range.startswith('bytes='):
+            first, _, last = byte_range[6:].partition('-')
+            start = int(first) if first else len(payload) - int(last)
+            end = int(last) if first and last else len(payload) - 1
+            if start >= len(payload):
+                return self.send_error_xml(416, "InvalidRange")
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', modified.strftime('%a, %d %b %Y %H:%M:%S GMT'))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(payload)}')
+        self.end_headers()
+        if self.command == 'HEAD':
+            return
+
+        view = memoryview(payload)[start:end + 1]
+        sent = 0
+        began = time.monotonic()
+        try:
+            while sent < len(view):
+                chunk = view[sent:sent + SEND_CHUNK]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if self.bandwidth:
+                    # Per-connection throttle, like a WAN link to us-east-1
+                    ahead = sent / self.bandwidth - (time.monotonic() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def serve(args):
+    """Run the stand-in server and print its endpoint on the first line of stdout"""
+    bands = [int(b) for b in args.bands.split(',')] if args.bands else range(1, 17)
+    S3StandInHandler.bucket_data = SyntheticBucket(args.slots, bands, args.scale)
+    S3StandInHandler.latency = args.latency / 1000.0
+    S3StandInHandler.bandwidth = args.bandwidth * MB
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), S3StandInHandler)
+    server.daemon_threads = True
+    print(f"http://127.0.0.1:{server.server_address[1]}", flush=True)
+    server.serve_forever()
+
+
+def start_server(args):
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--serve",
+           "--slots", str(args.slots), "--scale", str(args.scale),
+           "--latency", str(args.latency), "--bandwidth", str(args.bandwidth)]
+    if args.bands:
+        cmd += ["--bands", args.bands]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    endpoint = process.stdout.readline().strip()
+    if not endpoint.startswith("http"):
+        process.kill()
+        raise RuntimeError("S3 stand-in did not start")
+    return process, endpoint
+
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def bench_listing(s3_client, repeats):
+    """Time S3Lister on a day folder (144 time folders) and a time folder (files)"""
+    from Process_dat import S3Lister
+
+    results = {}
+    day_prefix = f"{PRODUCT}/{BENCH_DAY:%Y/%m/%d}/"
+    slot_prefix = f"{day_prefix}0000/"
+    for name, prefix, list_files in (("day", day_prefix, False), ("slot", slot_prefix, True)):
+        timings = []
+        count = 0
+        for _ in range(repeats):
+            lister = S3Lister(BUCKET, prefix, cache=None, s3_client=s3_client)
+            lister.list_files = list_files
+            found = []
+            lister.directories_found.connect(lambda batch: found.extend(batch))
+            lister.files_found.connect(lambda batch: found.extend(batch))
+            started = time.perf_counter()
+            lister.run()
+            timings.append(time.perf_counter() - started)
+            count = len(found)
+        timings.sort()
+        results[name] = {'prefix': prefix, 'entries': count,
+                         'median_ms': timings[len(timings) // 2] * 1000, 'min_ms': timings[0] * 1000}
+    return results
+
+
+def bench_download(workers, bands, slots, decompress, adaptive):
+    """Download the first `slots` time folders with S3DownloadWorker, return throughput figures"""
+    from Process_dat import S3DownloadWorker, S3BulkDownloadWorker
+
+    target = Path(tempfile.mkdtemp(prefix="monwatch_bench_"))
+    try:
+        if slots == 1:
+            worker = S3DownloadWorker(BUCKET, f"{PRODUCT}/{BENCH_DAY:%Y/%m/%d}/0000/", target, bands,
+                                      max_workers=workers, decompress=decompress, adaptive=adaptive)
+        else:
+            end = BENCH_DAY + timedelta(minutes=10 * (slots - 1))
+            worker = S3BulkDownloadWorker(BUCKET, PRODUCT, BENCH_DAY, end, 10, target, bands,
+                                          max_workers=workers, decompress=decompress, adaptive=adaptive)
+        outcome = {'files': 0, 'ok': False, 'errors': 0, 'bytes': 0}
+        worker.file_progress.connect(lambda done, total, name: outcome.update(files=done))
+        worker.transfer_stats.connect(lambda stats: outcome.update(bytes=stats['bytes_done']))
+        worker.finished.connect(lambda ok, path: outcome.update(ok=ok))
+        worker.error.connect(lambda msg: outcome.update(errors=outcome['errors'] + 1))
+
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        worker.run()
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+
+        return {
+            'workers': workers,
+            'adaptive': adaptive,
+            'files': outcome['files'],
+            'errors': outcome['errors'],
+            'ok': outcome['ok'],
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'transferred_bytes': outcome['bytes'],
+        }
+    finally:
+        shutil.rmtree(target, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark S3 listing/download against a local S3 stand-in")
+    parser.add_argument("--workers", default="1,2,4,8,16", help="Comma-separated worker counts to test")
+    parser.add_argument("--bands", default="13,03", help="Comma-separated bands to download (e.g. 13,03)")
+    parser.add_argument("--slots", type=int, default=144, help="Time slots in the synthetic day (listing)")
+    parser.add_argument("--download-slots", type=int, default=1, help="Time slots to download per run")
+    parser.add_argument("--scale", type=float, default=0.25, help="Scale factor for segment sizes")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per request (ms)")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="Per-connection bandwidth cap (MB/s), 0 = none")
+    parser.add_argument("--repeats", type=int, default=5, help="Listing repeats")
+    parser.add_argument("--decompress", action="store_true", help="Decompress while downloading")
+    parser.add_argument("--adaptive", action="store_true", help="Also run with adaptive concurrency")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    process, endpoint = start_server(args)
+    os.environ["MONWATCH_S3_ENDPOINT"] = endpoint
+
+    try:
+        from PySide6.QtCore import QCoreApplication
+        from s3_client import get_s3_client
+
+        # The workers are QThreads; give them an application object
+        app = QCoreApplication.instance() or QCoreApplication([])
+
+        bands = [int(b) for b in args.bands.split(',')]
+        worker_counts = [int(w) for w in args.workers.split(',')]
+
+        print("\n" + "=" * 70)
+        print("HIMAWARI S3 BENCHMARK (local stand-in)")
+        print("=" * 70)
+        print(f"Endpoint: {endpoint}")
+        print(f"Bands: {', '.join(f'B{b:02d}' for b in bands)} | Scale: {args.scale} | "
+              f"Latency: {args.latency} ms | Bandwidth/conn: {args.bandwidth or 'unlimited'} MB/s")
+        print("=" * 70)
+
+        listing = bench_listing(get_s3_client(), args.repeats)
+        print("\nLISTING")
+        for name, result in listing.items():
+            print(f"  {name:5s} {result['prefix']:40s} {result['entries']:5d} entries  "
+                  f"median {result['median_ms']:7.1f} ms  min {result['min_ms']:7.1f} ms")
+
+        runs = [(w, False) for w in worker_counts]
+        if args.adaptive:
+            runs.append((max(worker_counts), True))
+
+        print("\nDOWNLOAD")
+        print(f"  {'workers':>8s} {'files':>6s} {'wall s':>8s} {'files/s':>8s} {'MB/s':>8s} {'CPU s':>7s} {'CPU %':>6s}")
+        downloads = []
+        for workers, adaptive in runs:
+            result = bench_download(workers, bands, args.download_slots, args.decompress, adaptive)
+            megabytes = result['transferred_bytes'] / MB
+            result['files_per_s'] = result['files'] / result['wall_s'] if result['wall_s'] else 0
+            result['mb_per_s'] = megabytes / result['wall_s'] if result['wall_s'] else 0
+            result['cpu_pct'] = 100 * result['cpu_s'] / result['wall_s'] if result['wall_s'] else 0
+            downloads.append(result)
+            label = f"{workers}{'A' if adaptive else ''}"
+            print(f"  {label:>8s} {result['files']:6d} {result['wall_s']:8.2f} {result['files_per_s']:8.1f} "
+                  f"{result['mb_per_s']:8.1f} {result['cpu_s']:7.2f} {result['cpu_pct']:6.0f}"
+                  + ("" if result['ok'] and not result['errors'] else "  (errors)"))
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'args': vars(args), 'listing': listing, 'download': downloads}, f, indent=2)
+            print(f"\n[OK] Results written to {args.json}")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
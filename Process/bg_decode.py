@@ -8,23 +8,97 @@ CHANGES:
 - Now checks if ANY .tif files exist in the folder before deleting .dat files
 - Shows full errors when Satpy fails
 - Fixed print statement encoding issues
+- --compressed decodes .DAT.bz2 segments as they are, so the extract step can be skipped
+- A band counts as done only if .process_manifest.json records its GeoTIFF as
+  complete (same size, same input segments), not because some .tif exists
+- Bands (of one or several folders) decode in parallel in a process pool,
+  limited by --workers and --memory-budget
+- --scene-per-slot decodes all bands of a folder with one multi-band Scene
+- --reader native decodes with hsd_reader (NumPy) instead of satpy; it writes
+  float32 reflectance (%) / brightness temperature (K) GeoTIFFs
+- Satpy bands are still saved as its enhanced 8-bit images by default;
+  --storage float32 saves the physical values instead (the viewer and the
+  cache stretch them to 8 bits for display)
+- Bands are saved as Cloud Optimized GeoTIFFs (deflate tiles + internal
+  overviews) unless --plain-tiff is given
+- --storage uint16 saves bands as scaled 16-bit integers (half the size of
+  float32); bg_product.read_band_data and, for the viewer and the PNG cache,
+  cache.read_band un-scale them
+- --region decodes only the pixels covering a named or lat/lon box (sector
+  mode), with the geotransform of that window
 """
 
 import sys
+import os
 import re
+import io
+import contextlib
 import traceback
 from pathlib import Path
 from typing import Tuple, Dict, List
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
 
 try:
+    import dask
     from satpy import Scene
+    import rasterio
+    from rasterio.shutil import copy as copy_raster
+    from rasterio.windows import Window
     SATPY_AVAILABLE = True
-except ImportError:
+except ImportError as e:
     SATPY_AVAILABLE = False
-    print("[!] ERROR: satpy is required for processing. Install with: pip install satpy")
+    # Name the package that is actually missing (satpy, dask or rasterio)
+    missing = (e.name or "satpy").split(".")[0]
+    print(f"[!] ERROR: {missing} is required for processing ({e}). Install with: pip install {missing}")
     sys.exit(1)
 
+import hsd_reader
+from himawari_geo import parse_segment, resolve_region, BAND_RESOLUTION, GRIDS, TOTAL_SEGMENTS
+from process_manifest import ProcessManifest, fingerprint, remove_stale
+
+MB = 1024 * 1024
+
+# Rough peak bytes per output pixel while satpy decodes a band (counts,
+# float64 calibrated values and dask copies)
+BYTES_PER_PIXEL = 16
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+READERS = ("satpy", "native")
+
+# COG layout for decoded bands: readers asking for a smaller out_shape
+# (bg_product.read_band_data) get it from an overview level, and windowed
+# reads only touch the tiles they cover. Horizontal differencing (predictor 2)
+# also for float32: tifffile (cache.py) can't decode the floating point
+# predictor 3 without imagecodecs.
+COG_OPTIONS = {
+    'BLOCKSIZE': 512,
+    'COMPRESS': 'DEFLATE',
+    'PREDICTOR': 'STANDARD',
+    'OVERVIEWS': 'AUTO',
+    'OVERVIEW_RESAMPLING': 'AVERAGE',
+}
+
+# --storage enhanced: satpy's default enhanced 8-bit image (satpy reader only).
+# --storage float32: physical values, reflectance (%) / brightness temperature (K).
+# --storage uint16: value = stored * scale + offset, with UINT16_NODATA for
+# no data. Rounding to the nearest step keeps every value within scale / 2 of
+# the float32 one - 0.005 % reflectance, 0.005 K brightness temperature, well
+# below AHI's own noise (~0.1 K NEdT) - over 0-655.34 % / K; values outside
+# that range are clipped.
+STORAGE_TYPES = ("enhanced", "float32", "uint16")
+UINT16_NODATA = 65535
+UINT16_SCALING = {
+    "reflectance": (0.01, 0.0),
+    "brightness_temperature": (0.01, 0.0),
+}
+
+# Lines converted at a time by quantize_band (a multiple of the tile size)
+QUANTIZE_LINES = 1024
+
 
 def find_datetime_folders(base_dir: Path) -> List[Path]:
     datetime_folders = []
@@ -41,15 +115,28 @@ def find_datetime_folders(base_dir: Path) -> List[Path]:
     return datetime_folders
 
 
-def group_dat_files(datetime_folder: Path) -> Dict[tuple, List[Path]]:
+def find_segment_files(folder: Path, compressed: bool = False) -> List[Path]:
+    """All .dat/.DAT segment files under folder, plus .DAT.bz2 ones in compressed mode"""
     dat_files = []
     for ext in ['.dat', '.DAT']:
-        dat_files.extend(list(datetime_folder.rglob(f"*{ext}")))
+        dat_files.extend(list(folder.rglob(f"*{ext}")))
+    if compressed:
+        # Segments extracted already win over their .bz2, so a half-done extract run is harmless
+        extracted = {f.name.lower() for f in dat_files}
+        dat_files.extend(f for f in folder.rglob("*.bz2")
+                         if f.name.lower().endswith('.dat.bz2') and f.name[:-4].lower() not in extracted)
+    return dat_files
+
+
+def group_dat_files(datetime_folder: Path, compressed: bool = False) -> Dict[tuple, List[Path]]:
+    dat_files = find_segment_files(datetime_folder, compressed)
     
     if not dat_files:
         return {}
 
-    print(f"[+] Found {len(dat_files)} .dat files in {datetime_folder.name}")
+    packed = sum(1 for f in dat_files if f.suffix.lower() == '.bz2')
+    print(f"[+] Found {len(dat_files)} .dat files in {datetime_folder.name}"
+          + (f" ({packed} still bz2-compressed)" if packed else ""))
 
     grouped = defaultdict(list)
     for dat_file in dat_files:
@@ -80,80 +167,370 @@ def group_dat_files(datetime_folder: Path) -> Dict[tuple, List[Path]]:
     return grouped
 
 
-def has_tiff_files(folder: Path) -> bool:
-    """Check if there is at least one reasonable-sized .tif file in the folder"""
-    for tif in folder.glob("*.tif"):
-        if tif.stat().st_size > 10000:  # ignore tiny/empty files
+def segment_subset(files: List[Path]):
+    """
+    Return the sorted segment numbers if the files are only part of the full
+    disk (region download), or None if all segments are present.
+    """
+    segments = set()
+    total = None
+    for f in files:
+        parsed = parse_segment(f.name)
+        if parsed is None:
+            return None
+        _, segment, total = parsed
+        segments.add(segment)
+    if total is None or len(segments) >= total:
+        return None
+    return sorted(segments)
+
+
+def has_tiff_files(folder: Path, manifest: ProcessManifest, band: str = None) -> bool:
+    """Check if at least one band GeoTIFF in the folder (or the one for a band) was written completely"""
+    for tif in folder.glob(f"B{band}.tif" if band else "B??.tif"):
+        if manifest.is_complete(tif):
             return True
     return False
 
 
-def process_datetime_folder(datetime_folder: Path, bands_to_process: List[str] = None, keep: bool = False) -> Tuple[int, int]:
-    print(f"\n[+] Processing folder: {datetime_folder.name}")
-    grouped = group_dat_files(datetime_folder)
-    
-    if not grouped:
-        print(f"[!] No valid .dat files found in {datetime_folder.name}")
-        return 0, 0
+def get_segment_num(f):
+    match = re.search(r'_S(\d{4})\.', str(f))
+    return int(match.group(1)) if match else 0
 
-    print(f"[+] Found {len(grouped)} band/time combinations")
 
-    success_count = 0
-    deleted_files_count = 0
+def estimate_band_memory(band: str, files: List[Path]) -> int:
+    """Rough peak memory (bytes) of decoding one band: full-disk pixels scaled by the segments present"""
+    resolution = BAND_RESOLUTION.get(int(band), 2.0)
+    lines = GRIDS[resolution][0]
+    segments = segment_subset(files)
+    fraction = len(segments) / TOTAL_SEGMENTS if segments else 1.0
+    return int(lines * lines * fraction * BYTES_PER_PIXEL)
 
-    for (date_str, time_str, band), files in grouped.items():
-        try:
-            if bands_to_process and band not in bands_to_process:
-                continue
 
-            # Sort segments by segment number
-            def get_segment_num(f):
-                match = re.search(r'_S(\d{4})\.', str(f))
-                return int(match.group(1)) if match else 0
+def staging_path(output_file: Path, stage: str = "part") -> Path:
+    """
+    Where a band is written before finish_output moves it into place: a hidden
+    .B13.tif.part, so no *.tif pattern (B??.tif here, the viewer's B*.tif, the
+    PNG cache) picks it up
+    """
+    return output_file.with_name(f".{output_file.name}.{stage}")
 
-            files.sort(key=lambda x: get_segment_num(x.name))
 
-            output_file = datetime_folder / f"B{band}.tif"
+def remove_stale_output(output_file: Path):
+    for stage in ("part", "uint16"):
+        staging = staging_path(output_file, stage)
+        if staging.exists():
+            staging.unlink()
+    remove_stale(output_file, "decoding")
 
-            # Skip if good TIFF already exists
-            if output_file.exists() and output_file.stat().st_size > 10000:
-                print(f"[~] Already exists: {output_file.name}")
-                success_count += 1
-                continue
+
+def band_scaling(band: str, storage: str = "enhanced"):
+    """(scale, offset) of a band stored as uint16, None if it is stored as written"""
+    if storage != "uint16":
+        return None
+    kind = "reflectance" if int(band) < hsd_reader.FIRST_IR_BAND else "brightness_temperature"
+    return UINT16_SCALING[kind]
+
+
+def save_options(storage: str = "enhanced") -> dict:
+    """satpy save_dataset(s) arguments: the enhanced image, or the physical values as float32"""
+    if storage == "enhanced":
+        return {}
+    return {'dtype': np.float32, 'enhance': False}
+
+
+def quantize_band(source: Path, dest: Path, scale: float, offset: float):
+    """Write a float band as uint16 with scale/offset metadata, QUANTIZE_LINES lines at a time"""
+    with rasterio.open(source) as src:
+        profile = {
+            'driver': 'GTiff', 'width': src.width, 'height': src.height, 'count': 1,
+            'dtype': 'uint16', 'nodata': UINT16_NODATA, 'crs': src.crs, 'transform': src.transform,
+            'tiled': True, 'blockxsize': 512, 'blockysize': 512, 'compress': 'deflate', 'predictor': 2,
+        }
+        with rasterio.open(dest, 'w', **profile) as dst:
+            dst.scales = (scale,)
+            dst.offsets = (offset,)
+            for row in range(0, src.height, QUANTIZE_LINES):
+                window = Window(0, row, src.width, min(QUANTIZE_LINES, src.height - row))
+                data = src.read(1, window=window, masked=True).filled(np.nan).astype(np.float32)
+                stored = np.rint((data - offset) / scale)
+                np.clip(stored, 0, UINT16_NODATA - 1, out=stored)
+                stored[np.isnan(data)] = UINT16_NODATA
+                dst.write(stored.astype(np.uint16), 1, window=window)
+
+
+def finish_output(output_file: Path, cog: bool = True, threads: int = None, scaling=None):
+    """
+    Move a band from its staging file into place, converted to scaled uint16
+    if scaling is a (scale, offset) pair and rewritten as a COG if cog
+    """
+    staging = staging_path(output_file)
+    if scaling:
+        quantized = staging_path(output_file, "uint16")
+        try:
+            quantize_band(staging, quantized, *scaling)
+        except Exception:
+            if quantized.exists():
+                quantized.unlink()
+            raise
+        finally:
+            staging.unlink()
+        staging = quantized
+    if not cog:
+        os.replace(staging, output_file)
+        return
+    try:
+        copy_raster(str(staging), str(output_file), driver='COG', NUM_THREADS=str(threads or 1), **COG_OPTIONS)
+    except Exception:
+        if output_file.exists():
+            output_file.unlink()
+        raise
+    finally:
+        staging.unlink()
+
+
+def crop_to_window(scn, name: str, window, first_loaded_line: int):
+    """
+    Crop a loaded band and its area definition to a region window (1-based
+    full-disk lines/columns); the loaded data starts at first_loaded_line
+    """
+    first_line, last_line, first_column, last_column = window
+    rows = slice(first_line - first_loaded_line, last_line - first_loaded_line + 1)
+    columns = slice(first_column - 1, last_column)
+    data = scn[name]
+    cropped = data[rows, columns]
+    cropped.attrs = dict(data.attrs, area=data.attrs['area'][rows, columns])
+    scn[name] = cropped
+
+
+def first_loaded_line(files: List[Path], load_kwargs: dict) -> int:
+    """Full-disk line of the first row satpy loads: the strip's first line unless padded to the full disk"""
+    if load_kwargs.get('pad_data', True):
+        return 1
+    return hsd_reader.load_segments(files)[0].first_line
+
+
+def decode_band(datetime_folder: Path, band: str, files: List[Path], dask_threads: int = None,
+                reader: str = "satpy", cog: bool = True, storage: str = "enhanced",
+                region=None) -> Tuple[bool, str]:
+    """
+    Decode the segments of one band into B<band>.tif (runs in a worker process)
+    Returns: (success, log) - the log is printed by the parent in one piece so
+    the output of concurrent bands doesn't interleave
+    """
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        output_file = datetime_folder / f"B{band}.tif"
+        try:
+            remove_stale_output(output_file)
 
             print(f"[+] Processing B{band} ({len(files)} segments) -> {output_file.name}")
 
+            # Region downloads only contain some segments. If they are contiguous,
+            # decode just those lines instead of padding the rest of the disk with
+            # fill values; the area definition is cropped to match.
+            load_kwargs = {}
+            segments = segment_subset(files)
+            if segments:
+                if segments == list(range(segments[0], segments[-1] + 1)):
+                    load_kwargs['pad_data'] = False
+                    print(f"[+] Partial disk: segments {segments[0]}-{segments[-1]}, decoding cropped strip")
+                else:
+                    print(f"[~] Partial disk with gaps (segments {segments}), missing segments padded")
+
+            # Sector mode: the pixel window of the region, from the segments' projection
+            window = None
+            if region:
+                window = hsd_reader.region_window(files, region)
+                print(f"[+] Sector: lines {window[0]}-{window[1]}, columns {window[2]}-{window[3]}")
+
+            if reader == "native":
+                if storage == "enhanced":
+                    print("[!] The native reader only writes physical values (--storage float32 or uint16)")
+                    return False, log.getvalue()
+                try:
+                    lines, columns = hsd_reader.decode_band(files, staging_path(output_file), window)
+                    finish_output(output_file, cog, dask_threads, band_scaling(band, storage))
+                    print(f"[OK] Successfully created: {output_file.name} ({columns}x{lines}, native reader)")
+                    return True, log.getvalue()
+                except Exception as native_error:
+                    print(f"[!] Native reader failed for band {band}: {str(native_error)}")
+                    traceback.print_exc(file=sys.stdout)
+                    remove_stale_output(output_file)
+                    return False, log.getvalue()
+
+            # Several bands decode at once: share the cores between their dask pools
+            dask_config = dask.config.set(num_workers=dask_threads) if dask_threads else contextlib.nullcontext()
+
             # === Satpy processing ===
+            # ahi_hsd reads .DAT.bz2 segments itself, unpacking each to a temporary
+            # file only while the band is being decoded
             try:
-                scn = Scene(reader='ahi_hsd', filenames=[str(f) for f in files])
-                scn.load([f"B{int(band):02d}"])
-                scn.save_dataset(f"B{int(band):02d}", str(output_file), writer='geotiff')
+                with dask_config:
+                    scn = Scene(reader='ahi_hsd', filenames=[str(f) for f in files])
+                    scn.load([f"B{int(band):02d}"], **load_kwargs)
+                    if window:
+                        crop_to_window(scn, f"B{int(band):02d}", window, first_loaded_line(files, load_kwargs))
+                    scn.save_dataset(f"B{int(band):02d}", str(staging_path(output_file)), writer='geotiff',
+                                     **save_options(storage))
+                finish_output(output_file, cog, dask_threads, band_scaling(band, storage))
                 print(f"[OK] Successfully created: {output_file.name}")
-                success_count += 1
+                return True, log.getvalue()
             except Exception as satpy_error:
                 print(f"[!] Satpy failed for B{band}: {str(satpy_error)}")
                 print("Full traceback:")
-                traceback.print_exc()
-                continue
+                traceback.print_exc(file=sys.stdout)
+                return False, log.getvalue()
 
         except Exception as e:
             print(f"[!] FAILED to process B{band}: {str(e)}")
             print("Full traceback:")
-            traceback.print_exc()
-            continue
+            traceback.print_exc(file=sys.stdout)
+            return False, log.getvalue()
+
+
+def decode_slot(datetime_folder: Path, bands: List[Tuple[str, List[Path]]],
+                dask_threads: int = None, cog: bool = True, storage: str = "enhanced",
+                region=None) -> Tuple[Dict[str, bool], str]:
+    """
+    Decode several bands of one time slot with a single Scene: the segment
+    headers are parsed once and satpy computes all bands in one dask graph.
+    Bands the combined Scene fails on are retried one by one with decode_band.
+    Returns: ({band: success}, log)
+    """
+    log = io.StringIO()
+    results = {band: False for band, _ in bands}
+    with contextlib.redirect_stdout(log):
+        names = [f"B{int(band):02d}" for band, _ in bands]
+        files = [f for _, band_files in bands for f in band_files]
+        try:
+            for band, _ in bands:
+                remove_stale_output(datetime_folder / f"B{band}.tif")
 
-    # ====================== DELETION LOGIC ======================
-    if not keep:
-        if has_tiff_files(datetime_folder):
-            print(f"[~] At least one .tif file found -> Proceeding to delete .dat files")
-            for dat_file in datetime_folder.rglob("*.dat"):
-                try:
-                    dat_file.unlink()
-                    deleted_files_count += 1
-                    print(f"[~] Deleted: {dat_file.name}")
-                except Exception as e:
-                    print(f"[~] Could not delete {dat_file.name}: {e}")
-            for dat_file in datetime_folder.rglob("*.DAT"):
+            print(f"[+] Processing {', '.join(names)} ({len(files)} segments) in one Scene")
+
+            # Cropped strips only if every band is a contiguous partial disk
+            load_kwargs = {}
+            subsets = [segment_subset(band_files) for _, band_files in bands]
+            if all(subsets) and all(seg == list(range(seg[0], seg[-1] + 1)) for seg in subsets):
+                load_kwargs['pad_data'] = False
+                print("[+] Partial disk: decoding cropped strips")
+
+            windows = {}
+            if region:
+                windows = {band: hsd_reader.region_window(band_files, region) for band, band_files in bands}
+                print(f"[+] Sector: {', '.join(f'B{band} {w[1] - w[0] + 1}x{w[3] - w[2] + 1}' for band, w in windows.items())}")
+
+            dask_config = dask.config.set(num_workers=dask_threads) if dask_threads else contextlib.nullcontext()
+            with dask_config:
+                scn = Scene(reader='ahi_hsd', filenames=[str(f) for f in files])
+                scn.load(names, **load_kwargs)
+                for band, band_files in bands:
+                    if band in windows:
+                        crop_to_window(scn, f"B{int(band):02d}", windows[band],
+                                       first_loaded_line(band_files, load_kwargs))
+                scn.save_datasets(writer='geotiff', datasets=names, base_dir=str(datetime_folder),
+                                  filename='.{name}.tif.part', **save_options(storage))
+
+            for band, _ in bands:
+                output_file = datetime_folder / f"B{band}.tif"
+                if staging_path(output_file).exists():
+                    finish_output(output_file, cog, dask_threads, band_scaling(band, storage))
+                    results[band] = True
+                    print(f"[OK] Successfully created: {output_file.name}")
+        except Exception as satpy_error:
+            print(f"[!] Satpy failed for the combined Scene: {str(satpy_error)}")
+            print("Full traceback:")
+            traceback.print_exc(file=sys.stdout)
+
+    for band, band_files in bands:
+        if not results[band]:
+            log.write(f"[~] Decoding B{band} on its own\n")
+            results[band], band_log = decode_band(datetime_folder, band, band_files, dask_threads,
+                                                  cog=cog, storage=storage, region=region)
+            log.write(band_log)
+    return results, log.getvalue()
+
+
+def decode_unit(datetime_folder: Path, bands: List[Tuple[str, List[Path]]],
+                dask_threads: int = None, reader: str = "satpy", cog: bool = True,
+                storage: str = "enhanced", region=None) -> Tuple[Dict[str, bool], str]:
+    """One unit of work for the pool: a single band, or all bands of a slot"""
+    if len(bands) == 1 or reader == "native":
+        results, logs = {}, []
+        for band, files in bands:
+            results[band], log = decode_band(datetime_folder, band, files, dask_threads, reader, cog, storage,
+                                             region)
+            logs.append(log)
+        return results, "".join(logs)
+    return decode_slot(datetime_folder, bands, dask_threads, cog, storage, region)
+
+
+class FolderJob:
+    """The bands of one datetime folder that still need decoding"""
+
+    def __init__(self, datetime_folder: Path, bands_to_process: List[str] = None, compressed: bool = False,
+                 options: dict = None):
+        self.folder = datetime_folder
+        self.bands_to_process = bands_to_process
+        self.compressed = compressed
+        self.manifest = ProcessManifest(datetime_folder)
+        self.success_count = 0
+        self.tasks = []
+
+        print(f"\n[+] Processing folder: {datetime_folder.name}")
+        self.grouped = group_dat_files(datetime_folder, compressed)
+        if not self.grouped:
+            print(f"[!] No valid .dat files found in {datetime_folder.name}")
+            return
+        print(f"[+] Found {len(self.grouped)} band/time combinations")
+
+        for (date_str, time_str, band), files in self.grouped.items():
+            if bands_to_process and band not in bands_to_process:
+                continue
+            files.sort(key=lambda x: get_segment_num(x.name))
+
+            output_file = datetime_folder / f"B{band}.tif"
+            # Skip only a TIFF recorded as complete from these same segments with
+            # the same decode settings (reader, storage, layout, sector)
+            inputs = fingerprint(files, options)
+            if self.manifest.is_complete(output_file, inputs):
+                print(f"[~] Already exists: {output_file.name}")
+                self.success_count += 1
+                continue
+            self.tasks.append((band, files, inputs))
+
+    def band_done(self, band: str, inputs: str, success: bool):
+        if success:
+            # Only this process writes the manifest, whichever worker decoded the band
+            self.manifest.record(self.folder / f"B{band}.tif", inputs, "decode")
+            self.success_count += 1
+
+    def cleanup(self, keep: bool = False):
+        # ====================== DELETION LOGIC ======================
+        datetime_folder = self.folder
+        deleted_files_count = 0
+        if not self.grouped:
+            return
+        if not keep:
+            # Only remove the segments of bands whose GeoTIFF is recorded as complete:
+            # a band that failed keeps its segments so it can be decoded again, and
+            # with --bands other bands may still be downloading into this folder
+            decoded, kept = [], []
+            for (_, _, band), files in self.grouped.items():
+                if self.bands_to_process and band not in self.bands_to_process:
+                    continue
+                if has_tiff_files(datetime_folder, self.manifest, band):
+                    decoded.append((band, files))
+                else:
+                    kept.append(band)
+            dat_files = [f for _, files in decoded for f in files]
+            if decoded:
+                print(f"[~] Deleting .dat files of decoded bands: {', '.join(band for band, _ in decoded)}")
+            if kept:
+                print(f"[!] No valid .tif for bands {', '.join(kept)} -> Keeping their .dat files")
+
+            for dat_file in dat_files:
                 try:
                     dat_file.unlink()
                     deleted_files_count += 1
@@ -161,14 +538,95 @@ def process_datetime_folder(datetime_folder: Path, bands_to_process: List[str] =
                 except Exception as e:
                     print(f"[~] Could not delete {dat_file.name}: {e}")
         else:
-            print("[!] No valid .tif files were created -> Keeping all .dat files for safety")
+            print("[~] --keep enabled: .dat files were not deleted")
+
+        if deleted_files_count > 0:
+            print(f"[~] Deleted {deleted_files_count} .dat/.DAT files from {datetime_folder.name}")
+
+
+def decode_folders(datetime_folders: List[Path], bands_to_process: List[str] = None, keep: bool = False,
+                   compressed: bool = False, workers: int = 1, memory_budget: int = 0,
+                   scene_per_slot: bool = False, reader: str = "satpy", cog: bool = True,
+                   storage: str = "enhanced", region=None) -> Tuple[int, int]:
+    """
+    Decode the bands of all folders, up to `workers` at a time in a process pool
+    and, with memory_budget (bytes, 0 = none), only as many at once as fit in it
+    by estimate_band_memory. A unit bigger than the budget runs on its own.
+    With scene_per_slot, the unit of work is a whole folder (one multi-band
+    Scene) instead of a single band. reader picks satpy or the native hsd_reader,
+    cog whether bands are saved in COG layout, storage as satpy's enhanced image,
+    float32 or scaled uint16,
+    region (lat_min, lat_max, lon_min, lon_max) crops them to a sector.
+    Returns: (successful bands, band/time groups)
+    """
+    options = {'reader': reader, 'storage': storage, 'cog': cog, 'region': list(region) if region else None}
+    jobs = [FolderJob(folder, bands_to_process, compressed, options) for folder in datetime_folders]
+    if scene_per_slot:
+        units = [(job, job.tasks) for job in jobs if job.tasks]
     else:
-        print("[~] --keep enabled: .dat files were not deleted")
-
-    if deleted_files_count > 0:
-        print(f"[~] Deleted {deleted_files_count} .dat/.DAT files from {datetime_folder.name}")
-
-    return success_count, len(grouped)
+        units = [(job, [task]) for job in jobs for task in job.tasks]
+    remaining = {id(job): sum(1 for unit_job, _ in units if unit_job is job) for job in jobs}
+
+    def unit_memory(unit):
+        return sum(estimate_band_memory(band, files) for band, files, _ in unit[1])
+
+    def finished(job, tasks, results, log):
+        print(log, end="")
+        for band, _, inputs in tasks:
+            job.band_done(band, inputs, results.get(band, False))
+        remaining[id(job)] -= 1
+        if remaining[id(job)] == 0:
+            job.cleanup(keep)
+
+    for job in jobs:
+        if not job.tasks:
+            job.cleanup(keep)
+
+    workers = max(1, min(workers, len(units)))
+    if workers == 1:
+        for job, tasks in units:
+            finished(job, tasks, *decode_unit(job.folder, [(band, files) for band, files, _ in tasks],
+                                              reader=reader, cog=cog, storage=storage, region=region))
+    elif units:
+        dask_threads = max(1, (os.cpu_count() or 1) // workers)
+        print(f"\n[+] Decoding {sum(len(tasks) for _, tasks in units)} bands "
+              f"({len(units)} {'slots' if scene_per_slot else 'jobs'}) with {workers} workers"
+              + (f", memory budget {memory_budget // MB} MB" if memory_budget else ""))
+        # Biggest first, so the small ones fill the gaps at the end
+        pending = sorted(units, key=unit_memory, reverse=True)
+        running = {}
+        in_use = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                for unit in list(pending):
+                    if len(running) >= workers:
+                        break
+                    need = unit_memory(unit)
+                    if memory_budget and running and in_use + need > memory_budget:
+                        continue
+                    pending.remove(unit)
+                    job, tasks = unit
+                    future = executor.submit(decode_unit, job.folder, [(band, files) for band, files, _ in tasks],
+                                             dask_threads, reader, cog, storage, region)
+                    running[future] = (unit, need)
+                    in_use += need
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    (job, tasks), need = running.pop(future)
+                    in_use -= need
+                    try:
+                        results, log = future.result()
+                    except Exception as e:
+                        results, log = {}, f"[!] FAILED to process {job.folder.name}: {e}\n"
+                    finished(job, tasks, results, log)
+
+    return sum(job.success_count for job in jobs), sum(len(job.grouped) for job in jobs)
+
+
+def process_datetime_folder(datetime_folder: Path, bands_to_process: List[str] = None, keep: bool = False,
+                            compressed: bool = False) -> Tuple[int, int]:
+    return decode_folders([datetime_folder], bands_to_process, keep, compressed)
 
 
 def main():
@@ -177,8 +635,39 @@ def main():
     parser.add_argument("-i", "--input", required=True, help="Input directory")
     parser.add_argument("--bands", help="Comma-separated bands (e.g. 01,02,03)")
     parser.add_argument("--keep", action="store_true", help="Do NOT delete .dat files")
+    parser.add_argument("--compressed", action="store_true",
+                        help="Also decode .DAT.bz2 segments directly (no extract step needed)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Bands decoded in parallel (separate processes)")
+    parser.add_argument("--memory-budget", type=int, default=8192,
+                        help="Approximate memory (MB) the parallel decodes may use together, 0 = no limit")
+    parser.add_argument("--scene-per-slot", action="store_true",
+                        help="Decode all bands of a time slot with one multi-band Scene")
+    parser.add_argument("--reader", choices=READERS, default="satpy",
+                        help="Segment decoder: satpy's ahi_hsd reader or the native NumPy reader")
+    parser.add_argument("--plain-tiff", action="store_true",
+                        help="Save bands as written by the decoder instead of as Cloud Optimized GeoTIFFs")
+    parser.add_argument("--storage", choices=STORAGE_TYPES,
+                        help="Band sample type: satpy's enhanced 8-bit image (default with satpy), float32 "
+                             "(default with the native reader), or uint16 scaled to 0.01 %% / 0.01 K steps")
+    parser.add_argument("--region",
+                        help="Only decode this region: a name (e.g. philippines) or lat_min,lat_max,lon_min,lon_max")
     args = parser.parse_args()
 
+    if args.storage is None:
+        args.storage = "float32" if args.reader == "native" else "enhanced"
+    elif args.storage == "enhanced" and args.reader == "native":
+        print("[!] The native reader only writes physical values: use --storage float32 or uint16")
+        sys.exit(1)
+
+    region = None
+    if args.region:
+        try:
+            region = resolve_region(args.region)
+        except ValueError as e:
+            print(f"[!] {e}")
+            sys.exit(1)
+
     input_dir = Path(args.input)
     if not input_dir.exists():
         print(f"[!] Input directory does not exist: {input_dir}")
@@ -189,12 +678,17 @@ def main():
     print("="*70)
     print(f"Input: {input_dir}")
     print(f"Keep .dat files: {args.keep}")
+    print(f"Read .DAT.bz2 directly: {args.compressed}")
+    print(f"Workers: {args.workers} | Memory budget: {args.memory_budget or 'unlimited'} MB")
+    print(f"One Scene per time slot: {args.scene_per_slot} | Reader: {args.reader} | "
+          f"COG outputs: {not args.plain_tiff} | Storage: {args.storage}")
+    print(f"Region: {region or 'full disk'}")
     print("="*70)
 
     datetime_folders = find_datetime_folders(input_dir)
     if not datetime_folders:
         # Check if input itself contains .dat files
-        dat_files = list(input_dir.rglob("*.dat")) + list(input_dir.rglob("*.DAT"))
+        dat_files = find_segment_files(input_dir, args.compressed)
         if dat_files:
             datetime_folders = [input_dir]
         else:
@@ -205,13 +699,11 @@ def main():
     if args.bands:
         bands_to_process = [b.strip().zfill(2) for b in args.bands.split(',')]
 
-    total_success = 0
-    total_groups = 0
-
-    for folder in datetime_folders:
-        success, groups = process_datetime_folder(folder, bands_to_process, keep=args.keep)
-        total_success += success
-        total_groups += groups
+    total_success, total_groups = decode_folders(datetime_folders, bands_to_process, keep=args.keep,
+                                                 compressed=args.compressed, workers=args.workers,
+                                                 memory_budget=args.memory_budget * MB,
+                                                 scene_per_slot=args.scene_per_slot, reader=args.reader,
+                                                 cog=not args.plain_tiff, storage=args.storage, region=region)
 
     print("\n" + "="*70)
     print("DECODING SUMMARY")
@@ -2,45 +2,106 @@
 """
 Himawari AHI Satellite Data Processor - EXTRACTION ONLY
 Extracts all .bz2 files with concurrent processing (matches download concurrency)
+
+Engines: a thread pool (default) or a process pool runs one file per worker;
+with --block-threshold, files at least that large are instead split into
+their bz2 blocks, which are decompressed in parallel on the same pool.
+bench_extract.py compares them on a synthetic dataset.
 """
 
 import sys
 import os
 import bz2
 from pathlib import Path
-from typing import Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from bz2_blocks import decompress_blocks
+from process_manifest import ProcessManifest, fingerprint
+
+# Read size when streaming compressed data (bytes)
+CHUNK_SIZE = 1024 * 1024
+
+ENGINES = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def decompress_stream(stream, dat_path: Path, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Decompress a bz2 byte stream (open file, S3 response body, ...) into dat_path
+    chunk by chunk, so neither the compressed nor the decompressed data ever has
+    to be in memory as a whole: at most chunk_size bytes are read or produced
+    per step, whatever the segment size. Writes to a temporary file and renames
+    it into place at the end, so an interrupted run never leaves a truncated
+    .dat behind. Returns the number of decompressed bytes written.
+    """
+    tmp_path = dat_path.with_name(dat_path.name + ".part")
+    decompressor = bz2.BZ2Decompressor()
+    in_stream = False
+    pending = b""
+    written = 0
+
+    try:
+        with open(tmp_path, 'wb') as f_out:
+            while True:
+                if decompressor.needs_input:
+                    if not pending:
+                        pending = stream.read(chunk_size)
+                        if not pending:
+                            break
+                    data = decompressor.decompress(pending, chunk_size)
+                    pending = b""
+                else:
+                    # Output was capped at chunk_size: drain what is buffered first
+                    data = decompressor.decompress(b"", chunk_size)
+                f_out.write(data)
+                written += len(data)
+                in_stream = True
+                # Multi-stream files: start a new decompressor on the leftover bytes
+                if decompressor.eof:
+                    pending = decompressor.unused_data
+                    decompressor = bz2.BZ2Decompressor()
+                    in_stream = False
 
+        if in_stream or written == 0:
+            raise EOFError("Compressed stream ended before the end-of-stream marker")
+        os.replace(tmp_path, dat_path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
 
-def extract_single_file(bz2_file: Path) -> Tuple[bool, str]:
+    return written
+
+
+def extract_single_file(bz2_file: Path, manifest: ProcessManifest = None) -> Tuple[bool, str]:
     """
     Extract a single .bz2 file and delete original
+    (any existing .dat is replaced: extract_bz2_files has already skipped complete ones)
+    manifest: ProcessManifest of the folder to record the .dat in, if given
     Returns: (success, filename)
     """
     try:
         filename = bz2_file.name
         dat_path = bz2_file.with_suffix('')
-        
-        # Skip if already extracted
-        if dat_path.exists():
-            print(f"[~] Already extracted: {filename}")
-            try:
-                bz2_file.unlink()  # Delete original
-            except:
-                pass
-            return True, filename
+        inputs = fingerprint([bz2_file]) if manifest is not None else None
         
         print(f"[+] Extracting: {filename}")
         
-        # Extract file
-        with bz2.open(bz2_file, 'rb') as f_in:
-            data = f_in.read()
-        
-        with open(dat_path, 'wb') as f_out:
-            f_out.write(data)
+        # Stream into <name>.DAT.part and rename, so memory use stays at a few
+        # chunks per worker and a half-written .DAT never appears
+        with open(bz2_file, 'rb') as f_in:
+            decompress_stream(f_in, dat_path)
         
         # Delete original
         bz2_file.unlink()
+
+        if manifest is not None:
+            manifest.record(dat_path, inputs, "extract")
         
         print(f"[OK] Extracted and deleted: {filename}")
         return True, filename
@@ -50,15 +111,49 @@ def extract_single_file(bz2_file: Path) -> Tuple[bool, str]:
         return False, bz2_file.name
 
 
-def extract_bz2_files(input_dir: Path, max_workers: int = 8) -> Tuple[int, int]:
+def extract_large_file(bz2_file: Path, executor, max_workers: int) -> Tuple[bool, str]:
+    """
+    Extract one big .bz2 file by decompressing its blocks in parallel on executor
+    Falls back to extract_single_file if the file can't be split
+    Returns: (success, filename)
+    """
+    filename = bz2_file.name
+    dat_path = bz2_file.with_suffix('')
+
+    print(f"[+] Extracting in parallel blocks: {filename}")
+    try:
+        written = decompress_blocks(bz2_file, dat_path, executor, max_workers * 2)
+    except Exception as e:
+        print(f"[~] Block-parallel extraction failed for {filename} ({e}), extracting serially")
+        written = None
+
+    if written is None:
+        return extract_single_file(bz2_file)
+
+    try:
+        bz2_file.unlink()
+    except OSError as e:
+        print(f"[!] Could not delete {filename}: {e}")
+    print(f"[OK] Extracted and deleted: {filename}")
+    return True, filename
+
+
+def extract_bz2_files(input_dir: Path, max_workers: int = 8, bands: List[str] = None,
+                      engine: str = "thread", block_threshold: int = 0) -> Tuple[int, int]:
     """
     Extract all .bz2 files concurrently and delete originals
+    bands: only extract these bands (e.g. ["03", "13"])
+    engine: "thread" or "process" pool
+    block_threshold: files of at least this many bytes are split into blocks
+                     decompressed in parallel (0 = never)
     Returns: (success_count, total_count)
     """
-    print(f"[+] Extracting .bz2 files (max {max_workers} concurrent)...")
+    print(f"[+] Extracting .bz2 files (max {max_workers} concurrent, {engine} pool)...")
     
     # Find all .bz2 files recursively
     bz2_files = list(input_dir.rglob("*.bz2"))
+    if bands:
+        bz2_files = [f for f in bz2_files if any(f"_B{band}_" in f.name for band in bands)]
     
     if not bz2_files:
         print("[!] No .bz2 files found")
@@ -68,15 +163,54 @@ def extract_bz2_files(input_dir: Path, max_workers: int = 8) -> Tuple[int, int]:
     
     success_count = 0
     total_count = len(bz2_files)
+
+    # A .dat only counts as extracted if the manifest says it was completed from
+    # this .bz2; anything else (e.g. truncated by a crash) is extracted again
+    manifests = {}
+    inputs = {}
+    pending = []
+    for bz2_file in bz2_files:
+        folder = bz2_file.parent
+        if folder not in manifests:
+            manifests[folder] = ProcessManifest(folder)
+        inputs[bz2_file] = fingerprint([bz2_file])
+        if manifests[folder].is_complete(bz2_file.with_suffix(''), inputs[bz2_file]):
+            print(f"[~] Already extracted: {bz2_file.name}")
+            try:
+                bz2_file.unlink()
+            except OSError:
+                pass
+            success_count += 1
+        else:
+            pending.append(bz2_file)
+    bz2_files = pending
+
+    def record(bz2_file):
+        manifests[bz2_file.parent].record(bz2_file.with_suffix(''), inputs[bz2_file], "extract", save=False)
+
+    large_files = [f for f in bz2_files if block_threshold and f.stat().st_size >= block_threshold]
+    if large_files:
+        print(f"[+] {len(large_files)} files of {block_threshold // (1024 * 1024)} MB or more "
+              f"will be decompressed in parallel blocks")
     
-    # Use ThreadPoolExecutor for concurrent extraction
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(extract_single_file, f): f for f in bz2_files}
+    with ENGINES[engine](max_workers=max_workers) as executor:
+        futures = {executor.submit(extract_single_file, f): f for f in bz2_files if f not in large_files}
+
+        # Big files are split here; their blocks queue up on the same pool
+        for bz2_file in large_files:
+            success, _ = extract_large_file(bz2_file, executor, max_workers)
+            if success:
+                success_count += 1
+                record(bz2_file)
         
         for future in as_completed(futures):
             success, filename = future.result()
             if success:
                 success_count += 1
+                record(futures[future])
+
+    for manifest in manifests.values():
+        manifest.save()
     
     print(f"[OK] Extraction complete: {success_count}/{total_count} files")
     return success_count, total_count
@@ -89,6 +223,11 @@ def main():
     parser.add_argument("-i", "--input", required=True, help="Input directory containing .bz2 files")
     parser.add_argument("--keep", action="store_true", help="Keep original .bz2 files (don't delete)")
     parser.add_argument("--max-workers", type=int, default=8, help="Maximum concurrent extraction workers (matches download concurrency)")
+    parser.add_argument("--bands", help="Comma-separated bands to extract (e.g. 03,13), default all")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="thread",
+                        help="Run extractions on a thread or a process pool")
+    parser.add_argument("--block-threshold", type=float, default=0,
+                        help="Decompress files of at least this many MB in parallel blocks (0 = off)")
     
     args = parser.parse_args()
     
@@ -102,10 +241,18 @@ def main():
     print("HIMAWARI AHI DATA EXTRACTOR")
     print("="*60)
     print(f"Input directory: {input_dir}")
-    print(f"Max concurrent workers: {args.max_workers}")
+    print(f"Max concurrent workers: {args.max_workers} ({args.engine} pool)")
+    if args.block_threshold:
+        print(f"Block-parallel for files >= {args.block_threshold} MB")
     print("="*60)
     
-    success, total = extract_bz2_files(input_dir, args.max_workers)
+    bands = None
+    if args.bands:
+        bands = [b.strip().zfill(2) for b in args.bands.split(',')]
+        print(f"Bands: {', '.join(bands)}")
+    
+    success, total = extract_bz2_files(input_dir, args.max_workers, bands, args.engine,
+                                       int(args.block_threshold * 1024 * 1024))
     
     print("\n" + "="*60)
     print("EXTRACTION SUMMARY")
@@ -51,6 +51,9 @@ except ImportError:
     print("[!] WARNING: pyproj not installed. Per-pixel lat/lon not available.")
     print("[!] Install with: pip install pyproj")
 
+from process_manifest import ProcessManifest, fingerprint, remove_stale
+from himawari_geo import FULL_DISK_WIDTH
+
 # ============================================================================
 # ADVANCED RGB PRODUCT DEFINITIONS
 # Recipes based on JMA Himawari RGB Composite Guide & NOAA Quick Guides
@@ -280,6 +283,16 @@ def linear_scale_with_gamma(data, min_val, max_val, gamma=1.0, invert=False):
 def read_band_data(band_file, nodata_value=None, target_shape=None):
     with rasterio.open(band_file) as src:
         meta = src.meta.copy()
+        if target_shape and src.crs and src.crs.to_dict().get('proj') == 'geos':
+            # Full disk, strip or sector (bg_decode --region): resample to the
+            # pixel size target_shape has on the full disk, so every band of the
+            # same window ends up with the same shape whatever its extent
+            pixel_size = FULL_DISK_WIDTH / target_shape[1]
+            target_shape = (max(1, round(src.height * abs(src.transform.e) / pixel_size)),
+                            max(1, round(src.width * abs(src.transform.a) / pixel_size)))
+        elif target_shape and src.height != src.width:
+            # Partial disk strip without a CRS: keep its aspect ratio
+            target_shape = (round(target_shape[1] * src.height / src.width), target_shape[1])
         if target_shape and (src.height != target_shape[0] or src.width != target_shape[1]):
             data = src.read(1, out_shape=target_shape, resampling=Resampling.bilinear)
             meta.update({
@@ -293,9 +306,17 @@ def read_band_data(band_file, nodata_value=None, target_shape=None):
             data = src.read(1)
         if nodata_value is None and src.nodata is not None:
             nodata_value = src.nodata
-        if nodata_value is not None:
+        # Bands saved with bg_decode --storage uint16 carry a scale/offset:
+        # turn them back into reflectance/brightness temperature
+        scale, offset = src.scales[0], src.offsets[0]
+        if nodata_value is not None or scale != 1 or offset != 0:
+            raw = data
             data = data.astype(np.float32)
-            data[data == nodata_value] = np.nan
+            if nodata_value is not None:
+                data[raw == nodata_value] = np.nan
+            if scale != 1 or offset != 0:
+                data = data * np.float32(scale) + np.float32(offset)
+                meta.update({'dtype': 'float32', 'nodata': np.nan})
         return data, meta
 
 def band_difference(band1_data, band2_data):
@@ -449,9 +470,6 @@ def create_grayscale_product(product_key, product_info, band_dir, target_shape):
     sat_dir = band_dir / "sat"
     sat_dir.mkdir(exist_ok=True)
     output_file = sat_dir / f"{product_key}.tif"
-    if output_file.exists() and output_file.stat().st_size > 1000:
-        print(f"[~] Already exists: {output_file}")
-        return True
 
     try:
         print(f"[GRAYSCALE] Creating {product_info['name']}...")
@@ -505,9 +523,6 @@ def create_rgb_custom(product_key, product_info, band_dir, target_shape):
     sat_dir = band_dir / "sat"
     sat_dir.mkdir(exist_ok=True)
     output_file = sat_dir / f"{product_key}.tif"
-    if output_file.exists() and output_file.stat().st_size > 1000:
-        print(f"[~] Already exists: {output_file}")
-        return True
 
     try:
         print(f"[CUSTOM] Creating {product_info['name']}...")
@@ -636,9 +651,6 @@ def create_sandwich_product_enhanced(band_dir, target_shape):
     sat_dir = band_dir / "sat"
     sat_dir.mkdir(exist_ok=True)
     output_file = sat_dir / "sandwich.tif"
-    if output_file.exists() and output_file.stat().st_size > 1000:
-        print(f"[~] Already exists: {output_file}")
-        return True
 
     try:
         ir_data, meta = read_band_data(band_dir / "B13.tif", target_shape=target_shape)
@@ -675,16 +687,29 @@ def create_sandwich_product_enhanced(band_dir, target_shape):
         return False
 
 def create_rgb_product(product_key, product_info, band_dir):
+    # Skip only products recorded as complete from the current band GeoTIFFs;
+    # a file left half-written by a crash, or made from older bands, is redone
+    manifest = ProcessManifest(band_dir)
+    output_file = band_dir / "sat" / f"{product_key}.tif"
+    inputs = fingerprint(band_dir / f"{band}.tif" for band in product_info["bands"])
+    if manifest.is_complete(output_file, inputs):
+        print(f"[~] Already exists: {output_file}")
+        return True
+    remove_stale(output_file, "creating it")
+
     target_shape = get_target_shape(product_info)
     print(f"[+] Target resolution: {target_shape[0]}x{target_shape[1]} ({'1km' if target_shape[0]==2200 else '2km'})")
     
     if product_info.get("single_band", False):
-        return create_grayscale_product(product_key, product_info, band_dir, target_shape)
-    
-    if product_info.get("use_satpy", False) and SATPY_AVAILABLE:
-        return create_rgb_with_satpy(product_key, product_info, band_dir, target_shape)
+        created = create_grayscale_product(product_key, product_info, band_dir, target_shape)
+    elif product_info.get("use_satpy", False) and SATPY_AVAILABLE:
+        created = create_rgb_with_satpy(product_key, product_info, band_dir, target_shape)
     else:
-        return create_rgb_custom(product_key, product_info, band_dir, target_shape)
+        created = create_rgb_custom(product_key, product_info, band_dir, target_shape)
+
+    if created and output_file.exists():
+        manifest.record(output_file, inputs, "product")
+    return created
 
 def find_band_files(base_dir):
     """
@@ -0,0 +1,135 @@
+"""
+Block-parallel bz2 decompression.
+
+A bz2 stream is a sequence of independently compressed blocks (up to 900 kB
+of input each), but they are not byte aligned: every block starts with the
+48-bit magic 0x314159265359 at an arbitrary bit offset. Like lbzip2, we find
+those magics, cut the stream into blocks and re-wrap each one as a tiny
+stand-alone bz2 stream (header + block + end-of-stream marker with the
+block CRC as the stream CRC). The blocks can then be decompressed on any
+number of workers and concatenated in order. Each block's CRC is still
+checked, so a false match of the magic inside compressed data shows up as a
+decompression error and the caller falls back to serial decompression.
+"""
+
+import bz2
+import os
+from collections import deque
+from pathlib import Path
+
+BLOCK_MAGIC = 0x314159265359
+EOS_MAGIC = 0x177245385090
+STREAM_HEADER = b"BZh9"
+
+MASK48 = (1 << 48) - 1
+
+
+def find_bit_pattern(data, pattern):
+    """Sorted bit offsets of every occurrence of a 48-bit pattern in data"""
+    offsets = []
+    for shift in range(8):
+        # Pattern starting `shift` bits into a byte, as 7 bytes of which the
+        # middle ones are fully determined; find those, then check the edges
+        window = (pattern << (8 - shift)).to_bytes(7, 'big')
+        needle, lead = (window[:6], 0) if shift == 0 else (window[1:6], 1)
+        pos = 0
+        while True:
+            idx = data.find(needle, pos)
+            if idx < 0:
+                break
+            pos = idx + 1
+            byte = idx - lead
+            if byte < 0 or byte + 7 > len(data) + (1 if shift == 0 else 0):
+                continue
+            chunk = int.from_bytes(data[byte:byte + 7].ljust(7, b"\0"), 'big')
+            if (chunk >> (8 - shift)) & MASK48 == pattern:
+                offsets.append(byte * 8 + shift)
+    return sorted(offsets)
+
+
+def read_bits(data, start, length):
+    """Integer value of `length` bits of data starting at bit offset `start`"""
+    first = start // 8
+    last = (start + length + 7) // 8
+    value = int.from_bytes(data[first:last], 'big')
+    return (value >> (last * 8 - start - length)) & ((1 << length) - 1)
+
+
+def split_blocks(data):
+    """
+    Split a (possibly multi-stream) bz2 file into stand-alone single-block
+    bz2 streams, in order. Returns [] if data doesn't look like bz2.
+    """
+    if not data.startswith(b"BZh"):
+        return []
+    blocks = find_bit_pattern(data, BLOCK_MAGIC)
+    ends = find_bit_pattern(data, EOS_MAGIC)
+    if not blocks or not ends:
+        return []
+
+    # A block runs up to the next block or end-of-stream marker, whichever comes first
+    markers = sorted(blocks + ends)
+    next_marker = {bit: markers[i + 1] for i, bit in enumerate(markers[:-1])}
+
+    streams = []
+    for start in blocks:
+        end = next_marker.get(start)
+        if end is None:
+            return []
+        length = end - start
+        block_crc = read_bits(data, start + 48, 32)
+        bits = read_bits(data, start, length)
+
+        # header + block + end-of-stream magic + stream CRC, padded to a byte
+        total = 32 + length + 48 + 32
+        value = int.from_bytes(STREAM_HEADER, 'big')
+        value = (value << length) | bits
+        value = (value << 48) | EOS_MAGIC
+        value = (value << 32) | block_crc
+        pad = -total % 8
+        streams.append((value << pad).to_bytes((total + pad) // 8, 'big'))
+    return streams
+
+
+def decompress_block(stream):
+    """Decompress one stand-alone block stream (runs in a worker)"""
+    return bz2.decompress(stream)
+
+
+def decompress_blocks(bz2_path, dat_path, executor, max_in_flight):
+    """
+    Decompress a .bz2 file by handing its blocks to executor (thread or
+    process pool), writing results in order to <dat_path>.part and renaming
+    it into place. At most max_in_flight blocks are queued at a time, so
+    memory stays bounded by the compressed file plus that many blocks.
+    Returns the decompressed size, or None if the file couldn't be split.
+    """
+    dat_path = Path(dat_path)
+    data = Path(bz2_path).read_bytes()
+    streams = split_blocks(data)
+    del data
+    if len(streams) < 2:
+        return None
+
+    tmp_path = dat_path.with_name(dat_path.name + ".part")
+    written = 0
+    pending = deque()
+    try:
+        with open(tmp_path, 'wb') as f_out:
+            streams.reverse()
+            while streams or pending:
+                while streams and len(pending) < max_in_flight:
+                    pending.append(executor.submit(decompress_block, streams.pop()))
+                data = pending.popleft().result()
+                f_out.write(data)
+                written += len(data)
+        os.replace(tmp_path, dat_path)
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+    return written
@@ -1,13 +1,79 @@
 import os
+import xml.etree.ElementTree as ET
 from pathlib import Path
 import tifffile as tiff
 import numpy as np
 from PIL import Image
 
+
+def gdal_scaling(metadata: str):
+    """(scale, offset) of the first band from a GDAL_METADATA tag, (1, 0) if it has none"""
+    values = {'scale': 1.0, 'offset': 0.0}
+    for item in ET.fromstring(metadata).iter('Item'):
+        if item.get('role') in values and item.get('sample', '0') == '0':
+            values[item.get('role')] = float(item.text)
+    return values['scale'], values['offset']
+
+
+def read_band(path) -> np.ndarray:
+    """
+    Read a TIFF. Integer bands with GDAL nodata / scale / offset tags (bg_decode
+    --storage uint16) come back as float32 physical values, NaN for no data.
+    """
+    with tiff.TiffFile(path) as tif:
+        image = tif.asarray()
+        tags = tif.pages[0].tags
+        nodata = tags.get('GDAL_NODATA')
+        metadata = tags.get('GDAL_METADATA')
+    if image.dtype == np.uint8 or image.dtype.kind not in 'iu':
+        return image
+
+    scale, offset = gdal_scaling(metadata.value) if metadata else (1.0, 0.0)
+    if nodata is None and (scale, offset) == (1.0, 0.0):
+        return image
+    data = image.astype(np.float32) * np.float32(scale) + np.float32(offset)
+    if nodata is not None:
+        data[image == float(nodata.value)] = np.nan
+    return data
+
+
+def display_array(image: np.ndarray) -> np.ndarray:
+    """
+    Bands last and 8 bits, as PIL expects. Data that isn't uint8 (e.g. float32
+    bands from bg_decode --storage float32, or read_band's un-scaled uint16
+    ones) is stretched between its valid minimum and maximum; NaN pixels are black.
+    """
+    # Handle planar configuration
+    if image.ndim == 3 and image.shape[0] in (3, 4):
+        image = np.moveaxis(image, 0, -1)
+    if image.dtype == np.uint8:
+        return image
+
+    data = image.astype(np.float32)
+    valid = np.isfinite(data)
+    display = np.zeros(data.shape, dtype=np.uint8)
+    if valid.any():
+        low, high = data[valid].min(), data[valid].max()
+        if high > low:
+            display[valid] = ((data[valid] - low) / (high - low) * 255).astype(np.uint8)
+    return display
+
+
+def open_display_image(path) -> Image.Image:
+    """Open a TIFF for display: 8-bit images as they are, other data through display_array"""
+    with tiff.TiffFile(path) as tif:
+        dtype = tif.pages[0].dtype
+    if dtype == np.uint8:
+        return Image.open(path)
+    return Image.fromarray(display_array(read_band(path)))
+
+
 class CacheManager:
     """
     Generates a pyramidal cache of PNG images from input TIFFs.
     """
+    open_display_image = staticmethod(open_display_image)
+
     # Zoom levels for generating cached images
     ZOOM_LEVELS = [1.0, 0.5, 0.25]
 
@@ -24,24 +90,16 @@ class CacheManager:
         Reads all TIFF files in the input directory and generates
         resized PNG images at predefined zoom levels.
         """
-        # Collect TIFF files (case-insensitive)
-        tiff_files = [p for p in self.input_dir.iterdir() if p.suffix.lower() == ".tif"]
+        # Collect TIFF files (case-insensitive), skipping hidden ones such as
+        # bands bg_decode is still writing
+        tiff_files = [p for p in self.input_dir.iterdir()
+                      if p.suffix.lower() == ".tif" and not p.name.startswith(".")]
         if not tiff_files:
             raise FileNotFoundError(f"[ERROR] No TIFF found in {self.input_dir}")
 
         for tif_path in tiff_files:
             print(f"[INFO] Processing {tif_path.name}")
-            image = tiff.imread(tif_path)
-
-            # Handle planar configuration
-            if image.ndim == 3 and image.shape[0] in (3, 4):
-                image = np.moveaxis(image, 0, -1)
-
-            # Normalize to uint8 if necessary
-            if image.dtype != np.uint8:
-                image = ((image - image.min()) / image.ptp() * 255).astype(np.uint8)
-
-            pil_image = Image.fromarray(image)
+            pil_image = Image.fromarray(display_array(read_band(tif_path)))
 
             # Generate resized PNGs for each zoom level
             for z in self.ZOOM_LEVELS:
@@ -0,0 +1,151 @@
+"""
+Per-directory download manifest for the Himawari file manager.
+
+Each download folder gets a small JSON file recording, for every S3 object
+fetched into it, the key, size, ETag, last-modified time and what we have
+locally ("partial", "downloaded" .bz2 or "extracted" .DAT). Re-running a
+download compares the listing against it and against the files on disk so
+only missing or changed objects are transferred again. Once a band has been
+decoded its segments are deleted, so a completed B??.tif (as recorded by
+bg_decode in the folder's process manifest) also counts.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from himawari_geo import parse_segment
+from process_manifest import ProcessManifest
+
+MANIFEST_NAME = ".download_manifest.json"
+
+PARTIAL = "partial"
+DOWNLOADED = "downloaded"
+EXTRACTED = "extracted"
+
+
+def normalize_etag(etag):
+    return (etag or "").strip('"')
+
+
+def extracted_name(filename):
+    """HS_..._S0110.DAT.bz2 -> HS_..._S0110.DAT"""
+    return filename[:-4] if filename.lower().endswith('.bz2') else filename
+
+
+def partial_path(local_path):
+    """Temporary file an interrupted download is resumed from"""
+    local_path = Path(local_path)
+    return local_path.with_name(local_path.name + ".part")
+
+
+class DownloadManifest:
+    """
+    Manifest of the S3 objects downloaded into one directory.
+    Safe to update from several download threads.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.path = self.directory / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self.entries = {}
+        self._process_manifest = None
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('objects', {})
+        except (OSError, ValueError) as e:
+            print(f"[!] Ignoring unreadable download manifest {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        with self._lock:
+            data = {'objects': dict(self.entries)}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[!] Could not write download manifest {self.path}: {e}")
+
+    def update(self, file_info, state, save=True):
+        """Record the local state of an object from an S3 listing"""
+        last_modified = file_info.get('last_modified')
+        entry = {
+            'size': file_info['size'],
+            'etag': normalize_etag(file_info.get('etag')),
+            'last_modified': last_modified.isoformat() if hasattr(last_modified, 'isoformat') else last_modified,
+            'state': state,
+            'local': Path(file_info['key']).name,
+        }
+        with self._lock:
+            self.entries[file_info['key']] = entry
+        if save:
+            self.save()
+
+    def _same_object(self, entry, file_info):
+        if entry is None or entry.get('size') != file_info['size']:
+            return False
+        etag = normalize_etag(file_info.get('etag'))
+        return not etag or not entry.get('etag') or entry['etag'] == etag
+
+    def _band_decoded(self, filename):
+        parsed = parse_segment(filename)
+        if parsed is None:
+            return False
+        with self._lock:
+            if self._process_manifest is None:
+                self._process_manifest = ProcessManifest(self.directory)
+        return self._process_manifest.is_complete(self.directory / f"B{parsed[0]:02d}.tif")
+
+    def local_state(self, file_info):
+        """
+        Return what is already on disk for an object: "downloaded", "extracted",
+        "decoded", or None if it has to be (re)downloaded.
+        """
+        filename = Path(file_info['key']).name
+        local_path = self.directory / filename
+        dat_path = self.directory / extracted_name(filename)
+
+        with self._lock:
+            entry = self.entries.get(file_info['key'])
+
+        if entry is not None and not self._same_object(entry, file_info):
+            # The object changed on S3 since we fetched it
+            return None
+
+        if local_path.exists() and local_path.stat().st_size == file_info['size']:
+            return DOWNLOADED
+        if dat_path != local_path and dat_path.exists():
+            # .DAT files are only ever moved into place once complete
+            return EXTRACTED
+        if self._band_decoded(filename):
+            return "decoded"
+        return None
+
+    def resume_offset(self, file_info):
+        """Bytes of a previous partial download that can be kept, 0 to start over"""
+        part = partial_path(self.directory / Path(file_info['key']).name)
+        if not part.exists():
+            return 0
+
+        with self._lock:
+            entry = self.entries.get(file_info['key'])
+        size = part.stat().st_size
+        if entry is None or entry.get('state') != PARTIAL or not self._same_object(entry, file_info) \
+                or size >= file_info['size']:
+            try:
+                part.unlink()
+            except OSError:
+                pass
+            return 0
+        return size
@@ -0,0 +1,167 @@
+"""
+Himawari AHI full-disk geometry helpers.
+
+Converts latitude/longitude to full-disk line/column numbers with the
+normalized geostationary projection used by the Himawari Standard Data
+(HSD) format, so we can work out which of the ten latitude segments, or which
+pixel window, covers a region before downloading or decoding anything.
+"""
+
+import math
+import re
+from functools import lru_cache
+
+# Sub-satellite longitude and distance from the Earth's centre (km)
+SUB_LON = 140.7
+SAT_DISTANCE = 42164.0
+EARTH_EQ_RADIUS = 6378.1370
+EARTH_POLAR_RADIUS = 6356.7523
+
+# Full-disk grid per resolution in km: (lines/columns, LFAC/CFAC, LOFF/COFF)
+GRIDS = {
+    0.5: (22000, 81865099, 11000.5),
+    1.0: (11000, 40932549, 5500.5),
+    2.0: (5500, 20466275, 2750.5),
+}
+
+# Spatial resolution (km) of each AHI band
+BAND_RESOLUTION = {
+    1: 1.0, 2: 1.0, 3: 0.5, 4: 1.0,
+    5: 2.0, 6: 2.0, 7: 2.0, 8: 2.0, 9: 2.0, 10: 2.0,
+    11: 2.0, 12: 2.0, 13: 2.0, 14: 2.0, 15: 2.0, 16: 2.0,
+}
+
+TOTAL_SEGMENTS = 10
+
+# Width of the full-disk image in geos projection metres (the same at every resolution)
+FULL_DISK_WIDTH = (math.radians(2 ** 16 / GRIDS[2.0][1]) * (SAT_DISTANCE - EARTH_EQ_RADIUS) * 1000
+                   * GRIDS[2.0][0])
+
+# Named regions as (lat_min, lat_max, lon_min, lon_max)
+REGIONS = {
+    "philippines": (4.0, 21.5, 116.0, 127.0),
+    "west_pacific": (0.0, 30.0, 110.0, 160.0),
+}
+
+# Points sampled along each side of a bounding box when projecting it
+BBOX_SAMPLES = 21
+
+# HS_H09_20240115_0000_B13_FLDK_R20_S0110.DAT(.bz2)
+SEGMENT_PATTERN = re.compile(r'_B(\d{2})_.*_S(\d{2})(\d{2})\.', re.IGNORECASE)
+
+
+def resolve_region(value):
+    """
+    Turn a region name ("philippines") or a "lat_min,lat_max,lon_min,lon_max"
+    string into a bounding box tuple. Raises ValueError for anything else.
+    """
+    if isinstance(value, (tuple, list)):
+        bbox = tuple(float(v) for v in value)
+    elif value.strip().lower() in REGIONS:
+        return REGIONS[value.strip().lower()]
+    else:
+        bbox = tuple(float(v) for v in value.split(','))
+
+    if len(bbox) != 4:
+        raise ValueError(f"Expected lat_min,lat_max,lon_min,lon_max, got: {value}")
+    lat_min, lat_max, lon_min, lon_max = bbox
+    if not (-90 <= lat_min < lat_max <= 90) or lon_min >= lon_max:
+        raise ValueError(f"Invalid bounding box: {value}")
+    return bbox
+
+
+def latlon_to_line_col(lat, lon, resolution=2.0, sub_lon=SUB_LON, grid=None):
+    """
+    Project a point to fractional full-disk (line, column), 1-based as in the
+    HSD headers. Returns None if the point is not visible from the satellite.
+    grid = (lines, LFAC/CFAC, LOFF/COFF) from a file's header overrides the
+    nominal grid of the resolution.
+    """
+    lines, factor, offset = grid or GRIDS[resolution]
+
+    lat_rad = math.radians(lat)
+    dlon = math.radians(lon - sub_lon)
+
+    # Geocentric latitude and distance from the Earth's centre to the point
+    c_lat = math.atan((EARTH_POLAR_RADIUS ** 2 / EARTH_EQ_RADIUS ** 2) * math.tan(lat_rad))
+    eccentricity2 = 1 - EARTH_POLAR_RADIUS ** 2 / EARTH_EQ_RADIUS ** 2
+    rl = EARTH_POLAR_RADIUS / math.sqrt(1 - eccentricity2 * math.cos(c_lat) ** 2)
+
+    r1 = SAT_DISTANCE - rl * math.cos(c_lat) * math.cos(dlon)
+    r2 = -rl * math.cos(c_lat) * math.sin(dlon)
+    r3 = rl * math.sin(c_lat)
+
+    # Behind the limb: the satellite's line of sight hits the other side of the Earth
+    if r1 * SAT_DISTANCE - (r1 ** 2 + r2 ** 2 + (EARTH_EQ_RADIUS / EARTH_POLAR_RADIUS) ** 2 * r3 ** 2) < 0:
+        return None
+
+    rn = math.sqrt(r1 ** 2 + r2 ** 2 + r3 ** 2)
+    x = math.degrees(math.atan2(-r2, r1))
+    y = math.degrees(math.asin(-r3 / rn))
+
+    column = offset + x * factor / 2 ** 16
+    line = offset + y * factor / 2 ** 16
+    return line, column
+
+
+def bbox_line_col_range(bbox, resolution=2.0, grid=None):
+    """
+    Return (first_line, last_line, first_column, last_column), 1-based and
+    inclusive, of the full-disk pixels covering a lat/lon bounding box.
+    Raises ValueError if no part of the box is visible.
+    """
+    lat_min, lat_max, lon_min, lon_max = bbox
+    lines, _, _ = grid or GRIDS[resolution]
+
+    points = []
+    for i in range(BBOX_SAMPLES):
+        for j in range(BBOX_SAMPLES):
+            lat = lat_min + (lat_max - lat_min) * i / (BBOX_SAMPLES - 1)
+            lon = lon_min + (lon_max - lon_min) * j / (BBOX_SAMPLES - 1)
+            projected = latlon_to_line_col(lat, lon, resolution, grid=grid)
+            if projected is not None:
+                points.append(projected)
+
+    if not points:
+        raise ValueError(f"Region {bbox} is not visible from the satellite")
+
+    first_line = max(1, math.floor(min(p[0] for p in points)))
+    last_line = min(lines, math.ceil(max(p[0] for p in points)))
+    first_column = max(1, math.floor(min(p[1] for p in points)))
+    last_column = min(lines, math.ceil(max(p[1] for p in points)))
+    return first_line, last_line, first_column, last_column
+
+
+@lru_cache(maxsize=None)
+def segments_for_bbox(bbox, band):
+    """Return the sorted segment numbers (1-10) whose lines intersect the bounding box for a band"""
+    resolution = BAND_RESOLUTION[int(band)]
+    lines, _, _ = GRIDS[resolution]
+    lines_per_segment = lines // TOTAL_SEGMENTS
+
+    first_line, last_line, _, _ = bbox_line_col_range(bbox, resolution)
+    first_segment = (first_line - 1) // lines_per_segment + 1
+    last_segment = (last_line - 1) // lines_per_segment + 1
+    return tuple(range(first_segment, min(last_segment, TOTAL_SEGMENTS) + 1))
+
+
+def parse_segment(filename):
+    """Return (band, segment, total_segments) from an HSD file name, or None"""
+    match = SEGMENT_PATTERN.search(filename)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2)), int(match.group(3))
+
+
+def segment_in_region(filename, bbox):
+    """
+    True if an HSD segment file covers part of the bounding box.
+    Files that are not segmented HSD files are always kept.
+    """
+    parsed = parse_segment(filename)
+    if parsed is None:
+        return True
+    band, segment, total = parsed
+    if total != TOTAL_SEGMENTS or band not in BAND_RESOLUTION:
+        return True
+    return segment in segments_for_bbox(tuple(bbox), band)
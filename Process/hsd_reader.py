@@ -0,0 +1,479 @@
+"""
+Native reader for Himawari Standard Data (HSD) segment files.
+
+An HSD segment is a chain of fixed-layout little-endian header blocks
+followed by a plain uint16 array of counts, so decoding a band needs no
+xarray/dask: parse blocks 1-7, memory-map the counts (or decompress a
+.DAT.bz2 into memory), calibrate with vectorized NumPy and write each
+segment's lines straight into the output GeoTIFF. Only one segment is held
+in memory at a time.
+
+Counts are 16-bit, so calibration is done once per calibration block for
+all 65536 possible counts, and every pixel is then a single table lookup.
+Segments of a band share the same block, so the table is built once per
+band and reused from a cache keyed on the block's bytes.
+
+Calibration and masking follow satpy's ahi_hsd reader with its defaults
+(calib_mode='update', mask_space=True), so the GeoTIFFs match the satpy
+engine's: reflectance in % for bands 1-6, brightness temperature in K for
+bands 7-16, NaN for error, off-scan and space pixels.
+"""
+
+import bz2
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from himawari_geo import bbox_line_col_range, BAND_RESOLUTION
+
+try:
+    import rasterio
+    from rasterio.crs import CRS
+    from rasterio.transform import Affine
+    from rasterio.windows import Window
+    RASTERIO_AVAILABLE = True
+except ImportError:
+    RASTERIO_AVAILABLE = False
+
+# Block 1: basic information
+BASIC_INFO = np.dtype([
+    ("hblock_number", "u1"),
+    ("blocklength", "<u2"),
+    ("total_number_of_hblocks", "<u2"),
+    ("byte_order", "u1"),
+    ("satellite", "S16"),
+    ("proc_center_name", "S16"),
+    ("observation_area", "S4"),
+    ("other_observation_info", "S2"),
+    ("observation_timeline", "<u2"),
+    ("observation_start_time", "<f8"),
+    ("observation_end_time", "<f8"),
+    ("file_creation_time", "<f8"),
+    ("total_header_length", "<u4"),
+    ("total_data_length", "<u4"),
+    ("quality_flag1", "u1"),
+    ("quality_flag2", "u1"),
+    ("quality_flag3", "u1"),
+    ("quality_flag4", "u1"),
+    ("file_format_version", "S32"),
+    ("file_name", "S128"),
+    ("spare", "S40"),
+])
+
+# Block 2: data information
+DATA_INFO = np.dtype([
+    ("hblock_number", "u1"),
+    ("blocklength", "<u2"),
+    ("number_of_bits_per_pixel", "<u2"),
+    ("number_of_columns", "<u2"),
+    ("number_of_lines", "<u2"),
+    ("compression_flag_for_data", "u1"),
+    ("spare", "S40"),
+])
+
+# Block 3: projection information (CGMS normalized geostationary projection)
+PROJ_INFO = np.dtype([
+    ("hblock_number", "u1"),
+    ("blocklength", "<u2"),
+    ("sub_lon", "<f8"),
+    ("CFAC", "<u4"),
+    ("LFAC", "<u4"),
+    ("COFF", "<f4"),
+    ("LOFF", "<f4"),
+    ("distance_from_earth_center", "<f8"),
+    ("earth_equatorial_radius", "<f8"),
+    ("earth_polar_radius", "<f8"),
+    ("req2_rpol2_req2", "<f8"),
+    ("rpol2_req2", "<f8"),
+    ("req2_rpol2", "<f8"),
+    ("coeff_for_sd", "<f8"),
+    ("resampling_types", "<i2"),
+    ("resampling_size", "<i2"),
+    ("spare", "S40"),
+])
+
+# Block 4: navigation information
+NAV_INFO = np.dtype([
+    ("hblock_number", "u1"),
+    ("blocklength", "<u2"),
+    ("navigation_info_time", "<f8"),
+    ("SSP_longitude", "<f8"),
+    ("SSP_latitude", "<f8"),
+    ("distance_earth_center_to_satellite", "<f8"),
+    ("nadir_longitude", "<f8"),
+    ("nadir_latitude", "<f8"),
+    ("sun_position", "<f8", (3,)),
+    ("moon_position", "<f8", (3,)),
+    ("spare", "S40"),
+])
+
+# Block 5: calibration information, followed by the IR or VIS part
+CAL_INFO = np.dtype([
+    ("hblock_number", "u1"),
+    ("blocklength", "<u2"),
+    ("band_number", "<u2"),
+    ("central_wave_length", "<f8"),
+    ("valid_number_of_bits_per_pixel", "<u2"),
+    ("count_value_error_pixels", "<u2"),
+    ("count_value_outside_scan_pixels", "<u2"),
+    ("gain_count2rad_conversion", "<f8"),
+    ("offset_count2rad_conversion", "<f8"),
+])
+
+IR_CAL = np.dtype([
+    ("c0_rad2tb_conversion", "<f8"),
+    ("c1_rad2tb_conversion", "<f8"),
+    ("c2_rad2tb_conversion", "<f8"),
+    ("c0_tb2rad_conversion", "<f8"),
+    ("c1_tb2rad_conversion", "<f8"),
+    ("c2_tb2rad_conversion", "<f8"),
+    ("speed_of_light", "<f8"),
+    ("planck_constant", "<f8"),
+    ("boltzmann_constant", "<f8"),
+    ("spare", "S40"),
+])
+
+VIS_CAL = np.dtype([
+    ("coeff_rad2albedo_conversion", "<f8"),
+    ("coeff_update_time", "<f8"),
+    ("cali_gain_count2rad_conversion", "<f8"),
+    ("cali_offset_count2rad_conversion", "<f8"),
+    ("spare", "S80"),
+])
+
+# Block 6: inter-calibration information
+INTER_CAL_INFO = np.dtype([
+    ("hblock_number", "u1"),
+    ("blocklength", "<u2"),
+    ("gsics_calibration_intercept", "<f8"),
+    ("gsics_calibration_slope", "<f8"),
+    ("gsics_calibration_coeff_quadratic_term", "<f8"),
+    ("gsics_std_scn_radiance_bias", "<f8"),
+    ("gsics_std_scn_radiance_bias_uncertainty", "<f8"),
+    ("gsics_std_scn_radiance", "<f8"),
+    ("gsics_correction_starttime", "<f8"),
+    ("gsics_correction_endtime", "<f8"),
+    ("gsics_radiance_validity_upper_lim", "<f4"),
+    ("gsics_radiance_validity_lower_lim", "<f4"),
+    ("gsics_filename", "S128"),
+    ("spare", "S56"),
+])
+
+# Block 7: segment information
+SEGMENT_INFO = np.dtype([
+    ("hblock_number", "u1"),
+    ("blocklength", "<u2"),
+    ("total_number_of_segments", "u1"),
+    ("segment_sequence_number", "u1"),
+    ("first_line_number_of_image_segment", "<u2"),
+    ("spare", "S40"),
+])
+
+# Blocks 1-7 in file order; 8-11 (navigation corrections, observation
+# times, error lines, spare) are not needed and skipped via the header length
+HEADER_BLOCKS = (
+    (1, "basic", BASIC_INFO),
+    (2, "data", DATA_INFO),
+    (3, "proj", PROJ_INFO),
+    (4, "nav", NAV_INFO),
+    (5, "cal", CAL_INFO),
+    (6, "inter_cal", INTER_CAL_INFO),
+    (7, "segment", SEGMENT_INFO),
+)
+
+# First IR band: bands below it are calibrated to reflectance
+FIRST_IR_BAND = 7
+
+# Entries of a calibration table: every possible uint16 count
+LUT_SIZE = 1 << 16
+
+
+def parse_calibration(cal_block):
+    """(block 5 record, band-specific VIS or IR part) from block 5's bytes"""
+    cal5 = np.frombuffer(cal_block, dtype=CAL_INFO, count=1)[0]
+    cal_dtype = VIS_CAL if cal5["band_number"] < FIRST_IR_BAND else IR_CAL
+    return cal5, np.frombuffer(cal_block, dtype=cal_dtype, count=1, offset=CAL_INFO.itemsize)[0]
+
+
+def read_header(buf):
+    """
+    Parse header blocks 1-7 of an HSD file from bytes (at least the header).
+    Returns a dict of numpy records by block name plus 'calibration' for the
+    band-specific part of block 5 and 'cal_block' for block 5's raw bytes.
+    Raises ValueError for non-HSD data.
+    """
+    header = {}
+    pos = 0
+    for number, name, dtype in HEADER_BLOCKS:
+        if pos + dtype.itemsize > len(buf):
+            raise ValueError("File too short for an HSD header")
+        block = np.frombuffer(buf, dtype=dtype, count=1, offset=pos)[0]
+        if block["hblock_number"] != number:
+            raise ValueError(f"Expected HSD header block {number}, found {block['hblock_number']}")
+        header[name] = block
+        if number == 5:
+            header["cal_block"] = bytes(buf[pos:pos + int(block["blocklength"])])
+            header["calibration"] = parse_calibration(header["cal_block"])[1]
+        pos += int(block["blocklength"])
+
+    if header["basic"]["byte_order"] != 0:
+        raise ValueError("Only little-endian HSD files are supported")
+    if header["data"]["compression_flag_for_data"] != 0:
+        raise ValueError("Compressed HSD data blocks are not supported")
+    return header
+
+
+class Segment:
+    """
+    One HSD segment file. A .DAT.bz2 is only decompressed (in memory) when
+    its counts are read; for its header just the first bytes are unpacked.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.compressed = self.path.suffix.lower() == ".bz2"
+        opener = bz2.open if self.compressed else open
+        with opener(self.path, "rb") as f:
+            head = f.read(BASIC_INFO.itemsize)
+            if len(head) < BASIC_INFO.itemsize:
+                raise ValueError(f"{self.path.name} is too short for an HSD file")
+            basic = np.frombuffer(head, dtype=BASIC_INFO, count=1)[0]
+            self.header = read_header(head + f.read(int(basic["total_header_length"]) - len(head)))
+
+        data = self.header["data"]
+        self.band = int(self.header["cal"]["band_number"])
+        self.lines = int(data["number_of_lines"])
+        self.columns = int(data["number_of_columns"])
+        self.segment = int(self.header["segment"]["segment_sequence_number"])
+        self.total_segments = int(self.header["segment"]["total_number_of_segments"])
+        self.first_line = int(self.header["segment"]["first_line_number_of_image_segment"])
+        self.data_offset = int(self.header["basic"]["total_header_length"])
+
+    def counts(self):
+        """The segment's count array (lines, columns), memory-mapped where possible"""
+        shape = (self.lines, self.columns)
+        if self.compressed:
+            buffer = bz2.decompress(self.path.read_bytes())
+            return np.frombuffer(buffer, dtype="<u2", count=self.lines * self.columns,
+                                 offset=self.data_offset).reshape(shape)
+        return np.memmap(self.path, dtype="<u2", mode="r", offset=self.data_offset, shape=shape)
+
+
+def radiance_coefficients(header):
+    """
+    (gain, offset) from counts to radiance. For visible bands the updated
+    coefficients in the calibration block are used when present, like
+    satpy's default calib_mode='update'.
+    """
+    cal5 = header["cal"]
+    gain = cal5["gain_count2rad_conversion"]
+    offset = cal5["offset_count2rad_conversion"]
+    if cal5["band_number"] < FIRST_IR_BAND:
+        cal = header["calibration"]
+        if cal["cali_gain_count2rad_conversion"] != 0 or cal["cali_offset_count2rad_conversion"] != 0:
+            gain = cal["cali_gain_count2rad_conversion"]
+            offset = cal["cali_offset_count2rad_conversion"]
+    return gain, offset
+
+
+def radiance_to_brightness_temperature(radiance, header):
+    """Planck inversion at the central wavelength plus the block 5 correction polynomial"""
+    cal = header["calibration"]
+    cwl = header["cal"]["central_wave_length"] * 1e-6
+    c, h, k = cal["speed_of_light"], cal["planck_constant"], cal["boltzmann_constant"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radiance = np.where(radiance == 0, np.nan, radiance)
+        te = (h * c) / (k * cwl) / np.log((2 * h * c ** 2) / (radiance * 1.0e6 * cwl ** 5) + 1)
+    bt = cal["c0_rad2tb_conversion"] + cal["c1_rad2tb_conversion"] * te + cal["c2_rad2tb_conversion"] * te ** 2
+    return np.clip(bt, 0, None)
+
+
+def calibrate_counts(counts, header):
+    """Counts -> reflectance (%) or brightness temperature (K) as float32, NaN where invalid"""
+    cal5 = header["cal"]
+    gain, offset = radiance_coefficients(header)
+    radiance = counts.astype(np.float32) * np.float32(gain) + np.float32(offset)
+
+    if cal5["band_number"] < FIRST_IR_BAND:
+        result = radiance * np.float32(header["calibration"]["coeff_rad2albedo_conversion"]) * 100
+        np.clip(result, 0, None, out=result)
+    else:
+        result = radiance_to_brightness_temperature(radiance, header).astype(np.float32)
+
+    invalid = (counts == cal5["count_value_error_pixels"]) | (counts == cal5["count_value_outside_scan_pixels"])
+    result[invalid] = np.nan
+    return result
+
+
+@lru_cache(maxsize=64)
+def calibration_lut(cal_block):
+    """
+    Reflectance/brightness temperature of every count for one calibration
+    block (its raw bytes, which also make it hashable as the cache key)
+    """
+    cal5, calibration = parse_calibration(cal_block)
+    lut = calibrate_counts(np.arange(LUT_SIZE, dtype=np.uint16), {"cal": cal5, "calibration": calibration})
+    lut.setflags(write=False)
+    return lut
+
+
+def calibrate(counts, header):
+    """Calibrate a count array by lookup in its block's table (same values as calibrate_counts)"""
+    return calibration_lut(header["cal_block"])[counts]
+
+
+class Geometry:
+    """
+    Full-disk pixel grid of a band in geos projection metres, from block 3.
+    Lines and columns are 1-based as in the HSD headers; line numbers grow
+    southwards.
+    """
+
+    def __init__(self, header):
+        proj = header["proj"]
+        self.sub_lon = float(proj["sub_lon"])
+        self.a = float(proj["earth_equatorial_radius"]) * 1000
+        self.b = float(proj["earth_polar_radius"]) * 1000
+        self.h = float(proj["distance_from_earth_center"]) * 1000 - self.a
+        self.coff = float(np.float32(proj["COFF"]))
+        self.loff = float(np.float32(proj["LOFF"]))
+        # Scan angle step per pixel (radians) times the satellite height
+        self.dx = np.deg2rad(2 ** 16 / float(proj["CFAC"])) * self.h
+        self.dy = np.deg2rad(2 ** 16 / float(proj["LFAC"])) * self.h
+
+    @property
+    def crs(self):
+        return CRS.from_dict({"proj": "geos", "lon_0": self.sub_lon, "h": self.h,
+                              "a": self.a, "b": self.b, "units": "m"})
+
+    def x(self, column):
+        """Projection x of a (fractional) column; column c's centre is at c"""
+        return (column - self.coff) * self.dx
+
+    def y(self, line):
+        return -(line - self.loff) * self.dy
+
+    def transform(self, first_line, first_column=1):
+        """Affine transform of a raster whose top-left pixel is (first_line, first_column)"""
+        return Affine(self.dx, 0.0, self.x(first_column - 0.5),
+                      0.0, -self.dy, self.y(first_line - 0.5))
+
+    def earth_mask(self, first_line, lines, first_column, columns):
+        """
+        True for pixel centres on the Earth's disk, False in space (the same
+        ellipse test as satpy's get_geostationary_mask)
+        """
+        distance = (self.h + self.a) / 1000
+        xmax = np.arccos(np.sqrt(1 - (self.a / 1000) ** 2 / distance ** 2)) * self.h
+        ymax = np.arccos(np.sqrt(1 - (self.b / 1000) ** 2 / distance ** 2)) * self.h
+        x = self.x(np.arange(first_column, first_column + columns, dtype=np.float64))
+        y = self.y(np.arange(first_line, first_line + lines, dtype=np.float64))
+        return (x / xmax) ** 2 + ((y / ymax) ** 2)[:, None] <= 1
+
+
+def load_segments(files):
+    """Open and sort the segments of one band, checking they belong together"""
+    segments = sorted((Segment(f) for f in files), key=lambda s: s.first_line)
+    if not segments:
+        raise ValueError("No segment files")
+    first = segments[0]
+    for segment in segments[1:]:
+        if segment.band != first.band or segment.columns != first.columns:
+            raise ValueError(f"{segment.path.name} does not belong with {first.path.name}")
+    return segments
+
+
+def line_range(segments):
+    """
+    (first_line, lines) of the output raster: the segments' own lines if they
+    are contiguous (full disk or a cropped strip), else the full disk with
+    the gaps left as NaN, as the satpy engine does.
+    """
+    first = segments[0]
+    full_lines = first.total_segments * first.lines
+    numbers = [s.segment for s in segments]
+    if numbers != list(range(numbers[0], numbers[-1] + 1)):
+        return 1, full_lines
+    last = segments[-1]
+    return first.first_line, last.first_line + last.lines - first.first_line
+
+
+def region_window(files, bbox):
+    """
+    (first_line, last_line, first_column, last_column), 1-based and inclusive,
+    of the pixels covering a lat/lon bounding box, worked out once from the
+    segments' own projection block and limited to the lines they hold.
+    The window is snapped to whole 2 km pixels so that bands of every
+    resolution cover the same area. Raises ValueError if the box is outside them.
+    """
+    segments = load_segments(files)
+    first, last = segments[0], segments[-1]
+    proj = first.header["proj"]
+    step = round(2.0 / BAND_RESOLUTION[first.band])
+    grid = (first.total_segments * first.lines // step, float(proj["CFAC"]) / step,
+            (float(proj["COFF"]) - 0.5) / step + 0.5)
+    first_line, last_line, first_column, last_column = bbox_line_col_range(bbox, grid=grid)
+    first_line, first_column = (first_line - 1) * step + 1, (first_column - 1) * step + 1
+    last_line, last_column = last_line * step, last_column * step
+    first_line = max(first_line, first.first_line)
+    last_line = min(last_line, last.first_line + last.lines - 1)
+    if first_line > last_line:
+        raise ValueError(f"Region {bbox} is not covered by segments {first.segment}-{last.segment}")
+    return first_line, last_line, first_column, last_column
+
+
+def decode_band(files, output_file, window=None):
+    """
+    Decode the segments of one band into a float32 GeoTIFF, one segment at a
+    time. window (from region_window) crops it to those lines and columns.
+    Returns the (lines, columns) written.
+    """
+    if not RASTERIO_AVAILABLE:
+        raise ImportError("rasterio is required for the native decoder")
+
+    segments = load_segments(files)
+    geometry = Geometry(segments[0].header)
+    if window:
+        first_line, last_line, first_column, last_column = window
+        lines = last_line - first_line + 1
+        columns = last_column - first_column + 1
+    else:
+        first_line, lines = line_range(segments)
+        first_column, columns = 1, segments[0].columns
+    last_line = first_line + lines - 1
+
+    profile = {
+        'driver': 'GTiff',
+        'height': lines,
+        'width': columns,
+        'count': 1,
+        'dtype': 'float32',
+        'crs': geometry.crs,
+        'transform': geometry.transform(first_line, first_column),
+        'nodata': np.nan,
+    }
+    with rasterio.open(output_file, 'w', **profile) as dst:
+        covered = np.zeros(lines, dtype=bool)
+        for segment in segments:
+            top = max(first_line, segment.first_line)
+            bottom = min(last_line, segment.first_line + segment.lines - 1)
+            if top > bottom:
+                continue
+            counts = segment.counts()[top - segment.first_line:bottom - segment.first_line + 1,
+                                      first_column - 1:first_column - 1 + columns]
+            data = calibrate(counts, segment.header)
+            data[~geometry.earth_mask(top, bottom - top + 1, first_column, columns)] = np.nan
+            dst.write(data, 1, window=Window(0, top - first_line, columns, bottom - top + 1))
+            covered[top - first_line:bottom - first_line + 1] = True
+
+        # Lines of segments missing from a padded full disk or a window
+        gap_rows = np.flatnonzero(~covered)
+        if gap_rows.size:
+            starts = np.flatnonzero(np.diff(gap_rows, prepend=-2) != 1)
+            ends = np.append(starts[1:], gap_rows.size)
+            for start, end in zip(starts, ends):
+                row = int(gap_rows[start])
+                gap = np.full((end - start, columns), np.nan, dtype=np.float32)
+                dst.write(gap, 1, window=Window(0, row, columns, end - start))
+    return lines, columns
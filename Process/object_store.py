@@ -0,0 +1,184 @@
+"""
+Content-addressed local store for downloaded S3 objects.
+
+Every object is kept once under <Save to>/.store/objects, named after a hash
+of its bucket, key and ETag, and each time slot folder only holds hard links
+(or symlinks where hard links are not possible) to those files. Requesting
+the same scan from a different S3 folder, or again after its segments were
+extracted and deleted, links the stored copy instead of downloading it. The
+store is pruned least-recently-used first to stay under a size limit.
+Symlinks don't show up in an object's link count, so the store keeps a
+<object>.links list of the symlinks it made and never prunes an object one
+of them still points at.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from download_manifest import normalize_etag
+from s3_cache import parse_prefix
+
+STORE_DIR = ".store"
+
+GB = 1024 ** 3
+
+LINKS_SUFFIX = ".links"
+
+
+def object_id(bucket, key, etag):
+    """Stable id of one version of an S3 object"""
+    return hashlib.sha1(f"{bucket}/{key}\n{normalize_etag(etag)}".encode('utf-8')).hexdigest()
+
+
+def slot_dir_name(key):
+    """
+    AHI-L1b-FLDK/2024/01/15/0000/HS_...DAT.bz2 -> AHI-L1b-FLDK_2024_01_15_0000,
+    the folder every download of that time slot uses. None for other keys.
+    """
+    prefix = key.rsplit('/', 1)[0] if '/' in key else ''
+    info = parse_prefix(prefix)
+    if info is None or info['depth'] != 'slot':
+        return None
+    return "_".join(prefix.strip('/').split('/'))
+
+
+class ObjectStore:
+    """
+    Objects stored by key/ETag plus hard-linked views. Safe to use from
+    several download threads. max_bytes=0 means no size limit.
+    """
+
+    def __init__(self, root, max_bytes=0):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def object_path(self, bucket, key, etag, extracted=False):
+        """Where an object (or its decompressed .DAT form) lives in the store"""
+        oid = object_id(bucket, key, etag)
+        return self.objects_dir / oid[:2] / (oid + (".dat" if extracted else ""))
+
+    @staticmethod
+    def _links_file(source):
+        return Path(source).with_name(Path(source).name + LINKS_SUFFIX)
+
+    def _link(self, source, dest):
+        """Make dest a hard link to source, else a symlink (recorded), else a copy"""
+        tmp = dest.with_name(dest.name + f".{threading.get_ident()}.link")
+        try:
+            os.link(source, tmp)
+        except OSError:
+            try:
+                os.symlink(Path(source).resolve(), tmp)
+            except OSError:
+                shutil.copy2(source, tmp)
+            else:
+                with self._lock:
+                    with open(self._links_file(source), 'a', encoding='utf-8') as f:
+                        f.write(os.path.abspath(dest) + "\n")
+        os.replace(tmp, dest)
+
+    def _symlinked(self, path):
+        """
+        True if a symlink recorded for this object still points at it. Entries
+        whose symlink was deleted or replaced are dropped from the list.
+        """
+        links_file = self._links_file(path)
+        try:
+            recorded = list(dict.fromkeys(links_file.read_text(encoding='utf-8').splitlines()))
+        except OSError:
+            return False
+        target = path.resolve()
+        live = [link for link in recorded if os.path.islink(link) and Path(link).resolve() == target]
+        try:
+            if not live:
+                links_file.unlink()
+            elif len(live) != len(recorded):
+                links_file.write_text("".join(link + "\n" for link in live), encoding='utf-8')
+        except OSError:
+            pass
+        return bool(live)
+
+    def checkout(self, bucket, key, etag, dest, extracted=False):
+        """Link a stored object to dest. Returns False if it is not in the store."""
+        if not etag:
+            return False
+        source = self.object_path(bucket, key, etag, extracted)
+        try:
+            os.utime(source)
+        except OSError:
+            return False
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        self._link(source, dest)
+        return True
+
+    def add(self, path, bucket, key, etag, extracted=False):
+        """Take a freshly downloaded file into the store, leaving path linked to it"""
+        if not etag:
+            return None
+        target = self.object_path(bucket, key, etag, extracted)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + f".{threading.get_ident()}.tmp")
+        try:
+            os.link(path, tmp)
+            os.replace(tmp, target)
+        except OSError:
+            # No hard links here (e.g. FAT/exFAT): keep the data in the store
+            # and leave a symlink or copy in the slot folder
+            shutil.move(str(path), str(tmp))
+            os.replace(tmp, target)
+            self._link(target, Path(path))
+        return target
+
+    def _objects(self):
+        if not self.objects_dir.exists():
+            return []
+        objects = []
+        for path in self.objects_dir.glob("*/*"):
+            if path.suffix in (".tmp", ".link", LINKS_SUFFIX):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            objects.append((st.st_mtime, st.st_size, st.st_nlink, path))
+        return objects
+
+    def usage(self):
+        """(number of objects, total bytes) in the store"""
+        objects = self._objects()
+        return len(objects), sum(size for _, size, _, _ in objects)
+
+    def prune(self, max_bytes=None):
+        """
+        Delete least-recently-used objects until the store fits in max_bytes.
+        Objects still hard-linked from a slot folder are kept, since deleting
+        them would not free any space, and so are objects a slot folder still
+        symlinks to. Returns (objects removed, bytes freed).
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        if not limit:
+            return 0, 0
+
+        with self._lock:
+            objects = sorted(self._objects())
+            total = sum(size for _, size, _, _ in objects)
+            removed = freed = 0
+            for _, size, nlink, path in objects:
+                if total <= limit:
+                    break
+                if nlink > 1 or self._symlinked(path):
+                    continue
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+                freed += size
+            return removed, freed
@@ -0,0 +1,130 @@
+"""
+Per-folder record of the files written by the processing scripts.
+
+bg_extract, bg_decode and bg_product used to treat any existing output (or
+any output above a size threshold) as done, so a file truncated by a crash
+was skipped forever. Each of them now records an output here only after it
+has been written completely, together with its size and a fingerprint of
+the inputs it was made from. On a re-run an output is skipped only if it is
+recorded, still has the recorded size and its inputs (where they are still
+around) have not changed; anything else is made again.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+MANIFEST_NAME = ".process_manifest.json"
+
+
+def fingerprint(paths, options=None):
+    """
+    Fingerprint of a set of input files from their names and sizes, plus the
+    settings they were processed with (options, a JSON-serializable dict), so
+    an output made with other settings is made again. Returns None if none of
+    the files exist (e.g. segments deleted after decoding), in which case only
+    the output itself is checked.
+    """
+    entries = []
+    for path in paths:
+        path = Path(path)
+        try:
+            entries.append(f"{path.name}:{path.stat().st_size}")
+        except OSError:
+            continue
+    if not entries:
+        return None
+    entries.sort()
+    if options:
+        entries.append(json.dumps(options, sort_keys=True))
+    return hashlib.sha1("\n".join(entries).encode('utf-8')).hexdigest()
+
+
+def remove_stale(output, action):
+    """
+    Delete an output that is incomplete or out of date before it is made
+    again: GDAL can't overwrite a truncated TIFF. action says what happens next.
+    """
+    output = Path(output)
+    if output.exists():
+        print(f"[~] {output.name} is incomplete or out of date, {action} again")
+        output.unlink()
+
+
+class ProcessManifest:
+    """
+    Outputs completed in one folder, keyed by their path relative to it.
+    Safe to update from several threads; only the process that owns the
+    folder's work should write it.
+    """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.path = self.folder / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('outputs', {})
+        except (OSError, ValueError) as e:
+            print(f"[!] Ignoring unreadable process manifest {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        with self._lock:
+            data = {'outputs': dict(self.entries)}
+        try:
+            tmp_path = self.path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[!] Could not write process manifest {self.path}: {e}")
+
+    def _key(self, output):
+        output = Path(output)
+        try:
+            return output.relative_to(self.folder).as_posix()
+        except ValueError:
+            return output.name
+
+    def is_complete(self, output, inputs=None):
+        """
+        True if output was recorded as complete, still has its recorded size,
+        and inputs (a fingerprint() value, None = don't check) match.
+        """
+        with self._lock:
+            entry = self.entries.get(self._key(output))
+        if entry is None:
+            return False
+        try:
+            if Path(output).stat().st_size != entry['size']:
+                return False
+        except OSError:
+            return False
+        return inputs is None or entry.get('inputs') is None or entry['inputs'] == inputs
+
+    def record(self, output, inputs=None, stage="", save=True):
+        """Mark output as completely written from inputs (a fingerprint() value)"""
+        entry = {
+            'size': Path(output).stat().st_size,
+            'inputs': inputs,
+            'stage': stage,
+        }
+        with self._lock:
+            self.entries[self._key(output)] = entry
+        if save:
+            self.save()
+
+    def forget(self, output, save=True):
+        with self._lock:
+            removed = self.entries.pop(self._key(output), None)
+        if removed is not None and save:
+            self.save()
@@ -0,0 +1,312 @@
+"""
+Persistent listing cache for the Himawari S3 browser.
+
+Every folder listing is stored on disk (one small JSON file per bucket/prefix)
+so moving back and forth through the year/month/day/time folders is served
+locally instead of re-issuing list_objects_v2.
+
+Each prefix gets its own time-to-live depending on how "settled" the period it
+covers is: a day folder from last year will never change again, while the
+current day keeps getting a new time folder every 10 minutes and the current
+time folder keeps receiving segments for a few minutes.
+"""
+
+import json
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+# Prefix layout used by the NOAA Himawari buckets:
+#   <product>/<YYYY>/<MM>/<DD>/<HHMM>/<files>
+# e.g. AHI-L1b-FLDK/2024/01/15/0000/HS_H09_20240115_0000_B01_FLDK_R10_S0110.DAT.bz2
+PREFIX_PATTERN = re.compile(
+    r'^(?P<product>[^/]+)/'
+    r'(?:(?P<year>\d{4})/'
+    r'(?:(?P<month>\d{2})/'
+    r'(?:(?P<day>\d{2})/'
+    r'(?:(?P<hhmm>\d{4})/)?)?)?)?$'
+)
+
+# How long a listing stays valid while the period it covers is still open
+# (seconds). Deeper folders fill up faster, so they expire sooner.
+OPEN_PERIOD_TTL = {
+    "root": 24 * 3600,     # product list (AHI-L1b-FLDK, AHI-L2-..., ...)
+    "product": 3600,       # year list
+    "year": 3600,          # month list
+    "month": 600,          # day list
+    "day": 60,             # time folders, a new one every 10 minutes
+    "slot": 30,            # segment files still arriving
+}
+
+# Late segments can show up a while after the nominal end of a slot, so a
+# period is only treated as immutable once this much time has passed.
+SETTLE_DELAY = timedelta(hours=2)
+
+# TTL for periods that have ended but are not settled yet
+SETTLING_TTL = 300
+
+# TTL for prefixes that don't follow the dated layout
+DEFAULT_TTL = 600
+
+# Marker for listings that never expire
+IMMUTABLE = None
+
+
+def parse_prefix(prefix):
+    """
+    Split a Himawari S3 prefix into its parts.
+    Returns a dict with 'product', 'depth' and 'start'/'end' datetimes of the
+    period the prefix covers, or None if the prefix is not in the dated layout.
+    """
+    prefix = prefix.strip('/')
+    if not prefix:
+        return {'product': None, 'depth': 'root', 'start': None, 'end': None}
+
+    match = PREFIX_PATTERN.match(prefix + '/')
+    if not match:
+        return None
+
+    product = match.group('product')
+    year, month, day, hhmm = (match.group(g) for g in ('year', 'month', 'day', 'hhmm'))
+
+    try:
+        if year is None:
+            return {'product': product, 'depth': 'product', 'start': None, 'end': None}
+        if month is None:
+            start = datetime(int(year), 1, 1, tzinfo=timezone.utc)
+            end = datetime(int(year) + 1, 1, 1, tzinfo=timezone.utc)
+            depth = 'year'
+        elif day is None:
+            start = datetime(int(year), int(month), 1, tzinfo=timezone.utc)
+            next_month = start.replace(day=28) + timedelta(days=4)
+            end = next_month.replace(day=1)
+            depth = 'month'
+        elif hhmm is None:
+            start = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+            end = start + timedelta(days=1)
+            depth = 'day'
+        else:
+            start = datetime(int(year), int(month), int(day),
+                             int(hhmm[:2]), int(hhmm[2:]), tzinfo=timezone.utc)
+            end = start + timedelta(minutes=10)
+            depth = 'slot'
+    except ValueError:
+        return None
+
+    return {'product': product, 'depth': depth, 'start': start, 'end': end}
+
+
+def build_prefix(product, moment=None, depth='slot'):
+    """Inverse of parse_prefix: build the S3 prefix for a product and time."""
+    if depth == 'root':
+        return ""
+    if depth == 'product' or moment is None:
+        return f"{product}/"
+    formats = {
+        'year': "%Y/",
+        'month': "%Y/%m/",
+        'day': "%Y/%m/%d/",
+        'slot': "%Y/%m/%d/%H%M/",
+    }
+    return f"{product}/{moment.strftime(formats[depth])}"
+
+
+def slot_prefixes(product, start, end, cadence_minutes=10):
+    """
+    Time-slot prefixes from start to end (inclusive) every cadence_minutes.
+    Full-disk scans start every 10 minutes, so start is rounded down to the
+    10-minute grid and the cadence should be a multiple of 10.
+    """
+    if cadence_minutes < 10 or cadence_minutes % 10:
+        raise ValueError(f"Cadence must be a multiple of 10 minutes, got {cadence_minutes}")
+    moment = start.replace(minute=start.minute - start.minute % 10, second=0, microsecond=0)
+    prefixes = []
+    while moment <= end:
+        prefixes.append(build_prefix(product, moment, 'slot'))
+        moment += timedelta(minutes=cadence_minutes)
+    return prefixes
+
+
+def ttl_for_prefix(prefix, now=None):
+    """
+    Return how many seconds a listing of this prefix stays valid,
+    or IMMUTABLE if the folder will never change again.
+    """
+    info = parse_prefix(prefix)
+    if info is None:
+        return DEFAULT_TTL
+
+    if info['end'] is None:
+        return OPEN_PERIOD_TTL[info['depth']]
+
+    now = now or datetime.now(timezone.utc)
+    if now >= info['end'] + SETTLE_DELAY:
+        return IMMUTABLE
+    if now >= info['end']:
+        return SETTLING_TTL
+    return OPEN_PERIOD_TTL[info['depth']]
+
+
+class S3ListingCache:
+    """
+    On-disk cache of S3 folder listings keyed by bucket + prefix.
+    Safe to share between the UI thread and lister/prefetch threads.
+    """
+
+    def __init__(self, cache_dir, clock=time.time):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.clock = clock
+        self._memory = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def _entry_path(self, bucket, prefix):
+        digest = hashlib.sha1(prefix.encode('utf-8')).hexdigest()
+        return self.cache_dir / bucket / f"{digest}.json"
+
+    def _load(self, bucket, prefix):
+        key = (bucket, prefix)
+        entry = self._memory.get(key)
+        if entry is not None:
+            return entry
+
+        path = self._entry_path(bucket, prefix)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            # Corrupt or half-written entry: treat as missing
+            return None
+        if entry.get('prefix') != prefix:
+            return None
+
+        self._memory[key] = entry
+        return entry
+
+    def _is_fresh(self, entry):
+        fetched_at = entry['fetched_at']
+        now = datetime.fromtimestamp(self.clock(), timezone.utc)
+        ttl = ttl_for_prefix(entry['prefix'], now)
+        if ttl is IMMUTABLE:
+            # Only trust it forever if the listing was taken after the period settled
+            info = parse_prefix(entry['prefix'])
+            return fetched_at >= (info['end'] + SETTLE_DELAY).timestamp()
+        return now.timestamp() - fetched_at < ttl
+
+    def get(self, bucket, prefix, need_files=False):
+        """
+        Return a cached listing {'directories': [...], 'files': [...] or None}
+        or None if the prefix is unknown or stale.
+        """
+        with self._lock:
+            entry = self._load(bucket, prefix)
+            if entry is None or (need_files and entry.get('files') is None):
+                self.misses += 1
+                return None
+            if not self._is_fresh(entry):
+                self.expired += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        files = None
+        if entry.get('files') is not None:
+            files = [dict(f, last_modified=datetime.fromisoformat(f['last_modified']))
+                     for f in entry['files']]
+        return {'directories': list(entry['directories']), 'files': files}
+
+    def contains(self, bucket, prefix, need_files=False):
+        """Like get() but only checks freshness and does not count as a hit or miss"""
+        with self._lock:
+            entry = self._load(bucket, prefix)
+            if entry is None or (need_files and entry.get('files') is None):
+                return False
+            return self._is_fresh(entry)
+
+    def put(self, bucket, prefix, directories, files=None):
+        """Store a complete listing. files=None means files were not listed."""
+        entry = {
+            'bucket': bucket,
+            'prefix': prefix,
+            'fetched_at': self.clock(),
+            'directories': list(directories),
+            'files': None,
+        }
+        if files is not None:
+            entry['files'] = [
+                dict(f, last_modified=f['last_modified'].isoformat())
+                for f in files
+            ]
+
+        path = self._entry_path(bucket, prefix)
+        with self._lock:
+            self._memory[(bucket, prefix)] = entry
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"[!] Could not write listing cache for {prefix}: {e}")
+
+    def invalidate(self, bucket, prefix):
+        with self._lock:
+            self._memory.pop((bucket, prefix), None)
+            try:
+                self._entry_path(bucket, prefix).unlink()
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'expired': self.expired}
+
+
+def neighbour_prefixes(prefix, directories=None, now=None):
+    """
+    Return the prefixes the user is most likely to open next from `prefix`,
+    nearest first: the next/previous 10-minute slot and the same slot one hour
+    either side for a time folder, the neighbouring days for a day folder.
+    Prefixes in the future are left out.
+    """
+    info = parse_prefix(prefix)
+    if info is None or info['start'] is None:
+        return []
+
+    now = now or datetime.now(timezone.utc)
+    product = info['product']
+    depth = info['depth']
+    start = info['start']
+
+    if depth == 'slot':
+        steps = [timedelta(minutes=10), timedelta(minutes=-10),
+                 timedelta(hours=1), timedelta(hours=-1)]
+        candidates = [start + step for step in steps]
+    elif depth == 'day':
+        candidates = [start + timedelta(days=1), start - timedelta(days=1)]
+    elif depth == 'month':
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        prev_month = (start - timedelta(days=1)).replace(day=1)
+        candidates = [next_month, prev_month]
+    else:
+        candidates = [start.replace(year=start.year + 1), start.replace(year=start.year - 1)]
+
+    neighbours = [build_prefix(product, moment, depth) for moment in candidates if moment <= now]
+
+    # From a day folder the next click is usually one of its time folders;
+    # the most recent one is the usual pick
+    if depth == 'day' and directories:
+        neighbours.insert(0, f"{prefix.rstrip('/')}/{sorted(directories)[-1]}/")
+
+    return neighbours
@@ -0,0 +1,76 @@
+"""
+Process-wide S3 client for the Himawari file manager.
+
+boto3 clients are thread-safe, so one client (and its connection pool) is
+shared by the lister, the prefetcher and every download thread. Reusing it
+keeps HTTPS connections open between requests instead of paying a new TLS
+handshake for every listing and every file.
+
+The pool is sized to the number of download workers: botocore only keeps 10
+connections by default, so with more workers than that the extra threads just
+wait for a free socket.
+"""
+
+import os
+import threading
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore import UNSIGNED
+from botocore.config import Config
+
+# botocore's own default pool size
+DEFAULT_POOL_SIZE = 10
+
+# Spare connections on top of the download workers (listing, prefetch)
+EXTRA_CONNECTIONS = 4
+
+# Set this to e.g. http://127.0.0.1:9000 to talk to a local S3 stand-in
+ENDPOINT_ENV = "MONWATCH_S3_ENDPOINT"
+
+# Each download worker streams its file over a single connection, so the
+# pool size maps directly to worker count (no per-file multipart threads)
+TRANSFER_CONFIG = TransferConfig(use_threads=False)
+
+_lock = threading.Lock()
+_session = None
+_client = None
+_client_key = None
+
+
+def pool_size_for_workers(max_workers):
+    return max(DEFAULT_POOL_SIZE, (max_workers or 0) + EXTRA_CONNECTIONS)
+
+
+def get_s3_client(max_workers=None):
+    """
+    Return the shared anonymous S3 client.
+    If max_workers needs a larger pool than the current client has, a bigger
+    client replaces it; callers still holding the old one can keep using it.
+    """
+    global _session, _client, _client_key
+
+    pool_size = pool_size_for_workers(max_workers)
+    endpoint = os.environ.get(ENDPOINT_ENV) or None
+
+    with _lock:
+        if _client is not None:
+            current_pool, current_endpoint = _client_key
+            if current_endpoint == endpoint and current_pool >= pool_size:
+                return _client
+
+        if _session is None:
+            _session = boto3.session.Session()
+
+        _client = _session.client(
+            's3',
+            endpoint_url=endpoint,
+            config=Config(
+                signature_version=UNSIGNED,
+                max_pool_connections=pool_size,
+                tcp_keepalive=True,
+                retries={'max_attempts': 5, 'mode': 'standard'}
+            )
+        )
+        _client_key = (pool_size, endpoint)
+        return _client
@@ -0,0 +1,250 @@
+"""
+Throughput measurement and adaptive concurrency for S3 downloads.
+
+The best number of parallel downloads depends on the link, the time of day and
+the object sizes, so instead of a fixed worker count the download worker lets
+AdaptiveConcurrency move the number of active transfers up and down (within
+the configured bounds) towards whatever gives the highest aggregate MB/s.
+"""
+
+import threading
+import time
+from collections import deque
+
+MB = 1024 * 1024
+
+# Sliding window used for the current transfer rate (seconds)
+RATE_WINDOW = 5.0
+
+# Seconds between concurrency adjustments; long enough to average out the
+# ramp-up of newly started connections
+ADJUST_INTERVAL = 4.0
+
+# Relative throughput change treated as noise rather than an improvement
+TOLERANCE = 0.05
+
+# After this many stable intervals, probe one more connection
+PROBE_AFTER = 3
+
+
+class ThroughputMeter:
+    """Thread-safe byte counter with a sliding-window rate"""
+
+    def __init__(self, window=RATE_WINDOW, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self.total_bytes = 0
+        self.started = clock()
+        self._samples = deque()
+        self._lock = threading.Lock()
+
+    def add(self, nbytes):
+        now = self.clock()
+        with self._lock:
+            self.total_bytes += nbytes
+            self._samples.append((now, nbytes))
+            self._trim(now)
+
+    def _trim(self, now):
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+    def skip(self, nbytes):
+        """Count bytes that are already done (e.g. a resumed partial file) without affecting the rate"""
+        with self._lock:
+            self.total_bytes += nbytes
+
+    def rate(self):
+        """Bytes per second over the last window"""
+        now = self.clock()
+        with self._lock:
+            self._trim(now)
+            if not self._samples:
+                return 0.0
+            span = min(self.window, max(now - self.started, 1e-6))
+            return sum(n for _, n in self._samples) / span
+
+
+class CountingReader:
+    """Wraps a readable stream (e.g. an S3 response body) and reports bytes read"""
+
+    def __init__(self, stream, callback):
+        self.stream = stream
+        self.callback = callback
+
+    def read(self, amt=None):
+        data = self.stream.read(amt)
+        if data:
+            self.callback(len(data))
+        return data
+
+    def close(self):
+        self.stream.close()
+
+
+class AdaptiveConcurrency:
+    """
+    Gate limiting how many downloads run at once, with a hill-climbing
+    controller that adjusts the limit from the measured aggregate throughput.
+
+    The thread pool is sized for max_workers; each transfer holds a slot
+    from acquire() to release(), so lowering the limit simply stops new
+    transfers from starting until enough running ones finish.
+    """
+
+    def __init__(self, max_workers, min_workers=1, initial=None, adaptive=True, clock=time.monotonic):
+        self.max_workers = max(1, max_workers)
+        self.min_workers = max(1, min(min_workers, self.max_workers))
+        self.adaptive = adaptive
+        if not adaptive:
+            initial = self.max_workers
+        elif initial is None:
+            initial = max(self.min_workers, self.max_workers // 2)
+        self.limit = max(self.min_workers, min(initial, self.max_workers))
+        self.clock = clock
+
+        self.active = 0
+        self._condition = threading.Condition()
+        self._direction = 1
+        self._last_rate = None
+        self._last_adjust = clock()
+        self._stable = 0
+
+    def acquire(self):
+        with self._condition:
+            while self.active >= self.limit:
+                self._condition.wait()
+            self.active += 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def _set_limit(self, limit):
+        with self._condition:
+            self.limit = max(self.min_workers, min(limit, self.max_workers))
+            self._condition.notify_all()
+
+    def adjust(self, rate):
+        """
+        Feed the current aggregate rate (bytes/s); every ADJUST_INTERVAL the
+        limit moves one step. Returns True if the limit changed.
+        """
+        if not self.adaptive:
+            return False
+        now = self.clock()
+        if now - self._last_adjust < ADJUST_INTERVAL:
+            return False
+        self._last_adjust = now
+
+        previous = self._last_rate
+        self._last_rate = rate
+        if previous is None or previous <= 0:
+            step = self._direction
+        elif rate > previous * (1 + TOLERANCE):
+            # The last move helped: keep going the same way
+            self._stable = 0
+            step = self._direction
+        elif rate < previous * (1 - TOLERANCE):
+            # The last move hurt: go back
+            self._stable = 0
+            self._direction = -self._direction
+            step = self._direction
+        else:
+            # Plateau: hold, but try one more connection now and then in case
+            # the link got faster
+            self._stable += 1
+            if self._stable < PROBE_AFTER:
+                return False
+            self._stable = 0
+            self._direction = 1
+            step = 1
+
+        old_limit = self.limit
+        self._set_limit(self.limit + step)
+        if self.limit == old_limit:
+            # Hit a bound: next time try the other way
+            self._direction = -self._direction
+            return False
+        return True
+
+
+class TransferProgress:
+    """
+    Coalesced progress of a whole download job: byte counts from every
+    transfer thread are aggregated here and the UI only ever sees periodic
+    snapshot() dicts instead of one signal per chunk or per file.
+    Each file dict needs 'size' and may carry a 'band' number.
+    """
+
+    def __init__(self, files, clock=time.monotonic):
+        self.meter = ThroughputMeter(clock=clock)
+        self.bytes_total = sum(f['size'] for f in files)
+        self.files_total = len(files)
+        self.files_done = 0
+        self.files_failed = 0
+        self.last_file = ""
+        self.bands = {}
+        for f in files:
+            band = self.bands.setdefault(f.get('band'), {
+                'files_done': 0, 'files_total': 0, 'bytes_done': 0, 'bytes_total': 0
+            })
+            band['files_total'] += 1
+            band['bytes_total'] += f['size']
+        self._lock = threading.Lock()
+
+    def add(self, file_info, nbytes):
+        """Bytes received for a file"""
+        self.meter.add(nbytes)
+        with self._lock:
+            self.bands[file_info.get('band')]['bytes_done'] += nbytes
+
+    def skip(self, file_info, nbytes):
+        """Bytes of a file that were already on disk (resumed download)"""
+        self.meter.skip(nbytes)
+        with self._lock:
+            self.bands[file_info.get('band')]['bytes_done'] += nbytes
+
+    def file_done(self, file_info, name, success):
+        with self._lock:
+            self.files_done += 1
+            self.last_file = name
+            if success:
+                self.bands[file_info.get('band')]['files_done'] += 1
+            else:
+                self.files_failed += 1
+
+    def snapshot(self, gate=None):
+        rate = self.meter.rate()
+        with self._lock:
+            bytes_done = self.meter.total_bytes
+            remaining = max(0, self.bytes_total - bytes_done)
+            snapshot = {
+                'bytes_done': bytes_done,
+                'bytes_total': self.bytes_total,
+                'files_done': self.files_done,
+                'files_total': self.files_total,
+                'files_failed': self.files_failed,
+                'last_file': self.last_file,
+                'mbps': rate / MB,
+                'eta': remaining / rate if rate > 0 else None,
+                'bands': {band: dict(counts) for band, counts in self.bands.items() if band is not None},
+            }
+        if gate is not None:
+            snapshot.update({
+                'concurrency': gate.limit,
+                'active': gate.active,
+                'max_workers': gate.max_workers,
+                'per_connection_mbps': rate / MB / max(gate.active, 1),
+            })
+        return snapshot
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Check the native HSD reader (hsd_reader) against satpy's ahi_hsd reader
+Writes synthetic segments (bench_decode.make_dataset) for a visible and an IR
+band - full disk, a cropped strip, a strip with a gap, and .DAT.bz2 - decodes
+each with bg_decode.decode_band using both readers and compares the GeoTIFFs:
+shape, geotransform, CRS, NaN mask and values.
+
+Example:
+    python validate_hsd.py --scale 0.1
+"""
+
+import argparse
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Largest accepted difference per band type. satpy computes brightness
+# temperatures in float64, the native reader in float32 before writing.
+TOLERANCE = {"reflectance": 1e-4, "brightness_temperature": 1e-3}
+
+CASES = {
+    "full disk": {'segments': None, 'compressed': False},
+    "strip": {'segments': [4, 5, 6], 'compressed': False},
+    "strip with gap": {'segments': [4, 6], 'compressed': False},
+    "bz2": {'segments': [5, 6], 'compressed': True},
+}
+
+
+def compare(native_file, satpy_file, tolerance):
+    """List of differences between two band GeoTIFFs (empty if they match)"""
+    import rasterio
+
+    problems = []
+    with rasterio.open(native_file) as native, rasterio.open(satpy_file) as reference:
+        if native.shape != reference.shape:
+            return [f"shape {native.shape} vs {reference.shape}"]
+        if not native.transform.almost_equals(reference.transform, precision=1e-3):
+            problems.append(f"transform {tuple(native.transform)[:6]} vs {tuple(reference.transform)[:6]}")
+        if native.crs != reference.crs:
+            problems.append(f"CRS {native.crs} vs {reference.crs}")
+        a = native.read(1)
+        b = reference.read(1)
+
+    nan_a, nan_b = np.isnan(a), np.isnan(b)
+    if (nan_a != nan_b).any():
+        problems.append(f"NaN mask differs at {int((nan_a != nan_b).sum())} pixels")
+    both = ~nan_a & ~nan_b
+    if both.any():
+        diff = float(np.abs(a[both] - b[both]).max())
+        if diff > tolerance:
+            problems.append(f"max difference {diff:.6f} > {tolerance}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the native HSD reader against satpy")
+    parser.add_argument("--scale", type=float, default=0.1,
+                        help="Size of the synthetic segments relative to the real full disk")
+    parser.add_argument("-b", "--bands", nargs="+", default=["03", "13"], help="Bands to check")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from bench_decode import make_dataset
+    from bg_decode import decode_band
+
+    work = Path(tempfile.mkdtemp(prefix="monwatch_validate_"))
+    failures = 0
+    try:
+        print("\n" + "=" * 70)
+        print("NATIVE HSD READER vs SATPY")
+        print("=" * 70)
+        for case, options in CASES.items():
+            folder = make_dataset(work / case.replace(" ", "_"), [int(b) for b in args.bands], args.scale,
+                                  segments=options['segments'], compressed=options['compressed'])[0]
+            for band in args.bands:
+                band = band.zfill(2)
+                files = sorted(folder.glob(f"*_B{band}_*"))
+                outputs = {}
+                for reader in ("native", "satpy"):
+                    out_dir = folder / reader
+                    out_dir.mkdir(exist_ok=True)
+                    with contextlib.redirect_stderr(io.StringIO()):
+                        success, log = decode_band(out_dir, band, files, reader=reader, storage="float32")
+                    outputs[reader] = out_dir / f"B{band}.tif" if success else None
+
+                if not all(outputs.values()):
+                    problems = [f"{reader} decode failed" for reader, out in outputs.items() if out is None]
+                else:
+                    kind = "reflectance" if int(band) < 7 else "brightness_temperature"
+                    problems = compare(outputs["native"], outputs["satpy"], TOLERANCE[kind])
+
+                if problems:
+                    failures += 1
+                    print(f"[!] B{band} {case}: " + "; ".join(problems))
+                else:
+                    print(f"[OK] B{band} {case}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print("=" * 70)
+    if failures:
+        print(f"[!] {failures} check(s) failed")
+        return 1
+    print("[OK] Native reader matches satpy")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2020,7 +2020,7 @@ class MainUI(QMainWindow):
             if self.use_cache:
                 pixmap = QPixmap(str(file_path))
             else:
-                with Image.open(file_path) as img:
+                with CacheManager.open_display_image(file_path) as img:
                     if self.current_quality_level < 1.0:
                         new_width = int(img.width * self.current_quality_level)
                         new_height = int(img.height * self.current_quality_level)
@@ -2069,7 +2069,7 @@ class MainUI(QMainWindow):
             QApplication.processEvents()
             self.log(f"Loading original TIFF: {Path(self.current_original).name}")
             self.status_bar.showMessage("Loading original TIFF...")
-            with Image.open(self.current_original) as img:
+            with CacheManager.open_display_image(self.current_original) as img:
                 if img.mode == 'RGBA':
                     qimage = QImage(img.tobytes("raw", "RGBA"), img.width, img.height, QImage.Format_RGBA8888)
                 else:
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The processing modules are scripts in Process/, imported by name like the
+# scripts import each other
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Process"))
@@ -0,0 +1,161 @@
+from fnmatch import fnmatch
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("satpy")
+rasterio = pytest.importorskip("rasterio")
+from rasterio.transform import from_origin
+
+import bg_decode
+
+
+def write_staging(output_file, data):
+    """Write a float32 band where the decoders leave it for finish_output"""
+    profile = {'driver': 'GTiff', 'width': data.shape[1], 'height': data.shape[0], 'count': 1,
+               'dtype': 'float32', 'nodata': np.nan, 'crs': 'EPSG:4326',
+               'transform': from_origin(100.0, 30.0, 0.02, 0.02)}
+    with rasterio.open(bg_decode.staging_path(output_file), 'w', **profile) as dst:
+        dst.write(data.astype(np.float32), 1)
+
+
+def band_data(shape=(1100, 1300)):
+    rows, columns = np.indices(shape)
+    data = 200.0 + (rows + columns) * 0.037
+    data[:50, :50] = np.nan
+    return data.astype(np.float32)
+
+
+def test_staging_files_are_hidden(tmp_path):
+    output = tmp_path / "B13.tif"
+    for stage in ("part", "uint16"):
+        name = bg_decode.staging_path(output, stage).name
+        assert name.startswith(".")
+        # Neither bg_decode's B??.tif, the viewer's B*.tif nor the cache's *.tif picks it up
+        assert not fnmatch(name, "B??.tif") and not fnmatch(name, "B*.tif") and not fnmatch(name, "*.tif")
+
+
+def test_finish_output_writes_cog(tmp_path):
+    output = tmp_path / "B13.tif"
+    data = band_data()
+    write_staging(output, data)
+    bg_decode.finish_output(output, cog=True)
+    assert not bg_decode.staging_path(output).exists()
+    with rasterio.open(output) as src:
+        assert src.tags(ns='IMAGE_STRUCTURE').get('LAYOUT') == 'COG'
+        assert src.block_shapes[0] == (512, 512)
+        assert src.overviews(1)
+        np.testing.assert_array_equal(src.read(1), data)
+    # Predictor 2, which tifffile decodes without imagecodecs
+    tifffile = pytest.importorskip("tifffile")
+    with tifffile.TiffFile(output) as tif:
+        assert tif.pages[0].predictor == 2
+        np.testing.assert_array_equal(tif.asarray(), data)
+
+
+def test_finish_output_plain_tiff(tmp_path):
+    output = tmp_path / "B13.tif"
+    write_staging(output, band_data((100, 120)))
+    bg_decode.finish_output(output, cog=False)
+    assert output.exists() and not bg_decode.staging_path(output).exists()
+    with rasterio.open(output) as src:
+        assert src.tags(ns='IMAGE_STRUCTURE').get('LAYOUT') != 'COG'
+
+
+def test_remove_stale_output(tmp_path):
+    output = tmp_path / "B13.tif"
+    for path in (output, bg_decode.staging_path(output), bg_decode.staging_path(output, "uint16")):
+        path.write_bytes(b"truncated")
+    bg_decode.remove_stale_output(output)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_band_scaling():
+    assert bg_decode.band_scaling("13", "float32") is None
+    assert bg_decode.band_scaling("03", "uint16") == bg_decode.UINT16_SCALING["reflectance"]
+    assert bg_decode.band_scaling("13", "uint16") == bg_decode.UINT16_SCALING["brightness_temperature"]
+
+
+@pytest.mark.parametrize("cog", [True, False])
+def test_uint16_storage_round_trip(tmp_path, cog):
+    from bg_product import read_band_data
+
+    output = tmp_path / "B13.tif"
+    data = band_data()
+    write_staging(output, data)
+    scaling = bg_decode.band_scaling("13", "uint16")
+    bg_decode.finish_output(output, cog=cog, scaling=scaling)
+    with rasterio.open(output) as src:
+        assert src.dtypes[0] == 'uint16'
+        assert src.nodata == bg_decode.UINT16_NODATA
+        assert (src.scales[0], src.offsets[0]) == scaling
+        assert (src.read(1)[:50, :50] == bg_decode.UINT16_NODATA).all()
+
+    restored, meta = read_band_data(output)
+    assert restored.dtype == np.float32 and meta['dtype'] == 'float32'
+    np.testing.assert_array_equal(np.isnan(restored), np.isnan(data))
+    valid = ~np.isnan(data)
+    assert np.abs(restored[valid] - data[valid]).max() <= scaling[0] / 2 + 1e-4
+
+
+def test_quantize_clips_to_range(tmp_path):
+    source, dest = tmp_path / "float.tif", tmp_path / "uint16.tif"
+    profile = {'driver': 'GTiff', 'width': 3, 'height': 1, 'count': 1, 'dtype': 'float32',
+               'crs': 'EPSG:4326', 'transform': from_origin(0, 0, 1, 1)}
+    with rasterio.open(source, 'w', **profile) as dst:
+        dst.write(np.array([[-5.0, 100.0, 1e6]], dtype=np.float32), 1)
+    bg_decode.quantize_band(source, dest, 0.01, 0.0)
+    with rasterio.open(dest) as src:
+        assert src.read(1).tolist() == [[0, 10000, bg_decode.UINT16_NODATA - 1]]
+
+
+def test_sector_decode_matches_between_readers(tmp_path):
+    from bench_decode import make_dataset
+    from himawari_geo import REGIONS
+
+    folder = make_dataset(tmp_path, [13], 0.2, segments=[3, 4, 5])[0]
+    files = sorted(folder.glob("*_B13_*"))
+    results = {}
+    for reader in ("native", "satpy"):
+        out_dir = tmp_path / reader
+        out_dir.mkdir()
+        success, log = bg_decode.decode_band(out_dir, "13", files, reader=reader, storage="float32",
+                                              region=REGIONS["philippines"])
+        assert success, log
+        with rasterio.open(out_dir / "B13.tif") as src:
+            results[reader] = src.read(1), src.transform
+    (native, native_transform), (satpy_data, satpy_transform) = results["native"], results["satpy"]
+    assert native.shape == satpy_data.shape
+    assert native_transform.almost_equals(satpy_transform, precision=1e-3)
+    np.testing.assert_allclose(native, satpy_data, atol=1e-3)
+
+
+def test_read_band_data_keeps_sector_pixel_size(tmp_path):
+    from bg_product import read_band_data
+    from himawari_geo import FULL_DISK_WIDTH
+
+    # A square 100 x 100 crop of a 1100-pixel full disk, as bg_decode --region writes it
+    pixel = FULL_DISK_WIDTH / 1100
+    profile = {'driver': 'GTiff', 'width': 100, 'height': 100, 'count': 1, 'dtype': 'float32',
+               'crs': '+proj=geos +lon_0=140.7 +h=35785863 +a=6378137 +b=6356752.3 +units=m',
+               'transform': from_origin(-2e6, 2e6, pixel, pixel)}
+    path = tmp_path / "B13.tif"
+    with rasterio.open(path, 'w', **profile) as dst:
+        dst.write(np.ones((100, 100), dtype=np.float32), 1)
+    assert read_band_data(path, target_shape=(1100, 1100))[0].shape == (100, 100)
+    assert read_band_data(path, target_shape=(550, 550))[0].shape == (50, 50)
+
+
+def test_satpy_default_output_is_enhanced_image(tmp_path):
+    from bench_decode import make_dataset
+
+    folder = make_dataset(tmp_path, [13], 0.02)[0]
+    files = sorted(folder.glob("*_B13_*"))
+    success, log = bg_decode.decode_band(folder, "13", files)
+    assert success, log
+    with rasterio.open(folder / "B13.tif") as src:
+        assert set(src.dtypes) == {'uint8'}
+
+    # The native reader has no enhancement to apply
+    success, log = bg_decode.decode_band(folder, "13", files, reader="native")
+    assert not success and "--storage float32" in log
@@ -0,0 +1,74 @@
+import bz2
+import io
+import random
+
+import pytest
+
+from bg_extract import decompress_stream
+
+
+def sample_data(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+class ChunkRecorder(io.BytesIO):
+    """BytesIO remembering the size of every read"""
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+def test_single_stream(tmp_path):
+    data = sample_data(300_000)
+    dat_path = tmp_path / "segment.DAT"
+    assert decompress_stream(io.BytesIO(bz2.compress(data)), dat_path) == len(data)
+    assert dat_path.read_bytes() == data
+
+
+def test_concatenated_streams(tmp_path):
+    parts = [sample_data(50_000, seed) for seed in range(3)]
+    stream = io.BytesIO(b"".join(bz2.compress(part) for part in parts))
+    dat_path = tmp_path / "segment.DAT"
+    assert decompress_stream(stream, dat_path) == sum(map(len, parts))
+    assert dat_path.read_bytes() == b"".join(parts)
+
+
+def test_chunk_size_smaller_than_a_block(tmp_path):
+    # Level 1 = 100 kB blocks; 4 kB chunks split every block many times over
+    data = sample_data(250_000)
+    stream = ChunkRecorder(bz2.compress(data, 1))
+    dat_path = tmp_path / "segment.DAT"
+    assert decompress_stream(stream, dat_path, chunk_size=4096) == len(data)
+    assert dat_path.read_bytes() == data
+    assert stream.reads and max(stream.reads) <= 4096
+
+
+@pytest.mark.parametrize("compressed", [
+    bz2.compress(sample_data(100_000))[:-100],   # truncated inside the stream
+    b"",                                          # nothing at all
+], ids=["truncated", "empty"])
+def test_incomplete_input_raises_and_leaves_nothing(tmp_path, compressed):
+    dat_path = tmp_path / "segment.DAT"
+    with pytest.raises(EOFError):
+        decompress_stream(io.BytesIO(compressed), dat_path, chunk_size=4096)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_corrupt_input_keeps_the_previous_file(tmp_path):
+    dat_path = tmp_path / "segment.DAT"
+    dat_path.write_bytes(b"previous")
+    with pytest.raises(OSError):
+        decompress_stream(io.BytesIO(b"BZh9" + b"\x00" * 100), dat_path)
+    assert dat_path.read_bytes() == b"previous"
+    assert not (tmp_path / "segment.DAT.part").exists()
+
+
+def test_replaces_an_existing_file(tmp_path):
+    dat_path = tmp_path / "segment.DAT"
+    dat_path.write_bytes(b"stale")
+    decompress_stream(io.BytesIO(bz2.compress(b"fresh")), dat_path)
+    assert dat_path.read_bytes() == b"fresh"
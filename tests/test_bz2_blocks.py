@@ -0,0 +1,60 @@
+import bz2
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from bz2_blocks import BLOCK_MAGIC, decompress_blocks, find_bit_pattern, read_bits, split_blocks
+
+
+def sample_data(size, seed=0):
+    """Compressible but not trivially repetitive bytes"""
+    rng = random.Random(seed)
+    words = [bytes(rng.randrange(256) for _ in range(rng.randrange(1, 12))) for _ in range(500)]
+    out = bytearray()
+    while len(out) < size:
+        out += rng.choice(words)
+    return bytes(out[:size])
+
+
+def test_find_bit_pattern_at_every_shift():
+    for shift in range(8):
+        value = (BLOCK_MAGIC << (16 - shift)).to_bytes(8, 'big')
+        data = b"\x00\x00" + value
+        assert find_bit_pattern(data, BLOCK_MAGIC) == [16 + shift]
+        assert read_bits(data, 16 + shift, 48) == BLOCK_MAGIC
+
+
+def test_split_multi_block_stream():
+    # Level 1 = 100 kB blocks, so this is several blocks
+    data = sample_data(450_000)
+    streams = split_blocks(bz2.compress(data, 1))
+    assert len(streams) > 1
+    assert b"".join(bz2.decompress(stream) for stream in streams) == data
+
+
+def test_split_concatenated_streams():
+    first, second = sample_data(150_000, 1), sample_data(150_000, 2)
+    streams = split_blocks(bz2.compress(first, 1) + bz2.compress(second, 1))
+    assert b"".join(bz2.decompress(stream) for stream in streams) == first + second
+
+
+def test_split_rejects_non_bz2():
+    assert split_blocks(b"not bz2 data") == []
+
+
+def test_decompress_blocks(tmp_path):
+    data = sample_data(450_000)
+    source = tmp_path / "segment.DAT.bz2"
+    source.write_bytes(bz2.compress(data, 1))
+    dest = tmp_path / "segment.DAT"
+    with ThreadPoolExecutor(2) as executor:
+        assert decompress_blocks(source, dest, executor, max_in_flight=2) == len(data)
+    assert dest.read_bytes() == data
+    assert not (tmp_path / "segment.DAT.part").exists()
+
+
+def test_single_block_file_is_left_to_serial_decompression(tmp_path):
+    source = tmp_path / "small.DAT.bz2"
+    source.write_bytes(bz2.compress(b"small", 9))
+    with ThreadPoolExecutor(1) as executor:
+        assert decompress_blocks(source, tmp_path / "small.DAT", executor, max_in_flight=2) is None
+    assert not (tmp_path / "small.DAT").exists()
@@ -0,0 +1,65 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+tifffile = pytest.importorskip("tifffile")
+pytest.importorskip("PIL")
+
+from cache import display_array, gdal_scaling, open_display_image, read_band
+
+
+def test_float_band_stretched_ignoring_nan():
+    data = np.array([[200.0, 250.0], [300.0, np.nan]], dtype=np.float32)
+    display = display_array(data)
+    assert display.dtype == np.uint8
+    assert display.tolist() == [[0, 127], [255, 0]]
+
+
+def test_constant_or_empty_band_is_black():
+    assert not display_array(np.full((2, 2), 280.0, dtype=np.float32)).any()
+    assert not display_array(np.full((2, 2), np.nan, dtype=np.float32)).any()
+
+
+def test_uint8_planar_image_moved_band_last():
+    image = np.arange(24, dtype=np.uint8).reshape(3, 2, 4)
+    display = display_array(image)
+    assert display.shape == (2, 4, 3)
+    assert display[0, 1].tolist() == [1, 9, 17]
+
+
+def test_open_display_image(tmp_path):
+    path = tmp_path / "B13.tif"
+    tifffile.imwrite(path, np.array([[200.0, np.nan], [250.0, 300.0]], dtype=np.float32))
+    with open_display_image(path) as img:
+        assert img.mode == "L"
+        assert np.asarray(img).tolist() == [[0, 0], [127, 255]]
+
+
+def test_uint16_band_unscaled_with_nodata_masked(tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+
+    path = tmp_path / "B13.tif"
+    profile = {'driver': 'GTiff', 'width': 2, 'height': 2, 'count': 1, 'dtype': 'uint16', 'nodata': 65535}
+    with rasterio.open(path, 'w', **profile) as dst:
+        dst.scales = (0.01,)
+        dst.offsets = (100.0,)
+        dst.write(np.array([[10000, 65535], [15000, 20000]], dtype=np.uint16), 1)
+
+    band = read_band(path)
+    assert band.dtype == np.float32
+    np.testing.assert_allclose(band, [[200.0, np.nan], [250.0, 300.0]])
+    with open_display_image(path) as img:
+        assert np.asarray(img).tolist() == [[0, 0], [127, 255]]
+
+
+def test_gdal_scaling_defaults():
+    assert gdal_scaling("<GDALMetadata></GDALMetadata>") == (1.0, 0.0)
+
+
+def test_cache_skips_hidden_staging_files(tmp_path):
+    from cache import CacheManager
+
+    tifffile.imwrite(tmp_path / "B13.tif", np.zeros((4, 4), dtype=np.uint8))
+    tifffile.imwrite(tmp_path / ".B03.tif", np.zeros((4, 4), dtype=np.uint8))
+    CacheManager(tmp_path, tmp_path / "cache").generate_pyramidal_cache()
+    assert sorted(p.name for p in (tmp_path / "cache").iterdir()) == \
+        ["B13_x0.25.png", "B13_x0.5.png", "B13_x1.0.png"]
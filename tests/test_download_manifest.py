@@ -0,0 +1,76 @@
+from download_manifest import (
+    DOWNLOADED, EXTRACTED, PARTIAL, DownloadManifest, extracted_name, partial_path,
+)
+from process_manifest import ProcessManifest
+
+KEY = "AHI-L1b-FLDK/2024/01/15/0000/HS_H09_20240115_0000_B13_FLDK_R20_S0110.DAT.bz2"
+NAME = "HS_H09_20240115_0000_B13_FLDK_R20_S0110.DAT.bz2"
+
+
+def file_info(size=100, etag='"abc"'):
+    return {'key': KEY, 'size': size, 'etag': etag, 'last_modified': None}
+
+
+def test_extracted_name():
+    assert extracted_name(NAME) == "HS_H09_20240115_0000_B13_FLDK_R20_S0110.DAT"
+    assert extracted_name("B13.tif") == "B13.tif"
+
+
+def test_missing_object_is_downloaded(tmp_path):
+    assert DownloadManifest(tmp_path).local_state(file_info()) is None
+
+
+def test_complete_file_is_skipped(tmp_path):
+    (tmp_path / NAME).write_bytes(b"x" * 100)
+    assert DownloadManifest(tmp_path).local_state(file_info()) == DOWNLOADED
+
+
+def test_truncated_file_is_downloaded_again(tmp_path):
+    (tmp_path / NAME).write_bytes(b"x" * 40)
+    assert DownloadManifest(tmp_path).local_state(file_info()) is None
+
+
+def test_extracted_file_is_skipped(tmp_path):
+    (tmp_path / extracted_name(NAME)).write_bytes(b"x" * 500)
+    assert DownloadManifest(tmp_path).local_state(file_info()) == EXTRACTED
+
+
+def test_decoded_band_is_skipped(tmp_path):
+    tif = tmp_path / "B13.tif"
+    tif.write_bytes(b"x" * 10)
+    ProcessManifest(tmp_path).record(tif, stage="decode")
+    assert DownloadManifest(tmp_path).local_state(file_info()) == "decoded"
+
+
+def test_changed_object_is_downloaded_again(tmp_path):
+    (tmp_path / NAME).write_bytes(b"x" * 100)
+    manifest = DownloadManifest(tmp_path)
+    manifest.update(file_info(), DOWNLOADED)
+    assert DownloadManifest(tmp_path).local_state(file_info(etag='"def"')) is None
+    assert DownloadManifest(tmp_path).local_state(file_info()) == DOWNLOADED
+
+
+def test_resume_from_partial_download(tmp_path):
+    DownloadManifest(tmp_path).update(file_info(), PARTIAL)
+    partial_path(tmp_path / NAME).write_bytes(b"x" * 30)
+    assert DownloadManifest(tmp_path).resume_offset(file_info()) == 30
+
+
+def test_partial_download_of_another_version_starts_over(tmp_path):
+    DownloadManifest(tmp_path).update(file_info(), PARTIAL)
+    part = partial_path(tmp_path / NAME)
+    part.write_bytes(b"x" * 30)
+    assert DownloadManifest(tmp_path).resume_offset(file_info(etag='"def"')) == 0
+    assert not part.exists()
+
+
+def test_unrecorded_partial_download_starts_over(tmp_path):
+    part = partial_path(tmp_path / NAME)
+    part.write_bytes(b"x" * 30)
+    assert DownloadManifest(tmp_path).resume_offset(file_info()) == 0
+    assert not part.exists()
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    (tmp_path / ".download_manifest.json").write_text("{not json")
+    assert DownloadManifest(tmp_path).entries == {}
@@ -0,0 +1,69 @@
+import bz2
+
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("botocore")
+
+import Process_dat
+from object_store import ObjectStore
+
+BUCKET = "noaa-himawari9"
+PREFIX = "AHI-L1b-FLDK/2024/01/15/0000/"
+KEY = PREFIX + "HS_H09_20240115_0000_B13_FLDK_R20_S0110.DAT.bz2"
+DAT = b"segment" * 100
+COMPRESSED = bz2.compress(DAT)
+
+
+class Paginator:
+    def paginate(self, **kwargs):
+        return [{'Contents': [{'Key': KEY, 'Size': len(COMPRESSED), 'ETag': '"etag"'}]}]
+
+
+class Client:
+    """Lists one object; every segment has to come from the object store"""
+    def get_paginator(self, name):
+        return Paginator()
+
+    def get_object(self, **kwargs):
+        raise AssertionError("object downloaded although the store has it")
+
+
+def run_worker(tmp_path, monkeypatch, store):
+    monkeypatch.setattr(Process_dat, "get_s3_client", lambda *args: Client())
+    worker = Process_dat.S3DownloadWorker(BUCKET, PREFIX, tmp_path / "download", store=store, extract=True)
+    signals = {'error': [], 'finished': [], 'band_complete': []}
+    worker.error.connect(signals['error'].append)
+    worker.finished.connect(lambda success, path: signals['finished'].append(success))
+    worker.band_complete.connect(lambda band, folder: signals['band_complete'].append(band))
+    worker.run()
+    return signals
+
+
+def test_store_with_only_dat_links_it_without_extracting(tmp_path, monkeypatch, capsys):
+    store = ObjectStore(tmp_path / ".store")
+    dat = tmp_path / "segment.DAT"
+    dat.write_bytes(DAT)
+    store.add(dat, BUCKET, KEY, '"etag"', extracted=True)
+
+    signals = run_worker(tmp_path, monkeypatch, store)
+    assert signals == {'error': [], 'finished': [True], 'band_complete': [13]}
+    assert "Extracting" not in capsys.readouterr().out
+    folder = tmp_path / "download"
+    assert (folder / "HS_H09_20240115_0000_B13_FLDK_R20_S0110.DAT").read_bytes() == DAT
+    assert not list(folder.glob("*.bz2"))
+
+
+def test_store_with_bz2_links_and_extracts_it(tmp_path, monkeypatch):
+    store = ObjectStore(tmp_path / ".store")
+    compressed = tmp_path / "segment.DAT.bz2"
+    compressed.write_bytes(COMPRESSED)
+    store.add(compressed, BUCKET, KEY, '"etag"')
+
+    signals = run_worker(tmp_path, monkeypatch, store)
+    assert signals == {'error': [], 'finished': [True], 'band_complete': [13]}
+    folder = tmp_path / "download"
+    assert (folder / "HS_H09_20240115_0000_B13_FLDK_R20_S0110.DAT").read_bytes() == DAT
+    assert not list(folder.glob("*.bz2"))
+    # The stored copy survives the extraction of its linked .bz2
+    assert store.object_path(BUCKET, KEY, '"etag"').read_bytes() == COMPRESSED
@@ -0,0 +1,76 @@
+import pytest
+
+from himawari_geo import (
+    GRIDS, REGIONS, TOTAL_SEGMENTS, bbox_line_col_range, latlon_to_line_col, parse_segment,
+    resolve_region, segment_in_region, segments_for_bbox,
+)
+
+
+def test_sub_satellite_point_is_grid_centre():
+    for resolution, (_, _, offset) in GRIDS.items():
+        line, column = latlon_to_line_col(0.0, 140.7, resolution)
+        assert line == pytest.approx(offset)
+        assert column == pytest.approx(offset)
+
+
+def test_north_is_up_and_east_is_right():
+    line, column = latlon_to_line_col(30.0, 140.7)
+    assert line < GRIDS[2.0][2]
+    assert column == pytest.approx(GRIDS[2.0][2])
+    line, column = latlon_to_line_col(0.0, 150.0)
+    assert column > GRIDS[2.0][2]
+
+
+def test_point_behind_the_limb_is_not_visible():
+    assert latlon_to_line_col(0.0, -40.0) is None
+
+
+def test_grid_override_matches_nominal_grid():
+    bbox = REGIONS["philippines"]
+    assert bbox_line_col_range(bbox, grid=GRIDS[2.0]) == bbox_line_col_range(bbox, 2.0)
+
+
+def test_bbox_range_scales_with_resolution():
+    bbox = REGIONS["philippines"]
+    first_line, last_line, first_column, last_column = bbox_line_col_range(bbox, 2.0)
+    fine = bbox_line_col_range(bbox, 0.5)
+    # Same area to within a 2 km pixel: 4 pixels at 0.5 km
+    assert abs(fine[0] - ((first_line - 1) * 4 + 1)) <= 4
+    assert abs(fine[1] - last_line * 4) <= 4
+    assert abs(fine[2] - ((first_column - 1) * 4 + 1)) <= 4
+    assert abs(fine[3] - last_column * 4) <= 4
+
+
+def test_bbox_outside_the_disk_raises():
+    with pytest.raises(ValueError):
+        bbox_line_col_range((-10.0, 10.0, -60.0, -30.0))
+
+
+def test_segments_for_bbox():
+    assert segments_for_bbox(REGIONS["philippines"], 13) == (3, 4, 5)
+    # Every resolution splits the disk into the same line ranges
+    assert segments_for_bbox(REGIONS["philippines"], 3) == (3, 4, 5)
+    assert segments_for_bbox((-90.0, 90.0, 100.0, 180.0), 13) == tuple(range(1, TOTAL_SEGMENTS + 1))
+
+
+def test_parse_segment():
+    assert parse_segment("HS_H09_20240115_0000_B13_FLDK_R20_S0310.DAT.bz2") == (13, 3, 10)
+    assert parse_segment("hs_h09_20240115_0000_b03_fldk_r05_s1010.dat") == (3, 10, 10)
+    assert parse_segment("B13.tif") is None
+
+
+def test_segment_in_region():
+    bbox = REGIONS["philippines"]
+    assert segment_in_region("HS_H09_20240115_0000_B13_FLDK_R20_S0410.DAT.bz2", bbox)
+    assert not segment_in_region("HS_H09_20240115_0000_B13_FLDK_R20_S0910.DAT.bz2", bbox)
+    # Anything that isn't a 10-segment HSD file is kept
+    assert segment_in_region("README.txt", bbox)
+
+
+def test_resolve_region():
+    assert resolve_region("Philippines") == REGIONS["philippines"]
+    assert resolve_region("10, 20, 120, 130") == (10.0, 20.0, 120.0, 130.0)
+    assert resolve_region([10, 20, 120, 130]) == (10.0, 20.0, 120.0, 130.0)
+    for bad in ("nowhere", "10,20,120", "20,10,120,130", "10,20,130,120"):
+        with pytest.raises(ValueError):
+            resolve_region(bad)
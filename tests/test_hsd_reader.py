@@ -0,0 +1,169 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import hsd_reader
+from bench_decode import make_dataset
+from himawari_geo import REGIONS
+
+
+def band_files(folder, band):
+    return sorted(folder.glob(f"*_B{band:02d}_*"))
+
+
+@pytest.fixture(scope="module")
+def full_disk(tmp_path_factory):
+    return make_dataset(tmp_path_factory.mktemp("full"), [3, 13], 0.02)[0]
+
+
+def test_segment_header(full_disk):
+    segments = hsd_reader.load_segments(band_files(full_disk, 13))
+    assert [s.segment for s in segments] == list(range(1, 11))
+    first = segments[0]
+    assert (first.band, first.total_segments, first.lines, first.columns) == (13, 10, 12, 120)
+    assert [s.first_line for s in segments] == [1 + 12 * i for i in range(10)]
+    assert first.counts().shape == (12, 120)
+
+
+def test_compressed_segment_has_same_counts(tmp_path):
+    plain = band_files(make_dataset(tmp_path / "plain", [13], 0.02, segments=[5])[0], 13)
+    packed = band_files(make_dataset(tmp_path / "bz2", [13], 0.02, segments=[5], compressed=True)[0], 13)
+    a, b = hsd_reader.Segment(plain[0]), hsd_reader.Segment(packed[0])
+    assert b.compressed and not a.compressed
+    assert (a.first_line, a.lines, a.columns) == (b.first_line, b.lines, b.columns)
+    np.testing.assert_array_equal(a.counts(), b.counts())
+
+
+def test_short_file_is_rejected(tmp_path):
+    path = tmp_path / "HS_H09_20240115_0000_B13_FLDK_R20_S0110.DAT"
+    path.write_bytes(b"\x01" * 100)
+    with pytest.raises(ValueError):
+        hsd_reader.Segment(path)
+
+
+def test_load_segments_rejects_mixed_bands(full_disk):
+    with pytest.raises(ValueError):
+        hsd_reader.load_segments(band_files(full_disk, 13)[:1] + band_files(full_disk, 3)[:1])
+
+
+@pytest.mark.parametrize("segments, expected", [
+    (None, (1, 120)),           # full disk
+    ([4, 5, 6], (37, 36)),      # contiguous strip: its own lines
+    ([4, 6], (1, 120)),         # gap: full disk, missing lines left as NaN
+])
+def test_line_range(tmp_path, segments, expected):
+    folder = make_dataset(tmp_path, [13], 0.02, segments=segments)[0]
+    assert hsd_reader.line_range(hsd_reader.load_segments(band_files(folder, 13))) == expected
+
+
+def test_geometry_is_centred_on_sub_satellite_point(full_disk):
+    segment = hsd_reader.Segment(band_files(full_disk, 13)[0])
+    geometry = hsd_reader.Geometry(segment.header)
+    assert geometry.x(geometry.coff) == pytest.approx(0.0)
+    assert geometry.y(geometry.loff) == pytest.approx(0.0)
+    transform = geometry.transform(1)
+    # Full disk extent is symmetric around the sub-satellite point
+    assert transform.c == pytest.approx(-(transform.c + transform.a * segment.columns))
+    assert transform.f == pytest.approx(-(transform.f + transform.e * segment.columns))
+    # A later line or column only shifts the origin
+    shifted = geometry.transform(13, 5)
+    assert shifted.c == pytest.approx(transform.c + 4 * transform.a)
+    assert shifted.f == pytest.approx(transform.f + 12 * transform.e)
+
+
+def test_earth_mask(full_disk):
+    segment = hsd_reader.Segment(band_files(full_disk, 13)[0])
+    geometry = hsd_reader.Geometry(segment.header)
+    mask = geometry.earth_mask(1, 120, 1, 120)
+    assert mask[60, 60] and not mask[0, 0] and not mask[119, 119]
+    # Symmetric disk
+    np.testing.assert_array_equal(mask, mask[::-1, ::-1])
+    np.testing.assert_array_equal(mask[40:50, 10:30], geometry.earth_mask(41, 10, 11, 20))
+
+
+def test_decode_band(full_disk, tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+    files = band_files(full_disk, 13)
+    output = tmp_path / "B13.tif"
+    assert hsd_reader.decode_band(files, output) == (120, 120)
+    with rasterio.open(output) as src:
+        data = src.read(1)
+        geometry = hsd_reader.Geometry(hsd_reader.Segment(files[0]).header)
+        assert src.transform.almost_equals(geometry.transform(1))
+    mask = geometry.earth_mask(1, 120, 1, 120)
+    assert np.isnan(data[~mask]).all()
+    assert np.isfinite(data[mask]).any()
+
+
+def test_decode_strip_with_gap(tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+    folder = make_dataset(tmp_path, [13], 0.02, segments=[4, 6])[0]
+    output = tmp_path / "B13.tif"
+    assert hsd_reader.decode_band(band_files(folder, 13), output) == (120, 120)
+    with rasterio.open(output) as src:
+        data = src.read(1)
+    # Segment 5 (lines 49-60) is missing
+    assert np.isnan(data[48:60]).all()
+    assert np.isfinite(data[36:48]).any() and np.isfinite(data[60:72]).any()
+
+
+@pytest.mark.parametrize("band", [3, 13])
+def test_calibration_lut_matches_formula(full_disk, band):
+    segment = hsd_reader.Segment(band_files(full_disk, band)[4])
+    counts = np.asarray(segment.counts())
+    np.testing.assert_array_equal(hsd_reader.calibrate(counts, segment.header),
+                                  hsd_reader.calibrate_counts(counts, segment.header))
+    # Error and outside-scan counts are NaN
+    lut = hsd_reader.calibration_lut(segment.header["cal_block"])
+    assert lut.shape == (hsd_reader.LUT_SIZE,) and lut.dtype == np.float32
+    assert np.isnan(lut[[65534, 65535]]).all()
+    assert not lut.flags.writeable
+
+
+def test_calibration_lut_is_cached_per_block(full_disk):
+    first, second = (hsd_reader.Segment(path) for path in band_files(full_disk, 13)[:2])
+    assert first.header["cal_block"] == second.header["cal_block"]
+    assert hsd_reader.calibration_lut(first.header["cal_block"]) is \
+        hsd_reader.calibration_lut(second.header["cal_block"])
+
+
+@pytest.fixture(scope="module")
+def philippines_strip(tmp_path_factory):
+    # Scale 0.2 keeps the 4:1 pixel ratio between B03 (0.5 km) and B13 (2 km)
+    return make_dataset(tmp_path_factory.mktemp("strip"), [3, 13], 0.2, segments=[3, 4, 5])[0]
+
+
+def test_region_window_covers_same_area_in_every_band(philippines_strip):
+    bbox = REGIONS["philippines"]
+    coarse = hsd_reader.region_window(band_files(philippines_strip, 13), bbox)
+    fine = hsd_reader.region_window(band_files(philippines_strip, 3), bbox)
+    first_line, last_line, first_column, last_column = coarse
+    assert fine == ((first_line - 1) * 4 + 1, last_line * 4, (first_column - 1) * 4 + 1, last_column * 4)
+
+
+def test_region_window_is_limited_to_the_segments(philippines_strip):
+    segments = hsd_reader.load_segments(band_files(philippines_strip, 13))
+    files = band_files(philippines_strip, 13)
+    first_line, last_line, _, _ = hsd_reader.region_window(files, (-10.0, 60.0, 120.0, 130.0))
+    assert first_line == segments[0].first_line
+    assert last_line == segments[-1].first_line + segments[-1].lines - 1
+    with pytest.raises(ValueError):
+        hsd_reader.region_window(files, (-60.0, -50.0, 120.0, 130.0))
+
+
+def test_decode_band_window_matches_full_decode(philippines_strip, tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+    files = band_files(philippines_strip, 13)
+    window = hsd_reader.region_window(files, REGIONS["philippines"])
+    first_line, last_line, first_column, last_column = window
+    strip_first_line = hsd_reader.load_segments(files)[0].first_line
+
+    assert hsd_reader.decode_band(files, tmp_path / "strip.tif") is not None
+    assert hsd_reader.decode_band(files, tmp_path / "sector.tif", window) == \
+        (last_line - first_line + 1, last_column - first_column + 1)
+    with rasterio.open(tmp_path / "strip.tif") as strip, rasterio.open(tmp_path / "sector.tif") as sector:
+        rows = slice(first_line - strip_first_line, last_line - strip_first_line + 1)
+        columns = slice(first_column - 1, last_column)
+        np.testing.assert_array_equal(sector.read(1), strip.read(1)[rows, columns])
+        expected = strip.transform * strip.transform.translation(first_column - 1, first_line - strip_first_line)
+        assert sector.transform.almost_equals(expected)
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+import object_store
+from object_store import ObjectStore, slot_dir_name
+
+KEY = "AHI-L1b-FLDK/2024/01/15/0000/HS_H09_20240115_0000_B13_FLDK_R20_S0{}10.DAT.bz2"
+
+
+@pytest.fixture
+def no_hard_links(monkeypatch):
+    """Make the store fall back to symlinks, as on filesystems without hard links"""
+    def link(*args):
+        raise OSError("hard links not supported")
+    monkeypatch.setattr(object_store.os, "link", link)
+
+
+def add_objects(store, folder, count, size=100):
+    paths = []
+    for i in range(1, count + 1):
+        path = folder / f"S0{i}10.DAT.bz2"
+        path.write_bytes(bytes([i]) * size)
+        store.add(path, "bucket", KEY.format(i), f'"etag{i}"')
+        paths.append(path)
+    return paths
+
+
+def test_slot_dir_name():
+    assert slot_dir_name(KEY.format(1)) == "AHI-L1b-FLDK_2024_01_15_0000"
+    assert slot_dir_name("AHI-L1b-FLDK/2024/01/15/") is None
+
+
+def test_add_links_file_into_store(tmp_path):
+    store = ObjectStore(tmp_path / ".store")
+    path, = add_objects(store, tmp_path, 1)
+    stored = store.object_path("bucket", KEY.format(1), '"etag1"')
+    assert os.path.samefile(path, stored)
+    assert store.usage() == (1, 100)
+
+
+def test_checkout_links_stored_object(tmp_path):
+    store = ObjectStore(tmp_path / ".store")
+    path, = add_objects(store, tmp_path, 1)
+    dest = tmp_path / "other" / path.name
+    assert store.checkout("bucket", KEY.format(1), '"etag1"', dest)
+    assert dest.read_bytes() == path.read_bytes()
+    # Another version of the object is not in the store
+    assert not store.checkout("bucket", KEY.format(1), '"etag2"', tmp_path / "missing")
+
+
+def test_prune_keeps_linked_objects(tmp_path):
+    store = ObjectStore(tmp_path / ".store")
+    paths = add_objects(store, tmp_path, 3)
+    paths[1].unlink()
+    assert store.prune(1) == (1, 100)
+    assert all(path.read_bytes() for path in (paths[0], paths[2]))
+    assert store.usage() == (2, 200)
+
+
+def test_prune_stops_under_limit(tmp_path):
+    store = ObjectStore(tmp_path / ".store")
+    for path in add_objects(store, tmp_path, 3):
+        path.unlink()
+    assert store.prune(250) == (1, 100)
+    assert store.usage() == (2, 200)
+
+
+def test_prune_keeps_symlinked_objects(tmp_path, no_hard_links):
+    store = ObjectStore(tmp_path / ".store")
+    paths = add_objects(store, tmp_path, 3)
+    assert all(path.is_symlink() for path in paths)
+    paths[1].unlink()
+    assert store.prune(1) == (1, 100)
+    # No broken symlinks left behind
+    assert all(path.exists() for path in (paths[0], paths[2]))
+    assert store.usage() == (2, 200)
+
+
+def test_prune_frees_object_once_its_symlinks_are_gone(tmp_path, no_hard_links):
+    store = ObjectStore(tmp_path / ".store")
+    path, = add_objects(store, tmp_path, 1)
+    copy = tmp_path / "copy.DAT.bz2"
+    assert store.checkout("bucket", KEY.format(1), '"etag1"', copy)
+    path.unlink()
+    assert store.prune(1) == (0, 0)
+    copy.unlink()
+    assert store.prune(1) == (1, 100)
+    assert store.usage() == (0, 0)
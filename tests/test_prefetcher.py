@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("botocore")
+
+from Process_dat import S3Prefetcher
+from s3_cache import S3ListingCache
+
+BUCKET = "noaa-himawari9"
+LISTED = "AHI-L1b-FLDK/2024/01/14/0000/"
+CACHED = "AHI-L1b-FLDK/2024/01/14/0010/"
+EMPTY = "AHI-L1b-FLDK/2024/01/14/0020/"
+FAILING = "AHI-L1b-FLDK/2024/01/14/0030/"
+
+
+class Paginator:
+    def paginate(self, Prefix, **kwargs):
+        if Prefix == FAILING:
+            raise ConnectionError("connection reset")
+        if Prefix == EMPTY:
+            return [{}]
+        return [{'CommonPrefixes': [{'Prefix': Prefix + "sub/"}]}]
+
+
+class Client:
+    def get_paginator(self, name):
+        return Paginator()
+
+
+def test_prefetch_logs_one_summary(tmp_path):
+    cache = S3ListingCache(tmp_path / "listings")
+    cache.put(BUCKET, CACHED, ["sub"], [])
+    prefetcher = S3Prefetcher(BUCKET, [LISTED, CACHED, EMPTY, FAILING], cache, s3_client=Client())
+    messages, finished = [], []
+    prefetcher.progress.connect(messages.append)
+    prefetcher.finished.connect(finished.append)
+    prefetcher.run()
+
+    assert finished == [1]
+    assert messages == [f"Prefetched 1/4 listings from s3://{BUCKET}/ (1 already cached, 1 empty, 1 failed), "
+                        f"first error: {FAILING}: connection reset"]
+    assert cache.contains(BUCKET, LISTED, need_files=True)
+    assert not cache.contains(BUCKET, EMPTY)
@@ -0,0 +1,68 @@
+from process_manifest import ProcessManifest, fingerprint, remove_stale
+
+
+def write(path, size):
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_fingerprint_depends_on_names_sizes_and_options(tmp_path):
+    a, b = write(tmp_path / "a.DAT", 10), write(tmp_path / "b.DAT", 20)
+    base = fingerprint([a, b])
+    assert fingerprint([b, a]) == base
+    assert fingerprint([a, b], {'storage': 'uint16'}) != base
+    assert fingerprint([a, b], {'storage': 'uint16'}) == fingerprint([a, b], {'storage': 'uint16'})
+    write(b, 21)
+    assert fingerprint([a, b]) != base
+
+
+def test_fingerprint_of_deleted_inputs_is_none(tmp_path):
+    assert fingerprint([tmp_path / "gone.DAT"]) is None
+
+
+def test_recorded_output_is_complete(tmp_path):
+    output = write(tmp_path / "B13.tif", 100)
+    ProcessManifest(tmp_path).record(output, "inputs-1", "decode")
+    manifest = ProcessManifest(tmp_path)
+    assert manifest.is_complete(output, "inputs-1")
+    # Inputs deleted since: only the output is checked
+    assert manifest.is_complete(output)
+
+
+def test_unrecorded_output_is_redone(tmp_path):
+    output = write(tmp_path / "B13.tif", 100)
+    assert not ProcessManifest(tmp_path).is_complete(output)
+
+
+def test_truncated_output_is_redone(tmp_path):
+    output = write(tmp_path / "B13.tif", 100)
+    ProcessManifest(tmp_path).record(output, "inputs-1")
+    write(output, 60)
+    assert not ProcessManifest(tmp_path).is_complete(output, "inputs-1")
+
+
+def test_output_from_other_inputs_is_redone(tmp_path):
+    output = write(tmp_path / "B13.tif", 100)
+    ProcessManifest(tmp_path).record(output, "inputs-1")
+    assert not ProcessManifest(tmp_path).is_complete(output, "inputs-2")
+
+
+def test_forget(tmp_path):
+    output = write(tmp_path / "B13.tif", 100)
+    manifest = ProcessManifest(tmp_path)
+    manifest.record(output)
+    manifest.forget(output)
+    assert not ProcessManifest(tmp_path).is_complete(output)
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    (tmp_path / ".process_manifest.json").write_text("{not json")
+    assert ProcessManifest(tmp_path).entries == {}
+
+
+def test_remove_stale(tmp_path, capsys):
+    output = write(tmp_path / "B13.tif", 100)
+    remove_stale(output, "decoding")
+    assert not output.exists()
+    assert "decoding again" in capsys.readouterr().out
+    remove_stale(output, "decoding")
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("botocore")
+
+from Process_dat import HimawariProcessorWorker
+
+
+def decode_command(tmp_path, **kwargs):
+    """bg_decode arguments a combine-only run passes, with the scripts themselves not run"""
+    worker = HimawariProcessorWorker(tmp_path, "combine_only", **kwargs)
+    calls = {}
+
+    def run_external_script(script, args):
+        calls[script.name] = args
+        return SimpleNamespace(stdout="")
+
+    worker.run_external_script = run_external_script
+    worker.run()
+    return calls["bg_decode.py"]
+
+
+def test_decode_workers_and_memory_budget_passed_through(tmp_path):
+    args = decode_command(tmp_path, decode_workers=6, memory_budget=4096)
+    assert args[args.index("--workers") + 1] == "6"
+    assert args[args.index("--memory-budget") + 1] == "4096"
+
+
+def test_memory_budget_zero_means_no_limit(tmp_path):
+    args = decode_command(tmp_path, memory_budget=0)
+    assert args[args.index("--memory-budget") + 1] == "0"
+    assert "--workers" not in args
+
+
+def test_bg_decode_defaults_when_not_set(tmp_path):
+    args = decode_command(tmp_path)
+    assert "--workers" not in args and "--memory-budget" not in args
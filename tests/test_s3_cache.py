@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import s3_cache
+from s3_cache import S3ListingCache, neighbour_prefixes, slot_prefixes, ttl_for_prefix
+
+BUCKET = "noaa-himawari9"
+NOW = datetime(2024, 1, 15, 12, 5, tzinfo=timezone.utc)
+
+
+class Clock:
+    """Injected time source for S3ListingCache"""
+    def __init__(self, moment=NOW):
+        self.now = moment.timestamp()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return S3ListingCache(tmp_path / "listings", clock=clock)
+
+
+@pytest.mark.parametrize("prefix, ttl", [
+    # Periods still open: the deeper the folder, the sooner it expires
+    ("", s3_cache.OPEN_PERIOD_TTL["root"]),
+    ("AHI-L1b-FLDK/", s3_cache.OPEN_PERIOD_TTL["product"]),
+    ("AHI-L1b-FLDK/2024/", s3_cache.OPEN_PERIOD_TTL["year"]),
+    ("AHI-L1b-FLDK/2024/01/", s3_cache.OPEN_PERIOD_TTL["month"]),
+    ("AHI-L1b-FLDK/2024/01/15/", s3_cache.OPEN_PERIOD_TTL["day"]),
+    ("AHI-L1b-FLDK/2024/01/15/1200/", s3_cache.OPEN_PERIOD_TTL["slot"]),
+    # Ended less than SETTLE_DELAY ago
+    ("AHI-L1b-FLDK/2024/01/15/1100/", s3_cache.SETTLING_TTL),
+    # Settled
+    ("AHI-L1b-FLDK/2024/01/15/0900/", s3_cache.IMMUTABLE),
+    ("AHI-L1b-FLDK/2024/01/14/", s3_cache.IMMUTABLE),
+    ("AHI-L1b-FLDK/2023/", s3_cache.IMMUTABLE),
+    # Not in the dated layout
+    ("some/other/layout/", s3_cache.DEFAULT_TTL),
+])
+def test_ttl_for_prefix(prefix, ttl):
+    assert ttl_for_prefix(prefix, NOW) == ttl
+
+
+def test_put_then_get_is_a_hit(cache):
+    cache.put(BUCKET, "AHI-L1b-FLDK/2024/01/", ["14/", "15/"])
+    assert cache.get(BUCKET, "AHI-L1b-FLDK/2024/01/") == {'directories': ["14/", "15/"], 'files': None}
+    assert cache.stats() == {'hits': 1, 'misses': 0, 'expired': 0}
+
+
+def test_unknown_prefix_and_missing_files_are_misses(cache):
+    cache.put(BUCKET, "AHI-L1b-FLDK/2024/01/", ["15/"])
+    assert cache.get(BUCKET, "AHI-L1b-FLDK/2024/02/") is None
+    assert cache.get(BUCKET, "AHI-L1b-FLDK/2024/01/", need_files=True) is None
+    assert cache.stats() == {'hits': 0, 'misses': 2, 'expired': 0}
+
+
+def test_recent_prefix_expires_after_its_ttl(cache, clock):
+    prefix = "AHI-L1b-FLDK/2024/01/15/"
+    cache.put(BUCKET, prefix, ["1150/", "1200/"])
+    clock.advance(s3_cache.OPEN_PERIOD_TTL["day"] - 1)
+    assert cache.get(BUCKET, prefix) is not None
+    clock.advance(1)
+    assert cache.get(BUCKET, prefix) is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'expired': 1}
+
+
+def test_settled_prefix_never_expires(cache, clock):
+    prefix = "AHI-L1b-FLDK/2024/01/14/"
+    cache.put(BUCKET, prefix, ["0000/"])
+    clock.advance(365 * 24 * 3600)
+    assert cache.get(BUCKET, prefix) == {'directories': ["0000/"], 'files': None}
+
+
+def test_listing_taken_before_settling_still_expires(cache, clock):
+    # Listed while the slot was still receiving segments, then looked up
+    # once the slot has settled: the listing may be missing late files
+    prefix = "AHI-L1b-FLDK/2024/01/15/1200/"
+    cache.put(BUCKET, prefix, [])
+    clock.advance(3 * 3600)
+    assert ttl_for_prefix(prefix, datetime.fromtimestamp(clock(), timezone.utc)) is s3_cache.IMMUTABLE
+    assert cache.get(BUCKET, prefix) is None
+    assert cache.stats()['expired'] == 1
+
+
+def test_files_round_trip_through_disk(tmp_path, cache, clock):
+    prefix = "AHI-L1b-FLDK/2024/01/14/0000/"
+    modified = datetime(2024, 1, 14, 0, 12, tzinfo=timezone.utc)
+    files = [{'key': prefix + "HS_H09_20240114_0000_B13_FLDK_R20_S0110.DAT.bz2", 'size': 100,
+              'last_modified': modified}]
+    cache.put(BUCKET, prefix, [], files)
+
+    # A new cache on the same directory reads the entry back from disk
+    reloaded = S3ListingCache(tmp_path / "listings", clock=clock)
+    listing = reloaded.get(BUCKET, prefix, need_files=True)
+    assert listing['files'] == files
+    assert reloaded.contains(BUCKET, prefix, need_files=True)
+    assert reloaded.stats() == {'hits': 1, 'misses': 0, 'expired': 0}
+
+
+def test_invalidate(cache):
+    prefix = "AHI-L1b-FLDK/2024/01/14/"
+    cache.put(BUCKET, prefix, ["0000/"])
+    cache.invalidate(BUCKET, prefix)
+    assert not cache.contains(BUCKET, prefix)
+    assert cache.get(BUCKET, prefix) is None
+
+
+LATER = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("prefix, neighbours", [
+    # Slot: next/previous 10 minutes, then one hour either side, across midnight
+    ("AHI-L1b-FLDK/2024/01/15/2350/", ["AHI-L1b-FLDK/2024/01/16/0000/", "AHI-L1b-FLDK/2024/01/15/2340/",
+                                       "AHI-L1b-FLDK/2024/01/16/0050/", "AHI-L1b-FLDK/2024/01/15/2250/"]),
+    ("AHI-L1b-FLDK/2024/01/16/0000/", ["AHI-L1b-FLDK/2024/01/16/0010/", "AHI-L1b-FLDK/2024/01/15/2350/",
+                                       "AHI-L1b-FLDK/2024/01/16/0100/", "AHI-L1b-FLDK/2024/01/15/2300/"]),
+    # Day: across month, year and leap day boundaries
+    ("AHI-L1b-FLDK/2024/01/31/", ["AHI-L1b-FLDK/2024/02/01/", "AHI-L1b-FLDK/2024/01/30/"]),
+    ("AHI-L1b-FLDK/2023/12/31/", ["AHI-L1b-FLDK/2024/01/01/", "AHI-L1b-FLDK/2023/12/30/"]),
+    ("AHI-L1b-FLDK/2024/03/01/", ["AHI-L1b-FLDK/2024/03/02/", "AHI-L1b-FLDK/2024/02/29/"]),
+    # Month: across year boundaries
+    ("AHI-L1b-FLDK/2023/12/", ["AHI-L1b-FLDK/2024/01/", "AHI-L1b-FLDK/2023/11/"]),
+    ("AHI-L1b-FLDK/2024/01/", ["AHI-L1b-FLDK/2024/02/", "AHI-L1b-FLDK/2023/12/"]),
+    # Year
+    ("AHI-L1b-FLDK/2024/", ["AHI-L1b-FLDK/2025/", "AHI-L1b-FLDK/2023/"]),
+    # Nothing dated to step from
+    ("AHI-L1b-FLDK/", []),
+    ("", []),
+])
+def test_neighbour_prefixes(prefix, neighbours):
+    assert neighbour_prefixes(prefix, now=LATER) == neighbours
+
+
+def test_neighbour_prefixes_leave_out_the_future():
+    assert neighbour_prefixes("AHI-L1b-FLDK/2024/01/15/1200/", now=NOW) == \
+        ["AHI-L1b-FLDK/2024/01/15/1150/", "AHI-L1b-FLDK/2024/01/15/1100/"]
+    assert neighbour_prefixes("AHI-L1b-FLDK/2024/01/15/", now=NOW) == ["AHI-L1b-FLDK/2024/01/14/"]
+    assert neighbour_prefixes("AHI-L1b-FLDK/2023/12/", now=datetime(2023, 12, 20, tzinfo=timezone.utc)) == \
+        ["AHI-L1b-FLDK/2023/11/"]
+
+
+def test_neighbour_prefixes_of_day_start_with_latest_slot():
+    assert neighbour_prefixes("AHI-L1b-FLDK/2024/01/14/", ["0000", "2350", "1200"], now=NOW) == \
+        ["AHI-L1b-FLDK/2024/01/14/2350/", "AHI-L1b-FLDK/2024/01/15/", "AHI-L1b-FLDK/2024/01/13/"]
+
+
+def at(day, hour, minute, second=0):
+    return datetime(2024, 1, day, hour, minute, second, tzinfo=timezone.utc)
+
+
+def test_slot_prefixes_include_both_ends():
+    assert slot_prefixes("AHI-L1b-FLDK", at(15, 12, 0), at(15, 12, 30)) == [
+        "AHI-L1b-FLDK/2024/01/15/1200/", "AHI-L1b-FLDK/2024/01/15/1210/",
+        "AHI-L1b-FLDK/2024/01/15/1220/", "AHI-L1b-FLDK/2024/01/15/1230/",
+    ]
+
+
+def test_slot_prefixes_round_start_down_to_the_slot():
+    # 12:07:30 is inside the 12:00 scan; the end is not rounded
+    assert slot_prefixes("AHI-L1b-FLDK", at(15, 12, 7, 30), at(15, 12, 19, 59)) == [
+        "AHI-L1b-FLDK/2024/01/15/1200/", "AHI-L1b-FLDK/2024/01/15/1210/",
+    ]
+    assert slot_prefixes("AHI-L1b-FLDK", at(15, 12, 10), at(15, 12, 10)) == ["AHI-L1b-FLDK/2024/01/15/1210/"]
+    assert slot_prefixes("AHI-L1b-FLDK", at(15, 12, 10), at(15, 12, 0)) == []
+
+
+def test_slot_prefixes_across_midnight():
+    assert slot_prefixes("AHI-L1b-FLDK", at(31, 23, 40), at(31, 23, 59) + timedelta(minutes=11)) == [
+        "AHI-L1b-FLDK/2024/01/31/2340/", "AHI-L1b-FLDK/2024/01/31/2350/",
+        "AHI-L1b-FLDK/2024/02/01/0000/", "AHI-L1b-FLDK/2024/02/01/0010/",
+    ]
+
+
+def test_slot_prefixes_hourly_cadence():
+    prefixes = slot_prefixes("AHI-L1b-FLDK", at(15, 22, 30), at(16, 1, 30), cadence_minutes=60)
+    assert prefixes == ["AHI-L1b-FLDK/2024/01/15/2230/", "AHI-L1b-FLDK/2024/01/15/2330/",
+                        "AHI-L1b-FLDK/2024/01/16/0030/", "AHI-L1b-FLDK/2024/01/16/0130/"]
+
+
+@pytest.mark.parametrize("cadence", [0, 5, 15])
+def test_slot_prefixes_reject_off_grid_cadence(cadence):
+    with pytest.raises(ValueError):
+        slot_prefixes("AHI-L1b-FLDK", at(15, 0, 0), at(15, 1, 0), cadence_minutes=cadence)
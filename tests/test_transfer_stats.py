@@ -0,0 +1,197 @@
+import threading
+
+import pytest
+
+import transfer_stats
+from transfer_stats import AdaptiveConcurrency, ThroughputMeter, TransferProgress, format_eta, MB
+
+
+class Clock:
+    """Injected monotonic clock"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_meter_rate_over_sliding_window(clock):
+    meter = ThroughputMeter(window=5.0, clock=clock)
+    clock.now = 1.0
+    meter.add(10 * MB)
+    # Less than a window since the start: averaged over the elapsed time
+    clock.now = 2.0
+    assert meter.rate() == pytest.approx(5 * MB)
+
+    clock.now = 6.0
+    meter.add(5 * MB)
+    clock.now = 8.0
+    meter.add(5 * MB)
+    # The sample at t=1 has left the window
+    clock.now = 10.0
+    assert meter.rate() == pytest.approx(10 * MB / 5.0)
+    assert meter.total_bytes == 20 * MB
+
+    clock.now = 20.0
+    assert meter.rate() == 0.0
+
+
+def test_meter_skip_counts_bytes_but_not_rate(clock):
+    meter = ThroughputMeter(clock=clock)
+    meter.skip(100 * MB)
+    clock.now = 1.0
+    assert meter.total_bytes == 100 * MB
+    assert meter.rate() == 0.0
+
+
+def test_initial_limit():
+    assert AdaptiveConcurrency(8).limit == 4
+    assert AdaptiveConcurrency(8, initial=20).limit == 8
+    assert AdaptiveConcurrency(8, min_workers=3, initial=1).limit == 3
+    assert AdaptiveConcurrency(8, initial=2, adaptive=False).limit == 8
+
+
+def test_hill_climb_steps_and_backs_off(clock):
+    gate = AdaptiveConcurrency(8, clock=clock)
+    interval = transfer_stats.ADJUST_INTERVAL
+
+    # Nothing changes between adjustments
+    clock.now = interval / 2
+    assert not gate.adjust(100 * MB)
+
+    # First measurement: step up
+    clock.now = interval
+    assert gate.adjust(100 * MB) and gate.limit == 5
+    # Faster: keep climbing
+    clock.now += interval
+    assert gate.adjust(120 * MB) and gate.limit == 6
+    # Slower: back off
+    clock.now += interval
+    assert gate.adjust(100 * MB) and gate.limit == 5
+    # Slower than before the back-off too: reverse again
+    clock.now += interval
+    assert gate.adjust(80 * MB) and gate.limit == 6
+    # Faster: keep climbing
+    clock.now += interval
+    assert gate.adjust(90 * MB) and gate.limit == 7
+
+
+def test_plateau_probes_one_more_connection(clock):
+    gate = AdaptiveConcurrency(8, clock=clock)
+    rate = 100 * MB
+    clock.now = transfer_stats.ADJUST_INTERVAL
+    gate.adjust(rate)
+    assert gate.limit == 5
+
+    # Within TOLERANCE: hold for PROBE_AFTER - 1 intervals, then probe
+    for _ in range(transfer_stats.PROBE_AFTER - 1):
+        clock.now += transfer_stats.ADJUST_INTERVAL
+        assert not gate.adjust(rate * (1 + transfer_stats.TOLERANCE / 2))
+        assert gate.limit == 5
+    clock.now += transfer_stats.ADJUST_INTERVAL
+    assert gate.adjust(rate)
+    assert gate.limit == 6
+
+
+def test_bound_reverses_direction(clock):
+    gate = AdaptiveConcurrency(2, initial=2, clock=clock)
+    clock.now = transfer_stats.ADJUST_INTERVAL
+    # Already at max_workers: no change, and the next move goes down
+    assert not gate.adjust(100 * MB)
+    assert gate.limit == 2
+    clock.now += transfer_stats.ADJUST_INTERVAL
+    assert gate.adjust(200 * MB)
+    assert gate.limit == 1
+
+
+def test_fixed_concurrency_never_adjusts(clock):
+    gate = AdaptiveConcurrency(8, adaptive=False, clock=clock)
+    clock.now = 100.0
+    assert not gate.adjust(100 * MB)
+    assert gate.limit == 8
+
+
+def test_acquire_waits_for_a_free_slot():
+    gate = AdaptiveConcurrency(1, adaptive=False)
+    gate.acquire()
+    acquired = threading.Event()
+
+    def transfer():
+        gate.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=transfer)
+    thread.start()
+    assert not acquired.wait(0.1)
+    gate.release()
+    assert acquired.wait(5)
+    thread.join()
+    assert gate.active == 1
+
+
+def job_files():
+    return [{'size': 40 * MB, 'band': 3}, {'size': 40 * MB, 'band': 3}, {'size': 20 * MB, 'band': 13}]
+
+
+def test_progress_snapshot_eta(clock):
+    files = job_files()
+    progress = TransferProgress(files, clock=clock)
+    assert progress.snapshot()['eta'] is None
+
+    # A resumed file: counted as done, but not as throughput
+    progress.skip(files[0], 40 * MB)
+    clock.now = 1.0
+    progress.add(files[1], 10 * MB)
+    clock.now = 2.0
+    snapshot = progress.snapshot()
+    assert snapshot['bytes_done'] == 50 * MB and snapshot['bytes_total'] == 100 * MB
+    # 10 MB over the first 2 s: 5 MB/s, 50 MB to go
+    assert snapshot['mbps'] == pytest.approx(5.0)
+    assert snapshot['eta'] == pytest.approx(10.0)
+
+
+def test_progress_counts_files_and_bands(clock):
+    files = job_files()
+    progress = TransferProgress(files, clock=clock)
+    progress.add(files[0], 40 * MB)
+    progress.file_done(files[0], "S0110.DAT.bz2", True)
+    progress.file_done(files[2], "S0210.DAT.bz2", False)
+    snapshot = progress.snapshot()
+    assert (snapshot['files_done'], snapshot['files_total'], snapshot['files_failed']) == (2, 3, 1)
+    assert snapshot['last_file'] == "S0210.DAT.bz2"
+    assert snapshot['bands'] == {
+        3: {'files_done': 1, 'files_total': 2, 'bytes_done': 40 * MB, 'bytes_total': 80 * MB},
+        13: {'files_done': 0, 'files_total': 1, 'bytes_done': 0, 'bytes_total': 20 * MB},
+    }
+
+
+def test_progress_snapshot_with_gate(clock):
+    files = job_files()
+    progress = TransferProgress(files, clock=clock)
+    gate = AdaptiveConcurrency(8, adaptive=False)
+    gate.acquire()
+    gate.acquire()
+    clock.now = 1.0
+    progress.add(files[0], 8 * MB)
+    clock.now = 2.0
+    snapshot = progress.snapshot(gate)
+    assert (snapshot['concurrency'], snapshot['active'], snapshot['max_workers']) == (8, 2, 8)
+    assert snapshot['per_connection_mbps'] == pytest.approx(2.0)
+
+
+@pytest.mark.parametrize("seconds, text", [
+    (None, "--:--"),
+    (0, "00:00"),
+    (59.9, "00:59"),
+    (61, "01:01"),
+    (3599, "59:59"),
+    (3600, "1:00:00"),
+    (7384, "2:03:04"),
+])
+def test_format_eta(seconds, text):
+    assert format_eta(seconds) == text